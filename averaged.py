@@ -0,0 +1,261 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from losses import Parasitics
+
+
+def _as_function(v):
+    return v if callable(v) else (lambda t, v=v: v)
+
+
+class AveragedModel:
+    def __init__(self, topology, ind, cap, f, vi, d, r=np.inf, i_load=0.0, par=None):
+        """
+        Modelo médio (por período de chaveamento) do Buck e do BuckBoost para transitórios longos: partida,
+        soft-start, rampas de carga.
+
+        Estados: corrente média no indutor iL e tensão de saída vo (módulo, também no BuckBoost). O intervalo de
+        condução do diodo d2 vem do modelo de ordem completa de Sun et al. (2001), d2 = 2 L iL / (d T v_on) - d,
+        limitado a [0, 1 - d]; d2 = 1 - d é o CCM e d2 < 1 - d o DCM, então o modo muda sozinho com iL. As
+        correntes dos intervalos de condução são iL / (d + d2), o que mantém a carga entregue ao capacitor exata
+        nos dois modos. Como no modelo de Sun et al., a ondulação de vo num período é suposta pequena (vo constante
+        durante a descida de iL); no DCM com ondulação grande d2 e a carga entregue saem errados (ver 'vo_ripple' em
+        validate).
+
+        O sistema fica rígido no DCM (polo rápido da ordem de 1/T), por isso o integrador padrão é o LSODA, cujo
+        passo cresce para muitos períodos de chaveamento fora das transições.
+
+        :param topology: 'buck' ou 'buckboost'
+        :param ind: Indutância [H]
+        :param cap: Capacitância [F]
+        :param f: Frequência de chaveamento [Hz]
+        :param vi: Tensão de entrada [V], valor ou função de t
+        :param d: razão cíclica, valor ou função de t (ex.: rampa de soft-start)
+        :param r: resistência de carga [Ohm], valor ou função de t
+        :param i_load: carga de corrente constante [A], valor ou função de t
+        :param par: Parasitics (rds_on, dcr, vf, r_d são usados)
+        """
+        self.topology = topology
+        self.ind = ind
+        self.cap = cap
+        self.f = f
+        self.t = 1 / f
+        self.vi = _as_function(vi)
+        self.d = _as_function(d)
+        self.r = _as_function(r)
+        self.i_load = _as_function(i_load)
+        self.par = par or Parasitics()
+
+    @classmethod
+    def from_converter(cls, conv, **kwargs):
+        """
+        :param conv: Buck ou BuckBoost já dimensionado; vi, d e r vêm do ponto de projeto
+        :param kwargs: substituem qualquer parâmetro (ex.: d=lambda t: ..., r=...)
+        """
+        if hasattr(conv, "info"):  # BuckBoost
+            base = {"topology": "buckboost", "ind": conv.L, "cap": conv.C, "f": conv.f, "d": conv.d, "r": conv.R}
+        else:  # Buck
+            base = {"topology": "buck", "ind": conv.ind, "cap": conv.cap, "f": conv.freq, "d": conv.duty,
+                    "r": conv.res}
+        base["vi"] = conv.vi
+        base.update(kwargs)
+        return cls(**base)
+
+    def __states(self, t, il, vo):
+        """
+        Derivadas de (iL, vo) em cada estado topológico: chave ligada, diodo conduzindo e ambos abertos.
+        """
+        vi = self.vi(t)
+        carga = vo / self.r(t) + self.i_load(t)
+        par = self.par
+        idle = (0.0 * il, -carga / self.cap)
+        if self.topology == "buck":
+            on = ((vi - vo - il * (par.rds_on + par.dcr)) / self.ind, (il - carga) / self.cap)
+            off = ((-vo - par.vf - il * (par.dcr + par.r_d)) / self.ind, (il - carga) / self.cap)
+        else:
+            on = ((vi - il * (par.rds_on + par.dcr)) / self.ind, -carga / self.cap)
+            off = ((-vo - par.vf - il * (par.dcr + par.r_d)) / self.ind, (il - carga) / self.cap)
+        return on, off, idle
+
+    def __v_on(self, t, vo):
+        vi = self.vi(t)
+        return vi - vo if self.topology == "buck" else vi
+
+    def duty_off(self, t, il, vo):
+        """
+        :return: d2, intervalo relativo de condução do diodo (1 - d no CCM)
+        """
+        d = np.clip(self.d(t), 0.0, 1.0)
+        v_on = np.maximum(self.__v_on(t, vo), 1e-12)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d2 = 2 * self.ind * il / (np.maximum(d, 1e-12) * self.t * v_on) - d
+        return np.clip(np.where(il > 0, d2, 0.0), 0.0, 1.0 - d)
+
+    def derivatives(self, t, x):
+        il, vo = x
+        d = np.clip(self.d(t), 0.0, 1.0)
+        d2 = self.duty_off(t, il, vo)
+        cond = d + d2
+        il_c = il / cond if cond > 0 else 0.0
+        on, off, idle = self.__states(t, il_c, vo)
+        dil = d * on[0] + d2 * off[0]
+        dvo = d * on[1] + d2 * off[1] + (1 - cond) * idle[1]
+        return [dil, dvo]
+
+    def simulate(self, t_span, x0=(0.0, 0.0), t_eval=None, method="LSODA", rtol=1e-6, atol=None, max_step=np.inf):
+        """
+        Integra o modelo médio.
+
+        :param t_span: (t_inicial, t_final) [s]
+        :param x0: (iL, vo) iniciais
+        :param t_eval: instantes de saída; None para os passos do integrador
+        :return: dicionário {t, il, vo, d2, dcm, nfev}
+        """
+        if atol is None:
+            atol = 1e-9 + 1e-6 * max(abs(x0[0]), abs(x0[1]), 1.0)
+        sol = solve_ivp(self.derivatives, t_span, list(x0), method=method, t_eval=t_eval, rtol=rtol, atol=atol,
+                        max_step=max_step)
+        if not sol.success:
+            raise RuntimeError(f"integração do modelo médio falhou: {sol.message}")
+        il, vo = sol.y
+        d2 = np.array([self.duty_off(tk, a, b) for tk, a, b in zip(sol.t, il, vo)])
+        d = np.array([np.clip(self.d(tk), 0.0, 1.0) for tk in sol.t])
+        return {"t": sol.t, "il": il, "vo": vo, "d2": d2, "dcm": d2 < 1 - d - 1e-9, "nfev": sol.nfev}
+
+    def switched(self, t0, n_periods, x0, rtol=1e-9):
+        """
+        Referência chaveada: integra cada estado topológico separadamente, com o fim da condução do diodo detectado
+        por evento (iL = 0). vi, d, r e i_load são amostrados no início de cada período, como num PWM.
+
+        :param t0: instante inicial (início de um período) [s]
+        :param x0: (iL, vo) instantâneos em t0
+        :return: dicionário {t, il, vo} com as formas de onda e {t_avg, il_avg, vo_avg} com as médias por período
+        """
+        T = self.t
+        il, vo = float(x0[0]), float(x0[1])
+        ts, ils, vos = [np.array([t0])], [np.array([il])], [np.array([vo])]
+        t_avg = np.empty(n_periods)
+        il_avg = np.empty(n_periods)
+        vo_avg = np.empty(n_periods)
+
+        def rhs(estado, tk):
+            def f(t, x):
+                on, off, idle = self.__states(tk, x[0], x[1])
+                dil, dvo = (on, off, idle)[estado]
+                return [dil, dvo, x[0], x[1]]
+            return f
+
+        def zero_il(t, x):
+            return x[0]
+        zero_il.terminal = True
+        zero_il.direction = -1
+
+        for k in range(n_periods):
+            tk = t0 + k * T
+            d = float(np.clip(self.d(tk), 0.0, 1.0))
+            x = [il, vo, 0.0, 0.0]
+            t = tk
+            for estado, fim in ((0, tk + d * T), (1, tk + T), (2, tk + T)):
+                if fim <= t:
+                    continue
+                if estado == 2:
+                    x[0] = 0.0
+                eventos = zero_il if estado == 1 else None
+                sol = solve_ivp(rhs(estado, tk), (t, fim), x, method="RK45", rtol=rtol, atol=1e-12,
+                                events=eventos)
+                ts.append(sol.t[1:])
+                ils.append(sol.y[0, 1:])
+                vos.append(sol.y[1, 1:])
+                x = list(sol.y[:, -1])
+                t = sol.t[-1]
+                if estado == 1 and sol.status != 1:
+                    break  # CCM: o diodo conduz até o fim do período
+            il, vo = x[0], x[1]
+            t_avg[k] = tk + 0.5 * T
+            il_avg[k] = x[2] / T
+            vo_avg[k] = x[3] / T
+
+        return {"t": np.concatenate(ts), "il": np.concatenate(ils), "vo": np.concatenate(vos),
+                "t_avg": t_avg, "il_avg": il_avg, "vo_avg": vo_avg}
+
+    def handoff(self, t, il, vo, iterations=3):
+        """
+        Estado instantâneo no início de um período a partir do estado médio (passagem do modelo médio para o
+        chaveado). Parte do vale de iL (CCM) ou de iL = 0 (DCM) e corrige o ponto inicial até que as médias de um
+        período chaveado coincidam com (iL, vo); sem isso a ondulação de vo entra na janela como um degrau.
+        """
+        d = float(np.clip(self.d(t), 0.0, 1.0))
+        dcm = float(self.duty_off(t, il, vo)) < 1 - d - 1e-9
+        if dcm:
+            x = [0.0, vo]
+        else:
+            on, _, _ = self.__states(t, il, vo)
+            x = [max(il - 0.5 * on[0] * d * self.t, 0.0), vo]
+        for _ in range(iterations):
+            ref = self.switched(t, 1, x)
+            if not dcm:
+                x[0] = max(x[0] + il - ref["il_avg"][0], 0.0)
+            x[1] += vo - ref["vo_avg"][0]
+        return x[0], x[1]
+
+    def run(self, t_end, x0=(0.0, 0.0), windows=(), t0=0.0, **kwargs):
+        """
+        Modelo médio em todo o intervalo, trocando para a referência chaveada nas janelas pedidas. Ao fim de cada
+        janela o modelo médio continua das médias do último período chaveado.
+
+        :param windows: [(t_inicio, n_periodos), ...] em ordem crescente
+        :param kwargs: repassados a simulate
+        :return: dicionário {t, il, vo, dcm} do modelo médio e 'windows' com os resultados de switched
+        """
+        partes = []
+        janelas = []
+        t, x = t0, tuple(x0)
+        for inicio, n in windows:
+            if inicio > t:
+                partes.append(self.simulate((t, inicio), x, **kwargs))
+                x = (partes[-1]["il"][-1], partes[-1]["vo"][-1])
+                t = inicio
+            ref = self.switched(t, n, self.handoff(t, *x))
+            janelas.append(ref)
+            t += n * self.t
+            x = (ref["il_avg"][-1], ref["vo_avg"][-1])
+        if t_end > t:
+            partes.append(self.simulate((t, t_end), x, **kwargs))
+        res = {k: np.concatenate([p[k] for p in partes]) if partes else np.zeros(0)
+               for k in ("t", "il", "vo", "dcm")}
+        res["windows"] = janelas
+        return res
+
+    def validate(self, t0, n_periods, x0=None):
+        """
+        Compara o modelo médio com a referência chaveada a partir do mesmo estado, período a período.
+
+        O modelo médio supõe ondulação de vo pequena. No CCM o erro continua pequeno, mas no DCM ele cresce com a
+        ondulação (ex.: um Buck em DCM com 'vo_ripple' de 1.4 % tem erro de iL de 1.7 %; com 45 %, de 28 %), então um
+        'vo_ripple' acima de alguns por cento indica que a concordância com a referência não vale para o modelo.
+
+        :param x0: estado médio em t0; None para simular o modelo médio de 0 até t0 partindo do repouso
+        :return: dicionário com os erros máximos absolutos e relativos (à faixa da grandeza) de iL e vo, e
+                 'vo_ripple', a maior ondulação pico a pico de vo num período da referência relativa à média
+        """
+        if x0 is None:
+            x0 = (0.0, 0.0)
+            if t0 > 0:
+                pre = self.simulate((0.0, t0), x0)
+                x0 = (pre["il"][-1], pre["vo"][-1])
+        ref = self.switched(t0, n_periods, self.handoff(t0, *x0))
+        med = self.simulate((t0, t0 + n_periods * self.t), x0, t_eval=ref["t_avg"], max_step=self.t)
+        res = {}
+        for n in ("il", "vo"):
+            erro = np.abs(med[n] - ref[n + "_avg"])
+            faixa = max(np.abs(ref[n + "_avg"]).max(), 1e-12)
+            res[n + "_abs"] = float(erro.max())
+            res[n + "_rel"] = float(erro.max() / faixa)
+        # período de cada amostra da referência; a ondulação é a faixa de vo dentro do período
+        k = np.minimum(((ref["t"] - t0) / self.t).astype(int), n_periods - 1)
+        vo_max = np.full(n_periods, -np.inf)
+        vo_min = np.full(n_periods, np.inf)
+        np.maximum.at(vo_max, k, ref["vo"])
+        np.minimum.at(vo_min, k, ref["vo"])
+        res["vo_ripple"] = float(np.max((vo_max - vo_min) / np.maximum(np.abs(ref["vo_avg"]), 1e-12)))
+        return res
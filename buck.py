@@ -3,96 +3,146 @@ import sympy as sp
 from scipy.integrate import quad
 import matplotlib.pyplot as plt
 
+import ripple
+from params import Reactive, Input, derived
+from profiling import profiler, instrument
+
 plt.rcParams['figure.figsize'] = [25, 30]
 plt.rcParams['font.size'] = 20
 
 
-class Buck:
+class Buck(Reactive):
+    vi = Input()
+    vo = Input()
+    po = Input()
+    freq = Input()
+    type = Input()
+    percent_duty = Input()
+    percent_delta_il = Input()
+    percent_delta_vo = Input()
+
+    @instrument
     def __init__(self, vi, vo, po, f, delta_vo, delta_il, dcm=False, percent_duty=1.0, ccm=False):
         """
         Buck Model.
 
+        As grandezas derivadas (D, DT, tx, L, C, iL máx/mín, esforços e formas de onda) são calculadas apenas quando
+        lidas. Alterar uma entrada depois da construção (ex.: 'buck.vi = 60') invalida somente o que depende dela.
+
         :param vi: Tensão de entrada - Vi [Volts]
         :param vo: Tensão de saída - Vo [Volts]
         :param po: Potência desejada para o conversor [W]
         :param f: Frequência de clock deste conversor [Hz]
+        :param delta_vo: Ondulação da tensão de saída, fração de Vo
+        :param delta_il: Ondulação da corrente no indutor, fração de Io
         :param dcm: True, se é do tipo DCM
         :param percent_duty: Porcentagem do Duty CCM que é atribuída ao duty DCM. Caso a escolha seja o CCM, então este
         duty é 1
         :param ccm: True, se é do tipo CCM
         """
+        super().__init__()
         if dcm:
-            self.is_dcm = True
             self.type = 1
-            self.percent_duty = percent_duty
-            self.name = "BUCK DCM"
-            self.tx = 1.0
         elif ccm:
-            self.is_dcm = False
             self.type = 0
-            self.percent_duty = percent_duty
-            self.name = "BUCK CCM"
+        else:
+            raise ValueError("Informe dcm=True ou ccm=True")
+        self.percent_duty = percent_duty
         self.vi = vi
         self.vo = vo
         self.po = po
         self.freq = f
-        self.t = 1 / self.freq
-        self.duty = self.__set_duty()
-        self.__DT__ = self.t * self.duty
-        self.io = self.__set_io()
-        self.res = self.po / (self.io ** 2)
+        self.percent_delta_il = delta_il
+        self.percent_delta_vo = delta_vo
 
-        self.ind = 1.0
-        self.delta_il = delta_il * self.io
-        self.il_max = self.__calc_il_max()
-        self.il_min = self.__calc_il_min()
+    @derived("type")
+    def is_dcm(self):
+        return self.type == 1
 
-        self.cap = 1.0
-        self.delta_vo = delta_vo * self.vo
+    @derived("type")
+    def name(self):
+        return "BUCK DCM" if self.type == 1 else "BUCK CCM"
 
-        self.times = []
-        self._ixt = []
+    @derived("freq")
+    def t(self):
+        return 1 / self.freq
 
-    def __set_duty(self):
+    @derived("vo", "vi", "type", "percent_duty")
+    def duty(self):
         duty = self.vo / self.vi  # Duty CCM
         if self.type == 1:  # Conversor DCM
             duty *= self.percent_duty
         return duty
 
-    def __set_io(self):
-        io = self.po / self.vo  # i = Po / Vo
-        return io
+    @derived("t", "duty")
+    def __DT__(self):
+        return self.t * self.duty
+
+    @derived("po", "vo")
+    def io(self):
+        return self.po / self.vo  # i = Po / Vo
 
-    def __calc_il_max(self):
-        self.tx = self.vi * self.__DT__ / self.vo
+    @derived("po", "io")
+    def res(self):
+        return self.po / (self.io ** 2)
+
+    @derived("percent_delta_il", "io")
+    def delta_il(self):
+        return self.percent_delta_il * self.io
+
+    @derived("percent_delta_vo", "vo")
+    def delta_vo(self):
+        return self.percent_delta_vo * self.vo
+
+    @derived("vi", "vo", "__DT__")
+    def tx(self):
+        return self.vi * self.__DT__ / self.vo
+
+    @derived("type", "io", "delta_il", "vi", "vo", "__DT__", "ind")
+    def il_max(self):
         if self.type == 0:  # CCM
             return self.io + (0.5 * self.delta_il)
         else:  # DCM
             return (self.vi - self.vo) * self.__DT__ / self.ind
 
-    def __calc_il_min(self):
+    @derived("type", "io", "delta_il")
+    def il_min(self):
         if self.type == 1:  # DCM
             return 0.0
         else:  # CCM
             return self.io - (0.5 * self.delta_il)
 
-    def set_ind(self):
-        self._ixt.clear()
+    @derived("type", "vi", "vo", "io", "duty", "t", "delta_il", "__DT__")
+    def ind(self):
         if self.type == 1:  # DCM
-            _l = (self.vi / self.vo) * ((self.vi - self.vo) / self.io) * (pow(self.duty, 2) * self.t / 2)
+            return (self.vi / self.vo) * ((self.vi - self.vo) / self.io) * (pow(self.duty, 2) * self.t / 2)
         else:  # CCM
-            _l = ((self.vi - self.vo) / self.delta_il) * self.__DT__
+            return ((self.vi - self.vo) / self.delta_il) * self.__DT__
 
-        self.ind = _l
-        self.il_max = self.__calc_il_max()
-
-    def set_cap(self):
+    @derived("type", "t", "delta_vo", "vi", "vo", "duty", "ind", "io", "delta_il", "freq")
+    def cap(self):
         if self.type == 1:  # DCM
-            _c_min = (self.t / (4 * self.delta_vo)) * (((self.vi - self.vo) * self.duty * self.t / self.ind) - self.io)
+            return (self.t / (4 * self.delta_vo)) * (((self.vi - self.vo) * self.duty * self.t / self.ind) - self.io)
         else:  # CCM
-            _c_min = (self.delta_il / (self.delta_vo * 8 * self.freq))
-        self.cap = _c_min
+            return (self.delta_il / (self.delta_vo * 8 * self.freq))
 
+    @instrument
+    def set_ind(self):
+        """
+        Mantido por compatibilidade: L é calculado ao ser lido. Desfaz um valor fixado com 'buck.ind = ...'.
+        """
+        self.release("ind")
+        return self.ind
+
+    @instrument
+    def set_cap(self):
+        """
+        Mantido por compatibilidade: C é calculado ao ser lido. Desfaz um valor fixado com 'buck.cap = ...'.
+        """
+        self.release("cap")
+        return self.cap
+
+    @instrument
     def show_info(self):
         print(f"\n===============\t\t{self.name}\t===============")
         print(
@@ -109,28 +159,48 @@ class Buck:
         print(f"\tiLmin\t\t=\t{'{:.3f}'.format(self.il_min)}\t\t[A]")
 
     # PLOT CORRENTE INDUTOR
+    @derived("type", "__DT__", "t", "tx", "il_min", "il_max")
+    def _il_wave(self):
+        if self.type == 0:  # CCM
+            x = [0, self.__DT__, self.t, self.t + self.__DT__, 2 * self.t, 2 * self.t + self.__DT__]
+            y = [self.il_min, self.il_max, self.il_min, self.il_max, self.il_min, self.il_max]
+        else:  # DCM
+            x = [0, self.__DT__, self.tx, self.t, self.t + self.__DT__, self.t + self.tx, 2 * self.t,
+                 2 * self.t + self.__DT__]
+            y = [self.il_min, self.il_max, self.il_min, self.il_min, self.il_max, self.il_min, self.il_min,
+                 self.il_max]
+        return x, y
+
+    @derived("_il_wave", "io")
+    def _ic_wave(self):
+        x, y = self._il_wave
+        return x, np.array(y) - self.io
+
+    @derived("type", "vo", "duty", "t", "tx", "il_max", "il_min", "io", "cap")
+    def _vc_wave(self):
+        """
+        Tensão no capacitor em dois períodos: parábolas obtidas integrando iC (ripple.waveform), com média Vo.
+        """
+        tx = self.tx if self.type == 1 else self.t
+        w = ripple.waveform("buck", self.vo, self.duty, self.t, tx, self.il_max, self.il_min, self.io, self.cap,
+                            periods=2)
+        return w["x"], w["vc"]
+
     def __plot_il_ccm(self):
-        x = [0, self.__DT__, self.t, self.t + self.__DT__, 2 * self.t, 2 * self.t + self.__DT__]
-        y = [self.il_min, self.il_max, self.il_min, self.il_max, self.il_min, self.il_max]
+        x, y = self._il_wave
         plt.plot(x, y, color='b', linewidth=3, label=self.name)
         plt.title('Corrente no Indutor - CCM')
         plt.ylabel('I_L [A]')
         plt.xlabel('Tempo [s]')
         plt.grid(True)
-        self.__x_il_ccm = x
-        self.__y_il_ccm = y
 
     def __plot_il_dcm(self):
-        x = [0, self.__DT__, self.tx, self.t, self.t + self.__DT__, self.t + self.tx, 2 * self.t,
-             2 * self.t + self.__DT__]
-        y = [self.il_min, self.il_max, self.il_min, self.il_min, self.il_max, self.il_min, self.il_min, self.il_max]
+        x, y = self._il_wave
         plt.plot(x, y, color='b', linewidth=3, label=self.name)
         plt.title('Corrente no Indutor - DCM')
         plt.ylabel('I_L [A]')
         plt.xlabel('Tempo [s]')
         plt.grid(True)
-        self.__x_il_dcm = x
-        self.__y_il_dcm = y
 
     def plot_i_ind(self):
         if self.type == 0:
@@ -389,10 +459,7 @@ class Buck:
     def __plot_ic_ccm(self):
         # self.__plot_il_ccm()
         # plt.clf()
-        x = self.__x_il_ccm
-        y = np.array(self.__y_il_ccm) - self.io
-        self.__x_ic_ccm = x
-        self.__y_ic_ccm = y
+        x, y = self._ic_wave
         plt.plot(x, y, color='b', linewidth=3, label=self.name, )
         plt.title('Corrente no CAPACITOR - CCM')
         plt.ylabel('I_C [A]')
@@ -402,10 +469,7 @@ class Buck:
     def __plot_ic_dcm(self):
         # self.__plot_il_dcm()
         # plt.clf()
-        x = self.__x_il_dcm
-        y = np.array(self.__y_il_dcm) - self.io
-        self.__x_ic_dcm = x
-        self.__y_ic_dcm = y
+        x, y = self._ic_wave
         plt.plot(x, y, color='b', linewidth=3, label=self.name)
         plt.title('Corrente no CAPACITOR - DCM')
         plt.ylabel('I_C [A]')
@@ -422,10 +486,7 @@ class Buck:
 
     # PLOT TENSÃO CAPACITOR
     def __plot_vc_ccm(self):
-        # self.__plot_ic_ccm()
-        # plt.clf()
-        x = self.__x_ic_ccm
-        y = np.ones(len(x)) * self.io * self.res
+        x, y = self._vc_wave
         plt.plot(x, y, color='b', linewidth=3, label=self.name)
         plt.title('Tensão no CAPACITOR - CCM')
         plt.ylabel('V_C [V]')
@@ -433,10 +494,7 @@ class Buck:
         plt.grid(True)
 
     def __plot_vc_dcm(self):
-        # self.__plot_ic_dcm()
-        # plt.clf()
-        x = self.__x_ic_dcm
-        y = np.ones(len(x)) * self.io * self.res
+        x, y = self._vc_wave
         plt.plot(x, y, color='b', linewidth=3, label=self.name)
         plt.title('Tensão no CAPACITOR - DCM')
         plt.ylabel('V_C [V]')
@@ -445,7 +503,7 @@ class Buck:
 
     def plot_v_c(self):
         """
-        Método ainda não implementado!
+        Tensão no capacitor: Vo mais a ondulação exata (parabólica) de ripple.waveform.
         """
         if self.type == 0:
             self.__plot_vc_ccm()
@@ -458,10 +516,8 @@ class Buck:
     def __plot_ir_ccm(self):
         # self.__plot_il_ccm()
         # plt.clf()
-        x = self.__x_il_ccm
-        y = np.ones(len(self.__y_il_ccm)) * self.io
-        self.__x_ir_ccm = x
-        self.__y_ir_ccm = y
+        x, _ = self._il_wave
+        y = np.ones(len(x)) * self.io
         plt.plot(x, y, color='b', linewidth=3, label=self.name, )
         plt.title('Corrente no RESISTOR - CCM')
         plt.ylabel('I_R [A]')
@@ -471,10 +527,8 @@ class Buck:
     def __plot_ir_dcm(self):
         # self.__plot_il_dcm()
         # plt.clf()
-        x = self.__x_il_dcm
-        y = np.ones(len(self.__y_il_dcm)) * self.io
-        self.__x_ir_dcm = x
-        self.__y_ir_dcm = y
+        x, _ = self._il_wave
+        y = np.ones(len(x)) * self.io
         plt.plot(x, y, color='b', linewidth=3, label=self.name)
         plt.title('Corrente no RESISTOR - DCM')
         plt.ylabel('I_R [A]')
@@ -491,10 +545,8 @@ class Buck:
 
     # PLOT TENSÃO RESISTOR
     def __plot_vr_ccm(self):
-        # self.__plot_ic_ccm()
-        # plt.clf()
-        x = self.__x_ic_ccm
-        y = np.ones(len(x)) * self.io * self.res
+        # resistor em paralelo com o capacitor (sem ESR no modelo): mesma tensão
+        x, y = self._vc_wave
         plt.plot(x, y, color='b', linewidth=3, label=self.name)
         plt.title('Tensão no RESISTOR - CCM')
         plt.ylabel('V_R [V]')
@@ -502,10 +554,7 @@ class Buck:
         plt.grid(True)
 
     def __plot_vr_dcm(self):
-        # self.__plot_ic_dcm()
-        # plt.clf()
-        x = self.__x_ic_dcm
-        y = np.ones(len(x)) * self.io * self.res
+        x, y = self._vc_wave
         plt.plot(x, y, color='b', linewidth=3, label=self.name)
         plt.title('Tensão no RESISTOR - DCM')
         plt.ylabel('V_R [V]')
@@ -520,7 +569,29 @@ class Buck:
         plt.legend()
         plt.show()
 
+    @instrument
+    def plot_graphs(self, q):
+        """
+        Plota uma grandeza no eixo atual, sem chamar plt.show() (mesma interface do BuckBoost).
+
+        :param q: 'i' ou 'v' seguido do elemento: 's' (MOSFET), 'l', 'd', 'c' ou 'r'. Ex.: 'il', 'vs'.
+        """
+        ccm = self.type == 0
+        plots = {'is': (self.__plot_im_ccm, self.__plot_im_dcm),
+                 'vs': (self.__plot_vm_ccm, self.__plot_vm_dcm),
+                 'il': (self.__plot_il_ccm, self.__plot_il_dcm),
+                 'vl': (self.__plot_vl_ccm, self.__plot_vl_dcm),
+                 'id': (self.__plot_id_ccm, self.__plot_id_dcm),
+                 'vd': (self.__plot_vd_ccm, self.__plot_vd_dcm),
+                 'ic': (self.__plot_ic_ccm, self.__plot_ic_dcm),
+                 'vc': (self.__plot_vc_ccm, self.__plot_vc_dcm),
+                 'ir': (self.__plot_ir_ccm, self.__plot_ir_dcm),
+                 'vr': (self.__plot_vr_ccm, self.__plot_vr_dcm)}
+        if q in plots:
+            return plots[q][0 if ccm else 1]()
+
     # PLOT TOTAL
+    @instrument
     def plot_all(self):
         if self.type == 0:  # CCM
             # MOSFET
@@ -579,6 +650,7 @@ class Buck:
         plt.legend()
         plt.show()
 
+    @instrument
     def calc_vd_max(self):
         """
         Vd_max = Vi
@@ -590,11 +662,15 @@ class Buck:
         else:
             return self.vi
 
+    @instrument
     def calc_id_avg(self):
         """
         Integrei as equações de iL nos intervalos em que o diodo atua.
         """
+        return self._id_avg
 
+    @derived("il_max", "vo", "__DT__", "ind", "is_dcm", "tx", "t")
+    def _id_avg(self):
         il_max = self.il_max
         vo = self.vo
         dt = self.__DT__
@@ -604,14 +680,15 @@ class Buck:
             return il_max - (vo * (t - dt) / ind)
 
         if self.is_dcm:
-            integral, erro = quad(func, self.__DT__, self.tx)
+            integral, erro = quad(profiler.counted(func), self.__DT__, self.tx)
 
             return integral / self.t
         else:
-            integral, erro = quad(func, self.__DT__, self.t)
+            integral, erro = quad(profiler.counted(func), self.__DT__, self.t)
 
             return integral / self.t
 
+    @instrument
     def calc_id_max(self):
         """
         Se CCM:
@@ -627,6 +704,7 @@ class Buck:
         else:
             return self.il_max
 
+    @instrument
     def calc_vds_max(self):
         """
         Vds_max = Vi
@@ -638,6 +716,7 @@ class Buck:
         else:
             return self.vi
 
+    @instrument
     def calc_ids_rms(self):
         """
         Se CCM:
@@ -652,6 +731,10 @@ class Buck:
 
         :return: Ids_rms
         """
+        return self._ids_rms
+
+    @derived("il_min", "vo", "vi", "__DT__", "ind", "is_dcm", "t")
+    def _ids_rms(self):
         il_min = self.il_min
         vo = self.vo
         vi = self.vi
@@ -662,15 +745,16 @@ class Buck:
             def func(t):
                 return ((vi - vo) * t / ind) ** 2
 
-            integral, erro = quad(func, 0, self.__DT__)
+            integral, erro = quad(profiler.counted(func), 0, self.__DT__)
             return sp.sqrt(integral / self.t)
         else:
             def func(t):
                 return (il_min + ((vi - vo) * t / ind)) ** 2
 
-            integral, erro = quad(func, 0, self.__DT__)
+            integral, erro = quad(profiler.counted(func), 0, self.__DT__)
             return sp.sqrt(integral / self.t)
 
+    @instrument
     def calc_ids_max(self):
         """
         Se CCM:
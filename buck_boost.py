@@ -1,11 +1,14 @@
 import sympy as sp
 import matplotlib.pyplot as plt
 
+from profiling import profiler, instrument
+
 plt.rcParams['figure.figsize'] = [25, 30]
 plt.rcParams['font.size'] = 20
 
 
 class BuckBoost:
+    @instrument
     def __init__(self, vi, vo, po, freq, percent_delt_il, percent_delt_vo, is_dcm):
         self.vi = vi
         self.vo = vo
@@ -71,6 +74,7 @@ class BuckBoost:
     def __calc_delt_il(self):
         return self.il * self.delt_il_percent
 
+    @instrument
     def set_ind(self):
         if self.is_dcm:
             self.L = self.vi * pow(self.d, 2) * self.t / (2 * self.ii)
@@ -81,6 +85,7 @@ class BuckBoost:
             self.info["L"] = self.L
             # return self.L
 
+    @instrument
     def set_cap(self):
         self.C = self.io * self.d * self.t / self.delt_vo
         self.info["C"] = self.C
@@ -104,9 +109,11 @@ class BuckBoost:
 
         self.info["iL_max"] = self.__il_max
 
+    @instrument
     def __il_integral(self):
         t = sp.Symbol("t")
         var = (1 / self.L) * self.vi
+        profiler.count_evals()
 
         return sp.integrate(var, (t, 0, self.__DT__))
 
@@ -325,6 +332,7 @@ class BuckBoost:
             plt.xlabel('Tempo [s]')
             plt.grid(True)
 
+    @instrument
     def plot_graphs(self, q):
         if q == 'is':
             return self.__plot_is()
@@ -347,6 +355,7 @@ class BuckBoost:
         elif q == 'vr':
             return self.__plot_vr()
 
+    @instrument
     def calc_vd_max(self):
         """
         Vd_max = Vi + Vo
@@ -358,6 +367,7 @@ class BuckBoost:
         else:
             return self.vi + self.vo
 
+    @instrument
     def calc_id_avg(self):
         """
         Se CCM:
@@ -378,6 +388,7 @@ class BuckBoost:
 
             return integral / self.t
 
+    @instrument
     def calc_id_max(self):
         """
         Se CCM:
@@ -393,6 +404,7 @@ class BuckBoost:
         else:
             return self.__il_max
 
+    @instrument
     def calc_vds_max(self):
         """
         Vds_max = Vi + Vo
@@ -404,6 +416,7 @@ class BuckBoost:
         else:
             return self.vi + self.vo
 
+    @instrument
     def calc_ids_rms(self):
         """
         Se CCM:
@@ -426,6 +439,7 @@ class BuckBoost:
             integral = (self.il ** 2) * self.__DT__ / self.t
             return sp.sqrt(integral)
 
+    @instrument
     def calc_ids_max(self):
         """
         Se CCM:
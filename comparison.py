@@ -0,0 +1,214 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+TOPOLOGIES = ("buck", "buckboost")
+
+COLUMNS = ["topology", "dcm", "vi", "vo", "po", "f", "t", "d", "tx", "io", "ind", "cap", "il_max", "il_min",
+           "ids_rms", "ids_max", "id_avg", "id_max", "vds_max", "vd_max", "lc"]
+
+UNITS = {"vi": "V", "vo": "V", "po": "W", "f": "Hz", "t": "s", "tx": "s", "io": "A", "ind": "H", "cap": "F",
+         "il_max": "A", "il_min": "A", "ids_rms": "A", "ids_max": "A", "id_avg": "A", "id_max": "A",
+         "vds_max": "V", "vd_max": "V", "lc": "H.F"}
+
+
+def _metrics(conv):
+    """
+    Extrai as métricas de um objeto Buck ou BuckBoost (mesmas colunas de symbolic.design).
+    """
+    if hasattr(conv, "info"):  # BuckBoost
+        il_max = conv.info["iL_max"]
+        il_min = conv.info["iL_min"]
+        # a classe guarda em tx a duração da condução do diodo; a coluna é o instante em que iL se anula
+        linha = {"topology": 1, "dcm": conv.is_dcm, "f": conv.f, "d": conv.d, "ind": conv.L, "cap": conv.C,
+                 "tx": conv.d * conv.t + conv.tx if conv.is_dcm else conv.t}
+    else:  # Buck
+        il_max = conv.il_max
+        il_min = conv.il_min
+        linha = {"topology": 0, "dcm": conv.is_dcm, "f": conv.freq, "d": conv.duty, "ind": conv.ind, "cap": conv.cap,
+                 "tx": conv.tx if conv.is_dcm else conv.t}
+    linha.update({"vi": conv.vi, "vo": conv.vo, "po": conv.po, "t": conv.t, "io": conv.io,
+                  "il_max": il_max, "il_min": il_min,
+                  "ids_rms": conv.calc_ids_rms(), "ids_max": conv.calc_ids_max(), "id_avg": conv.calc_id_avg(),
+                  "id_max": conv.calc_id_max(), "vds_max": conv.calc_vds_max(), "vd_max": conv.calc_vd_max()})
+    return linha
+
+
+class DesignTable:
+    def __init__(self, columns, labels=None):
+        """
+        Tabela colunar de projetos: um array NumPy por métrica, uma linha por projeto.
+
+        Filtros e rankings operam sobre as colunas inteiras, sem laço em Python, e devolvem novas tabelas que
+        guardam em 'index' a posição de cada linha na tabela original.
+
+        :param columns: dicionário {métrica: array}, todos com o mesmo comprimento. 'lc' é calculada quando houver
+        'ind' e 'cap'.
+        :param labels: nomes dos projetos (opcional, usado nas legendas)
+        """
+        self.columns = {n: np.asarray(v) for n, v in columns.items()}
+        tamanhos = {len(v) for v in self.columns.values()}
+        if len(tamanhos) > 1:
+            raise ValueError("todas as colunas devem ter o mesmo comprimento")
+        self.size = tamanhos.pop() if tamanhos else 0
+        if "lc" not in self.columns and "ind" in self.columns and "cap" in self.columns:
+            self.columns["lc"] = self.columns["ind"] * self.columns["cap"]
+        self.columns.setdefault("index", np.arange(self.size))
+        self.labels = labels
+
+    @classmethod
+    def from_converters(cls, *convs):
+        """
+        :param convs: objetos Buck e/ou BuckBoost, em qualquer número
+        """
+        linhas = [_metrics(c) for c in convs]
+        columns = {n: np.array([float(linha[n]) for linha in linhas]) for n in COLUMNS if n != "lc"}
+        columns["topology"] = columns["topology"].astype(np.int8)
+        columns["dcm"] = columns["dcm"] != 0
+        labels = [f"{TOPOLOGIES[linha['topology']].upper()} {'DCM' if linha['dcm'] else 'CCM'} #{i}"
+                  for i, linha in enumerate(linhas)]
+        return cls(columns, labels)
+
+    @classmethod
+    def from_design(cls, topology, res, **inputs):
+        """
+        :param res: saídas de symbolic.design, de uma varredura (Sweep.evaluate) ou colunas de um ResultStore
+        :param inputs: entradas ausentes em res (ex.: vi, vo, po, f), escalares ou arrays
+        """
+        columns = dict(inputs)
+        columns.update(res)
+        n = max(np.size(v) for v in columns.values())
+        columns = {k: np.broadcast_to(np.asarray(v), (n,)) for k, v in columns.items()}
+        columns.setdefault("topology", np.full(n, TOPOLOGIES.index(topology), dtype=np.int8))
+        if "f" not in columns and "t" in columns:
+            columns["f"] = 1 / columns["t"]
+        return cls(columns)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def take(self, idx):
+        """
+        :param idx: índices ou máscara booleana
+        :return: nova DesignTable só com as linhas selecionadas
+        """
+        idx = np.asarray(idx)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        labels = [self.labels[i] for i in idx] if self.labels is not None else None
+        return DesignTable({n: v[idx] for n, v in self.columns.items()}, labels)
+
+    def filter(self, mask=None, **limits):
+        """
+        Ex.: table.filter(il_max=(None, 5.0), dcm=False, ids_rms=(1.0, 3.0))
+
+        :param mask: máscara booleana adicional (opcional)
+        :param limits: {métrica: (mín, máx)} com None para limite aberto, ou um valor exato
+        :return: DesignTable com as linhas que atendem a todos os limites
+        """
+        ok = np.ones(self.size, dtype=bool) if mask is None else np.asarray(mask, dtype=bool).copy()
+        for nome, lim in limits.items():
+            v = self.columns[nome]
+            if isinstance(lim, tuple):
+                lo, hi = lim
+                if lo is not None:
+                    ok &= v >= lo
+                if hi is not None:
+                    ok &= v <= hi
+            else:
+                ok &= v == lim
+        return self.take(ok)
+
+    def top_k(self, metric, k=10, largest=False):
+        """
+        Os k melhores projetos segundo uma métrica (padrão: os menores valores, ex.: 'lc' ou 'ids_rms').
+
+        A seleção usa np.argpartition (linear em n) e só os k escolhidos são ordenados. Linhas com NaN ficam
+        por último.
+
+        :return: DesignTable com k linhas, do melhor para o pior
+        """
+        v = np.asarray(self.columns[metric], dtype=float)
+        chave = -v if largest else v
+        chave = np.where(np.isnan(chave), np.inf, chave)
+        k = min(k, self.size)
+        if k <= 0:
+            return self.take(np.zeros(0, dtype=int))
+        idx = np.argpartition(chave, k - 1)[:k] if k < self.size else np.arange(self.size)
+        return self.take(idx[np.argsort(chave[idx], kind="stable")])
+
+    def rank(self, metric, largest=False):
+        """
+        :return: posição (0 = melhor) de cada linha segundo a métrica
+        """
+        v = np.asarray(self.columns[metric], dtype=float)
+        chave = np.where(np.isnan(v), np.inf, -v if largest else v)
+        pos = np.empty(self.size, dtype=int)
+        pos[np.argsort(chave, kind="stable")] = np.arange(self.size)
+        return pos
+
+    def label(self, i):
+        if self.labels is not None:
+            return self.labels[i]
+        modo = "DCM" if "dcm" in self.columns and self.columns["dcm"][i] else "CCM"
+        topo = TOPOLOGIES[int(self.columns["topology"][i])].upper() if "topology" in self.columns else ""
+        return f"{topo} {modo} #{int(self.columns['index'][i])}".strip()
+
+    def show_info(self, metrics=None, max_rows=20):
+        metrics = metrics or [n for n in COLUMNS if n in self.columns and n != "topology"]
+        n = min(self.size, max_rows)
+        print(f"\n===============\t\tCOMPARAÇÃO ({self.size} projetos)\t===============")
+        print("\t" + "\t\t".join(self.label(i) for i in range(n)))
+        for m in metrics:
+            v = self.columns[m][:n]
+            unidade = f"[{UNITS[m]}]" if m in UNITS else ""
+            print(f"\t{m}\t\t" + "\t".join("{:2.3e}".format(float(x)) for x in v) + f"\t{unidade}")
+        if self.size > n:
+            print(f"\t... (+{self.size - n} projetos)")
+
+    def waveforms(self, q="il", periods=2):
+        """
+        Formas de onda lineares por partes de cada linha, a partir de d, t, tx, il_min e il_max.
+
+        :param q: 'il' (indutor), 'is' (MOSFET) ou 'id' (diodo)
+        :return: (x, y) arrays (n_linhas, n_pontos)
+        """
+        t = self.columns["t"][:, None]
+        dt = self.columns["d"][:, None] * t
+        tx = self.columns["tx"][:, None]
+        lo = self.columns["il_min"][:, None]
+        hi = self.columns["il_max"][:, None]
+        zero = np.zeros_like(lo)
+        # um período: subida [0, DT], descida [DT, tx], patamar [tx, T]
+        x = np.concatenate([zero, dt, dt, tx, tx, t], axis=1)
+        if q == "il":
+            y = np.concatenate([lo, hi, hi, lo, lo, lo], axis=1)
+        elif q == "is":
+            y = np.concatenate([lo, hi, zero, zero, zero, zero], axis=1)
+        elif q == "id":
+            y = np.concatenate([zero, zero, hi, lo, zero, zero], axis=1)
+        else:
+            raise ValueError(f"grandeza desconhecida: {q}")
+        x = np.concatenate([x + k * t for k in range(periods)], axis=1)
+        y = np.tile(y, (1, periods))
+        return x, y
+
+    def plot(self, q="il", metric=None, k=5, largest=False):
+        """
+        Sobrepõe as formas de onda dos projetos da tabela (ou dos k melhores segundo 'metric').
+
+        :param q: 'il', 'is' ou 'id'
+        """
+        tabela = self.top_k(metric, k, largest) if metric else self
+        x, y = tabela.waveforms(q)
+        titulos = {"il": "Corrente no Indutor", "is": "Corrente no MOSFET", "id": "Corrente no Diodo"}
+        for i in range(len(tabela)):
+            plt.plot(x[i], y[i], linewidth=3, label=tabela.label(i))
+        plt.title(titulos[q] + (f" - melhores por {metric}" if metric else ""))
+        plt.ylabel(f"I_{q[1:].upper()} [A]")
+        plt.xlabel('Tempo [s]')
+        plt.grid(True)
+        plt.legend()
+        plt.show()
@@ -1,21 +1,48 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
+from comparison import DesignTable
+from profiling import instrument
+
 
 class Converters:
-    def __init__(self, ccm, dcm):
-        self.__convs = {"CCM": ccm.info,
-                        "DCM": dcm.info}
+    def __init__(self, *convs, ccm=None, dcm=None):
+        """
+        Comparação entre qualquer número de conversores Buck/BuckBoost.
+
+        :param convs: conversores a comparar
+        :param ccm: conversor CCM (forma antiga, equivalente a passá-lo em convs)
+        :param dcm: conversor DCM (forma antiga, equivalente a passá-lo em convs)
+        """
+        self.convs = list(convs) + [c for c in (ccm, dcm) if c is not None]
+        if not self.convs:
+            raise ValueError("Informe ao menos um conversor")
         self.ccm = ccm
         self.dcm = dcm
+        self.table = DesignTable.from_converters(*self.convs)
+
+    @instrument
+    def show_info(self, metrics=None):
+        self.table.show_info(metrics)
 
-    def show_info(self):
-        inf = pd.DataFrame(self.__convs)
-        print(inf.head(20))
+    def filter(self, mask=None, **limits):
+        """
+        Ver DesignTable.filter.
+        """
+        return self.table.filter(mask, **limits)
+
+    def top_k(self, metric, k=3, largest=False):
+        """
+        Os k melhores conversores segundo uma métrica da tabela (ex.: 'lc', 'ids_rms').
+
+        :return: lista de conversores, do melhor para o pior
+        """
+        return [self.convs[i] for i in self.table.top_k(metric, k, largest)["index"]]
 
+    @instrument
     def plot(self, L=False, C=False, D=False, R=False, S=False):
         """
         Plotar formas de ondas resultantes. Passe apenas um parâmetro a ser plotado como 'True'.
+        Cada conversor ocupa uma coluna: corrente em cima, tensão embaixo.
         :param L: 'True' se desejar plotar o comportamento do INDUTOR.
         :param C: 'True' se desejar plotar o comportamento do CAPACITOR.
         :param D: 'True' se desejar plotar o comportamento do DIODO.
@@ -36,12 +63,10 @@ class Converters:
         else:
             print("\n\nPARA PLOTAR AS FORMAS DE ONDA, PASSE UM PARÂMETRO CONFORME A DOCSTRING DESTE MÉTODO. ")
             return None
-        plt.subplot(2, 2, 1)
-        self.ccm.plot_graphs(q='i' + c)
-        plt.subplot(2, 2, 3)
-        self.ccm.plot_graphs(q='v' + c)
-        plt.subplot(2, 2, 2)
-        self.dcm.plot_graphs(q='i' + c)
-        plt.subplot(2, 2, 4)
-        self.dcm.plot_graphs(q='v' + c)
+        n = len(self.convs)
+        for k, conv in enumerate(self.convs):
+            plt.subplot(2, n, k + 1)
+            conv.plot_graphs(q='i' + c)
+            plt.subplot(2, n, n + k + 1)
+            conv.plot_graphs(q='v' + c)
         plt.show()
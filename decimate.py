@@ -0,0 +1,195 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+def _visible(n, x, t0, dt, x_range):
+    """
+    :return: (i0, i1) faixa de índices que cobre x_range, com um ponto de folga de cada lado
+    """
+    if x_range is None:
+        return 0, n
+    lo, hi = x_range
+    if x is None:
+        i0 = int(np.floor((lo - t0) / dt)) - 1
+        i1 = int(np.ceil((hi - t0) / dt)) + 2
+    else:
+        i0 = int(np.searchsorted(x, lo, side="left")) - 1
+        i1 = int(np.searchsorted(x, hi, side="right")) + 1
+    return max(i0, 0), min(max(i1, 0), n)
+
+
+def _x_at(x, t0, dt, idx):
+    return np.asarray(x[idx], dtype=float) if x is not None else t0 + dt * idx
+
+
+def minmax(y, n_buckets, x=None, t0=0.0, dt=1.0, x_range=None):
+    """
+    Decimação mín/máx: em cada balde de índices consecutivos guarda o menor e o maior ponto, na ordem em que
+    ocorrem. Picos e degraus são preservados, e com um balde por pixel o traçado é idêntico ao do sinal inteiro.
+
+    :param y: amostras (array ou memmap), x crescente
+    :param n_buckets: número de baldes (tipicamente a largura do eixo em pixels)
+    :param x: instantes das amostras; None para amostragem uniforme t0 + k dt
+    :param x_range: (x_min, x_max) visível; None para o sinal todo
+    :return: (x, y) decimados, no máximo 2 n_buckets pontos
+    """
+    i0, i1 = _visible(len(y), x, t0, dt, x_range)
+    n = i1 - i0
+    if n <= 2 * n_buckets:
+        idx = np.arange(i0, i1)
+        return _x_at(x, t0, dt, idx), np.asarray(y[i0:i1], dtype=float)
+
+    passo = n // n_buckets
+    cheio = passo * n_buckets
+    bloco = np.asarray(y[i0:i0 + cheio]).reshape(n_buckets, passo)
+    base = i0 + np.arange(n_buckets) * passo
+    i_min = base + bloco.argmin(axis=1)
+    i_max = base + bloco.argmax(axis=1)
+    if cheio < n:  # resto no último balde
+        resto = np.asarray(y[i0 + cheio:i1])
+        i_min = np.append(i_min, i0 + cheio + resto.argmin())
+        i_max = np.append(i_max, i0 + cheio + resto.argmax())
+    idx = np.stack([np.minimum(i_min, i_max), np.maximum(i_min, i_max)], axis=1).ravel()
+    # o primeiro e o último ponto visíveis ficam, para as bordas do traçado não saltarem
+    idx = np.concatenate(([i0], idx, [i1 - 1]))
+    return _x_at(x, t0, dt, idx), np.asarray(y[idx], dtype=float)
+
+
+def lttb(y, n_out, x=None, t0=0.0, dt=1.0, x_range=None):
+    """
+    Largest-Triangle-Three-Buckets: escolhe em cada balde o ponto que forma o maior triângulo com o ponto
+    escolhido no balde anterior e a média do balde seguinte. Preserva a forma visual com n_out pontos.
+
+    :param n_out: número de pontos de saída
+    :return: (x, y) decimados
+    """
+    i0, i1 = _visible(len(y), x, t0, dt, x_range)
+    n = i1 - i0
+    if n <= n_out or n_out < 3:
+        idx = np.arange(i0, i1)
+        return _x_at(x, t0, dt, idx), np.asarray(y[i0:i1], dtype=float)
+
+    # baldes internos sobre [i0 + 1, i1 - 1); primeiro e último pontos ficam fixos
+    bordas = (i0 + 1 + np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64)
+    bordas[-1] = i1 - 1
+    medias_x = np.empty(n_out - 2)
+    medias_y = np.empty(n_out - 2)
+    for b in range(n_out - 2):
+        seg = slice(bordas[b], max(bordas[b + 1], bordas[b] + 1))
+        medias_y[b] = np.mean(y[seg])
+        medias_x[b] = np.mean(_x_at(x, t0, dt, np.arange(seg.start, seg.stop)))
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = i0, i1 - 1
+    ax_, ay_ = _x_at(x, t0, dt, np.array([i0]))[0], float(y[i0])
+    for b in range(n_out - 2):
+        a, c = bordas[b], max(bordas[b + 1], bordas[b] + 1)
+        if b + 1 < n_out - 2:
+            cx, cy = medias_x[b + 1], medias_y[b + 1]
+        else:
+            cx, cy = _x_at(x, t0, dt, np.array([i1 - 1]))[0], float(y[i1 - 1])
+        bx = _x_at(x, t0, dt, np.arange(a, c))
+        by = np.asarray(y[a:c], dtype=float)
+        area = np.abs((ax_ - cx) * (by - ay_) - (ax_ - bx) * (cy - ay_))
+        k = int(area.argmax())
+        idx[b + 1] = a + k
+        ax_, ay_ = bx[k], by[k]
+    return _x_at(x, t0, dt, idx), np.asarray(y[idx], dtype=float)
+
+
+def coarse_minmax(y, block=1024, chunk=1 << 24):
+    """
+    Nível grosso para sinais muito longos: índices do mínimo e do máximo de cada bloco de 'block' amostras, em
+    ordem temporal. Calculado uma vez, em fatias, e reaproveitado em todas as vistas amplas.
+
+    :return: array de índices (2 n_blocos,)
+    """
+    n = len(y)
+    partes = []
+    for s in range(0, n, chunk):
+        e = min(s + chunk, n)
+        cheio = (e - s) // block * block
+        if cheio:
+            b = np.asarray(y[s:s + cheio]).reshape(-1, block)
+            base = s + np.arange(b.shape[0]) * block
+            i_min, i_max = base + b.argmin(axis=1), base + b.argmax(axis=1)
+            partes.append(np.stack([np.minimum(i_min, i_max), np.maximum(i_min, i_max)], axis=1).ravel())
+        if s + cheio < e:
+            resto = np.asarray(y[s + cheio:e])
+            par = [s + cheio + resto.argmin(), s + cheio + resto.argmax()]
+            partes.append(np.array(sorted(par)))
+    return np.concatenate(partes) if partes else np.zeros(0, dtype=np.int64)
+
+
+METHODS = {"minmax": lambda y, n, **kw: minmax(y, n, **kw),
+           "lttb": lambda y, n, **kw: lttb(y, 2 * n, **kw)}
+
+
+class DecimatedLine:
+    COARSE_MIN = 1 << 22
+
+    def __init__(self, ax, y, x=None, t0=0.0, dt=1.0, method="minmax", pixels=None, block=1024, **kwargs):
+        """
+        Linha do matplotlib que guarda o sinal completo e desenha apenas uma versão decimada da faixa visível.
+        A cada zoom ou deslocamento (xlim_changed) a faixa é decimada de novo, então o custo de desenho depende da
+        largura do eixo em pixels e não do número de amostras.
+
+        :param ax: eixo do matplotlib
+        :param y: amostras (array ou np.memmap; nunca é copiado inteiro)
+        :param x: instantes crescentes; None para amostragem uniforme t0 + k dt
+        :param method: 'minmax' ou 'lttb'
+        :param pixels: número de baldes; padrão: largura do eixo em pixels
+        :param block: tamanho do bloco do nível grosso (coarse_minmax), usado em sinais com mais de
+        COARSE_MIN amostras quando a vista cobre mais de 'block' amostras por balde
+        :param kwargs: repassados a ax.plot (color, linewidth, label, ...)
+        """
+        self.ax = ax
+        self.y = y
+        self.x = x
+        self.t0 = t0
+        self.dt = dt
+        self.method = METHODS[method]
+        self.pixels = pixels
+        self.block = block
+        self.__coarse = None
+        if len(y) > self.COARSE_MIN:
+            idx = coarse_minmax(y, block)
+            self.__coarse = (_x_at(x, t0, dt, idx), np.asarray(y[idx], dtype=float))
+        xd, yd = self.__decimate(None)
+        self.line, = ax.plot(xd, yd, **kwargs)
+        ax.set_xlim(self.x_span())
+        ax.callbacks.connect("xlim_changed", self.update)
+
+    def x_span(self):
+        if self.x is None:
+            return self.t0, self.t0 + self.dt * (len(self.y) - 1)
+        return float(self.x[0]), float(self.x[-1])
+
+    def __buckets(self):
+        if self.pixels:
+            return int(self.pixels)
+        return max(int(self.ax.get_window_extent().width), 100)
+
+    def __decimate(self, x_range):
+        n = self.__buckets()
+        if self.__coarse is not None:
+            i0, i1 = _visible(len(self.y), self.x, self.t0, self.dt, x_range)
+            if i1 - i0 > n * self.block:
+                xc, yc = self.__coarse
+                return self.method(yc, n, x=xc, x_range=x_range)
+        return self.method(self.y, n, x=self.x, t0=self.t0, dt=self.dt, x_range=x_range)
+
+    def update(self, ax=None):
+        xd, yd = self.__decimate(self.ax.get_xlim())
+        self.line.set_data(xd, yd)
+        self.ax.figure.canvas.draw_idle()
+
+
+def plot(y, x=None, t0=0.0, dt=1.0, ax=None, method="minmax", pixels=None, block=1024, **kwargs):
+    """
+    Atalho para DecimatedLine no eixo atual.
+
+    :return: DecimatedLine
+    """
+    return DecimatedLine(ax or plt.gca(), y, x=x, t0=t0, dt=dt, method=method, pixels=pixels, block=block,
+                         **kwargs)
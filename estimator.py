@@ -0,0 +1,366 @@
+import numpy as np
+
+ON, OFF, IDLE = 0, 1, 2
+
+
+class _InformationRLS:
+    def __init__(self, n, forgetting, reg=1e-12):
+        """
+        Mínimos quadrados recursivos com esquecimento exponencial na forma de informação: guarda
+        A = soma lambda^k phi phi^T e b = soma lambda^k phi y, então um bloco inteiro de regressores entra de uma
+        vez (vetorizado) e theta = A^-1 b.
+
+        Com ruído de medição nos regressores o LS comum encolhe os coeficientes; 'q' acumula a variância do ruído
+        de cada regressor (em unidades de sigma^2) e theta(sigma2) desconta sigma2 * diag(q) de A (LS com
+        compensação de viés).
+        """
+        self.forgetting = forgetting
+        self.a = np.zeros((n, n))
+        self.q = np.zeros(n)
+        self.b = np.zeros(n)
+        self.yy = 0.0
+        self.weight = 0.0
+        self.reg = reg
+
+    def update(self, phi, y, noise=None):
+        """
+        :param phi: (m, n) regressores em ordem temporal
+        :param y: (m,) observações
+        :param noise: (m, n) variância do ruído de cada regressor, em unidades de sigma^2 (None = sem ruído)
+        """
+        m = len(y)
+        if not m:
+            return
+        w = self.forgetting ** np.arange(m - 1, -1, -1, dtype=float)
+        decai = self.forgetting ** m
+        self.a = decai * self.a + (phi * w[:, None]).T @ phi
+        self.b = decai * self.b + (phi * w[:, None]).T @ y
+        self.q = decai * self.q + (0.0 if noise is None else w @ noise)
+        self.yy = decai * self.yy + float(np.sum(w * y * y))
+        self.weight = decai * self.weight + float(w.sum())
+
+    def theta(self, sigma2=0.0):
+        a = self.a - sigma2 * np.diag(self.q)
+        escala = np.maximum(np.diag(a), 1e-300)
+        a = a / np.sqrt(np.outer(escala, escala))
+        t = np.linalg.solve(a + self.reg * np.eye(len(a)), self.b / np.sqrt(escala))
+        return t / np.sqrt(escala)
+
+    def residual(self, sigma2=0.0):
+        """
+        Resíduo RMS ponderado das observações.
+        """
+        t = self.theta(sigma2)
+        sse = self.yy - 2 * t @ self.b + t @ self.a @ t
+        return float(np.sqrt(max(sse, 0.0) / self.weight)) if self.weight > 0 else np.nan
+
+
+class WaveformEstimator:
+    def __init__(self, topology, fs, vi=None, forgetting=0.999, half_window=2, trim=3, min_samples=6,
+                 i_zero=None, max_segment=1 << 20):
+        """
+        Estimador em fluxo de L, C, R, modo, duty e frequência a partir de iL e vo amostrados, consumidos em
+        blocos (memória constante: só a cauda do último intervalo fica entre blocos).
+
+        Cada amostra é classificada como chave ligada (iL subindo), diodo conduzindo (iL descendo) ou parado
+        (|iL| < i_zero, o intervalo entre tx e T do DCM), pela diferença centrada de iL. Em cada intervalo,
+        aparado de 'trim' amostras em cada ponta para fugir das comutações, valem as formas integradas dos modelos:
+
+            L (iL_b - iL_a) = integral de vL dt          (vL = vi - vo ou -vo; BuckBoost: vi ou -vo)
+            integral de iC_in dt = C (vo_b - vo_a) + (1 / R) integral de vo dt
+
+        com iC_in = iL (Buck) ou iL no intervalo do diodo (BuckBoost). Cada intervalo vira uma linha de dois RLS:
+        theta = [1/L] (ou [1/L, vi/L] sem vi medido) e theta = [C, 1/R]. A ESR do capacitor é desprezada. O ruído
+        de vo (estimado pelas segundas diferenças) é descontado no ajuste de C.
+
+        Duty e frequência saem das fronteiras refinadas dos intervalos: a interseção das retas de iL ajustadas aos
+        intervalos vizinhos, ou o cruzamento com zero da reta vizinha ao intervalo parado.
+
+        :param topology: 'buck' ou 'buckboost'
+        :param fs: taxa de amostragem [S/s]
+        :param vi: tensão de entrada [V] (valor fixo); None para estimá-la junto com L
+        :param forgetting: fator de esquecimento por intervalo
+        :param half_window: meia janela (amostras) da diferença centrada que define subida/descida
+        :param trim: amostras descartadas em cada ponta de um intervalo
+        :param min_samples: intervalos mais curtos são juntados ao anterior (ruído)
+        :param i_zero: limiar de corrente nula [A] da classificação; None usa 2 % da excursão de iL do primeiro bloco
+        :param max_segment: maior intervalo (amostras) guardado entre blocos; um intervalo maior (conversor
+                            parado) é descartado e a estimação recomeça no intervalo seguinte
+        """
+        self.topology = topology
+        self.fs = float(fs)
+        self.dt = 1 / self.fs
+        self.vi = vi
+        self.half_window = half_window
+        self.trim = trim
+        self.min_samples = min_samples
+        self.i_zero = i_zero
+        self.max_segment = max_segment
+        self.__rls_l = _InformationRLS(1 if vi is not None else 2, forgetting)
+        self.__rls_c = _InformationRLS(2, forgetting)
+        self.__forgetting = forgetting
+        self.__tail = None
+        self.__first = True
+        self.__noise = np.zeros(2)  # (soma n sigma^2, soma n) do ruído de vo por bloco
+        self.__pending = np.zeros((0, 3))  # (início global, duração, estado) desde a última ligação, em amostras
+        self.__edge = 0.0  # início refinado (fração de amostra) do intervalo guardado na cauda, relativo a ela
+        self.__timing_sums = np.zeros(5)  # somas exponenciais de (peso, período, t_on, t_off, ciclos em DCM)
+        self.periods = 0
+        self.samples = 0
+        self.segments = np.zeros(3, dtype=np.int64)
+
+    def __states(self, il):
+        h = self.half_window
+        d = np.empty(len(il))
+        d[h:-h] = il[2 * h:] - il[:-2 * h]
+        d[:h], d[-h:] = d[h], d[-h - 1]
+        estado = np.where(d > 0, ON, OFF)
+        estado[np.abs(il) < self.i_zero] = IDLE
+        return estado
+
+    def __runs(self, estado):
+        """
+        Intervalos [início, fim) de mesmo estado, com os curtos absorvidos pelo anterior.
+        """
+        for _ in range(2):
+            borda = np.flatnonzero(estado[1:] != estado[:-1]) + 1
+            inicio = np.r_[0, borda]
+            fim = np.r_[borda, len(estado)]
+            curto = (fim - inicio) < self.min_samples
+            curto[0] = False
+            if not curto.any():
+                break
+            # estado de cada intervalo curto passa a ser o do intervalo anterior longo
+            rotulo = estado[inicio]
+            valido = np.where(~curto, np.arange(len(inicio)), 0)
+            rotulo = rotulo[np.maximum.accumulate(valido)]
+            estado = np.repeat(rotulo, fim - inicio)
+        borda = np.flatnonzero(estado[1:] != estado[:-1]) + 1
+        inicio = np.r_[0, borda]
+        fim = np.r_[borda, len(estado)]
+        return inicio, fim, estado[inicio]
+
+    def __edges(self, il, inicio, fim, estado):
+        """
+        Fronteiras dos intervalos com resolução abaixo de uma amostra. A diferença centrada e o limiar i_zero
+        deslocam as bordas (de lados opostos quando as inclinações de subida e descida diferem, e para dentro da
+        subida no DCM), então cada fronteira entre ligado e desligado é a interseção das retas ajustadas aos dois intervalos
+        aparados, e a fronteira com o intervalo parado é onde a reta vizinha cruza o zero.
+
+        :return: (len(inicio) + 1,) posições das fronteiras [amostras do bloco]
+        """
+        k = self.trim
+        a = inicio + k
+        b = fim - 1 - k
+        valido = (b > a) & (estado != IDLE)
+        a, b = np.where(valido, a, 0), np.where(valido, b, 1)
+        # reta iL = alfa + beta n por mínimos quadrados, com as somas acumuladas de iL e n iL
+        n = np.arange(len(il), dtype=float)
+        s_il = np.concatenate([[0.0], np.cumsum(il)])
+        s_nil = np.concatenate([[0.0], np.cumsum(n * il)])
+        m = (b - a + 1).astype(float)
+        centro = 0.5 * (a + b)
+        beta = (s_nil[b + 1] - s_nil[a] - centro * (s_il[b + 1] - s_il[a])) / (m * (m * m - 1) / 12)
+        alfa = (s_il[b + 1] - s_il[a]) / m - beta * centro
+
+        borda = np.r_[inicio, fim[-1]].astype(float)
+        esq, dir_ = np.arange(len(inicio) - 1), np.arange(1, len(inicio))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cruza = (alfa[dir_] - alfa[esq]) / (beta[esq] - beta[dir_])
+            zero_esq = -alfa[esq] / beta[esq]
+            zero_dir = -alfa[dir_] / beta[dir_]
+        x = np.where(valido[esq] & valido[dir_], cruza,
+                     np.where(valido[esq] & (estado[dir_] == IDLE), zero_esq,
+                              np.where(valido[dir_] & (estado[esq] == IDLE), zero_dir, np.nan)))
+        # retas quase paralelas ou ajustes ruins: a fronteira fica dentro dos dois intervalos ou na borda inteira
+        x = np.where(np.isfinite(x), np.clip(x, inicio[esq], fim[dir_] - 1), inicio[dir_])
+        borda[1:-1] = x
+        return borda
+
+    def update(self, il, vo, vi=None):
+        """
+        Consome um bloco de amostras.
+
+        :param il: corrente no indutor [A]
+        :param vo: tensão de saída [V] (módulo, também no BuckBoost)
+        :param vi: tensão de entrada amostrada [V]; None usa o valor fixo do construtor
+        :return: self
+        """
+        il = np.asarray(il, dtype=float)
+        vo = np.asarray(vo, dtype=float)
+        amostrado = vi is not None and np.ndim(vi) > 0
+        vi = self.vi if vi is None else (np.asarray(vi, dtype=float) if amostrado else float(vi))
+        if self.i_zero is None:
+            self.i_zero = 0.02 * float(np.ptp(il))
+        inicio_bloco = self.samples
+        self.samples += len(il)
+        if self.__tail is not None:
+            t_il, t_vo, t_vi = self.__tail
+            inicio_bloco -= len(t_il)
+            il = np.concatenate([t_il, il])
+            vo = np.concatenate([t_vo, vo])
+            if amostrado:
+                vi = np.concatenate([t_vi, vi])
+
+        if len(il) < 2 * self.half_window + 2:
+            self.__tail = (il, vo, vi if amostrado else None)
+            return self
+        inicio, fim, estado = self.__runs(self.__states(il))
+        borda = self.__edges(il, inicio, fim, estado)
+        if not self.__first:
+            borda[0] = self.__edge
+        # o último intervalo pode continuar no próximo bloco; o primeiro do fluxo pode ter começado antes da captura
+        usar = np.ones(len(inicio), dtype=bool)
+        usar[-1] = False
+        if self.__first:
+            usar[0] = False
+            self.__first = False
+        corte = inicio[-1]
+        if len(il) - corte > self.max_segment:
+            self.__tail = None
+            self.__first = True
+            self.__pending = self.__pending[:0]
+        else:
+            self.__tail = (il[corte:], vo[corte:], vi[corte:] if amostrado else None)
+            self.__edge = borda[-2] - corte
+        # ruído branco de vo: as segundas diferenças de um sinal suave são só ruído (variância 6 sigma^2), e a
+        # mediana (de uma amostra a cada 8, que basta) ignora as quinas das comutações
+        d2 = np.abs(vo[2::8] - 2 * vo[1:-1:8] + vo[:-2:8])
+        self.__noise += [len(d2) * (1.4826 * np.median(d2)) ** 2 / 6, len(d2)]
+
+        inicio, fim, estado = inicio[usar], fim[usar], estado[usar]
+        self.__fit(il, vo, vi, inicio, fim, estado)
+        self.__timing(inicio_bloco + borda[:-1][usar], np.diff(borda)[usar], estado)
+        return self
+
+    def __fit(self, il, vo, vi, inicio, fim, estado):
+        a = inicio + self.trim
+        b = fim - 1 - self.trim
+        ok = b > a
+        a, b, estado = a[ok], b[ok], estado[ok]
+        if not len(a):
+            return
+        self.segments += np.bincount(estado, minlength=3)
+        dt = self.dt
+
+        # integral por trapézio acumulada: a integral entre as amostras i e j é S[j] - S[i]
+        def acumulada(x):
+            return np.concatenate([[0.0], np.cumsum(x[1:] + x[:-1])]) * (0.5 * dt)
+
+        s_vo = acumulada(vo)
+        duracao = (b - a) * dt
+        int_vo = s_vo[b] - s_vo[a]
+        delta_il = il[b] - il[a]
+        on = estado == ON
+        off = estado == OFF
+        buck = self.topology == "buck"
+
+        # indutor: só os intervalos em que a chave ou o diodo conduzem
+        sel = on | off
+        if self.__rls_l.a.shape[0] == 1:
+            if np.ndim(vi):
+                s_vi = acumulada(vi)
+                int_vi = s_vi[b] - s_vi[a]
+            else:
+                int_vi = vi * duracao
+            v_l = np.where(on, (int_vi - int_vo) if buck else int_vi, -int_vo)
+            self.__rls_l.update(v_l[sel, None], delta_il[sel])
+        else:
+            phi = np.stack([np.where(on, -int_vo if buck else 0.0, -int_vo), np.where(on, duracao, 0.0)], axis=1)
+            self.__rls_l.update(phi[sel], delta_il[sel])
+
+        # capacitor: cada intervalo dividido ao meio, porque no Buck em CCM vo passa pelo extremo no meio dos
+        # intervalos e a variação de ponta a ponta quase se anula; vo nas pontas é a média de 2 trim + 1 amostras
+        # para não pôr o ruído de medição no regressor
+        k = self.trim
+        media = np.concatenate([[0.0], np.cumsum(vo)])
+        media = (media[2 * k + 1:] - media[:-2 * k - 1]) / (2 * k + 1)
+        m = (a + b) // 2
+        ini = np.concatenate([a, m])
+        fin = np.concatenate([m, b])
+        s_il = acumulada(il)
+        entra = s_il[fin] - s_il[ini]
+        if not buck:
+            entra = np.where(np.concatenate([off, off]), entra, 0.0)
+        phi = np.stack([media[fin - k] - media[ini - k], s_vo[fin] - s_vo[ini]], axis=1)
+        # variância da diferença das duas médias, que se sobrepõem em intervalos curtos
+        w = 2 * k + 1
+        ruido = np.zeros_like(phi)
+        ruido[:, 0] = 2 * np.minimum(fin - ini, w) / w ** 2
+        ordem = np.argsort(ini, kind="stable")
+        self.__rls_c.update(phi[ordem], entra[ordem], ruido[ordem])
+
+    def __timing(self, inicio, duracao, estado):
+        """
+        Período, tempos de condução e presença do intervalo parado em cada ciclo completo (de uma ligação da chave à
+        seguinte). Os intervalos depois da última ligação ficam pendentes para o próximo bloco.
+        """
+        seg = np.concatenate([self.__pending, np.stack([inicio, duracao, estado], axis=1)])
+        liga = np.flatnonzero(seg[:, 2] == ON)
+        if not len(liga):
+            self.__pending = seg
+            return
+        self.__pending = seg[liga[-1]:]
+        if len(liga) < 2:
+            return
+        off = np.concatenate([[0], np.cumsum(np.where(seg[:, 2] == OFF, seg[:, 1], 0))])
+        parado = np.concatenate([[0], np.cumsum(seg[:, 2] == IDLE)])
+        a, b = liga[:-1], liga[1:]
+        periodo = (seg[b, 0] - seg[a, 0]) * self.dt
+        t_on = seg[a, 1] * self.dt
+        t_off = (off[b] - off[a + 1]) * self.dt
+        dcm = (parado[b] - parado[a + 1]) > 0
+        m = len(a)
+        w = self.__forgetting ** np.arange(m - 1, -1, -1, dtype=float)
+        novos = np.array([w.sum(), w @ periodo, w @ t_on, w @ t_off, w @ dcm])
+        self.__timing_sums = self.__forgetting ** m * self.__timing_sums + novos
+        self.periods += m
+
+    def result(self):
+        """
+        :return: dicionário com ind, cap, r, vi (estimado ou o dado), f, d, d2, dcm_fraction, mode ('ccm'/'dcm'),
+                 periods, segments ({on, off, idle}), samples, resíduos RMS dos dois ajustes e vo_noise (desvio
+                 padrão estimado do ruído de vo)
+        """
+        sigma2 = self.__noise[0] / self.__noise[1] if self.__noise[1] else 0.0
+        t_l = self.__rls_l.theta()
+        c, g = self.__rls_c.theta(sigma2)
+        res = {"ind": 1 / t_l[0], "cap": c, "r": 1 / g if g > 0 else np.inf,
+               "vi": self.vi if len(t_l) == 1 else t_l[1] / t_l[0]}
+        peso, periodo, t_on, t_off, dcm = self.__timing_sums
+        if peso > 0:
+            res.update({"f": peso / periodo, "d": t_on / periodo, "d2": t_off / periodo, "dcm_fraction": dcm / peso})
+        else:
+            res.update({"f": np.nan, "d": np.nan, "d2": np.nan, "dcm_fraction": np.nan})
+        res["mode"] = "dcm" if res["dcm_fraction"] > 0.5 else "ccm"
+        res["periods"] = self.periods
+        res["segments"] = dict(zip(("on", "off", "idle"), self.segments.tolist()))
+        res["samples"] = self.samples
+        res["residual_l"] = self.__rls_l.residual()
+        res["residual_c"] = self.__rls_c.residual(sigma2)
+        res["vo_noise"] = float(np.sqrt(sigma2))
+        return res
+
+    def compare(self, conv):
+        """
+        Compara a estimativa com um Buck/BuckBoost dimensionado (set_ind/set_cap).
+
+        :return: {grandeza: (projeto, estimado, erro relativo)}
+        """
+        est = self.result()
+        if hasattr(conv, "info"):  # BuckBoost
+            projeto = {"ind": conv.L, "cap": conv.C, "r": conv.R, "f": conv.f, "d": conv.d}
+        else:
+            projeto = {"ind": conv.ind, "cap": conv.cap, "r": conv.res, "f": conv.freq, "d": conv.duty}
+        return {n: (v, est[n], (est[n] - v) / v) for n, v in projeto.items()}
+
+    def show_info(self, conv=None):
+        res = self.result()
+        print(f"\n===============\t\tESTIMATIVA {self.topology.upper()}\t===============")
+        print(f"\tModo\t\t=\t{res['mode'].upper()} ({'{:.1%}'.format(res['dcm_fraction'])} dos períodos em DCM)")
+        for nome, unidade in (("ind", "H"), ("cap", "F"), ("r", "Ohm"), ("f", "Hz"), ("d", ""), ("d2", "")):
+            linha = f"\t{nome}\t\t=\t{'{:2.4e}'.format(res[nome])} {unidade}"
+            if conv is not None and nome in ("ind", "cap", "r", "f", "d"):
+                projeto, _, erro = self.compare(conv)[nome]
+                linha += f"\t(projeto {'{:2.4e}'.format(projeto)}, {'{:+.2%}'.format(erro)})"
+            print(linha)
@@ -0,0 +1,153 @@
+import numpy as np
+
+import symbolic
+from losses import Parasitics, losses
+
+
+class InterleavedBuck:
+    def __init__(self, vi, vo, po, f, ind, cap, phases=(1, 2, 3, 4), par=None):
+        """
+        Buck com N fases intercaladas (defasagem T/N), cada fase com o próprio indutor L e capacitor de saída comum.
+
+        'phases' ocupa o primeiro eixo e 'po' o segundo, então evaluate() devolve arrays (n_fases, n_cargas) e a
+        escolha do número de fases é uma única avaliação vetorizada. As demais entradas podem ser escalares ou
+        arrays compatíveis com essa forma.
+
+        :param vi: Tensão de entrada [V]
+        :param vo: Tensão de saída [V]
+        :param po: Potência total de saída [W]
+        :param f: Frequência de chaveamento de cada fase [Hz]
+        :param ind: Indutância por fase [H]
+        :param cap: Capacitância total de saída [F]
+        :param phases: números de fases avaliados (1 a 8 tipicamente)
+        :param par: Parasitics por fase (a ESR é a do capacitor de saída comum)
+        """
+        self.phases = np.asarray(phases, dtype=int).reshape(-1, 1)
+        self.po = np.atleast_1d(np.asarray(po, dtype=float)).reshape(1, -1)
+        self.vi = vi
+        self.vo = vo
+        self.f = f
+        self.ind = ind
+        self.cap = cap
+        self.par = par or Parasitics()
+
+    def evaluate(self):
+        """
+        :return: dicionário de arrays (n_fases, n_cargas):
+            por fase - d, dcm, il_max, il_min, il_rms, ids_rms, id_avg
+            totais - delta_il_total (p-p da soma das correntes de indutor), cancel (delta_il_total / delta_il de
+            uma fase), delta_vo, delta_vo_cap, delta_vo_esr, ii_rms, ic_in_rms, ic_out_rms, p_total, efficiency
+        """
+        n = self.phases
+        shape = np.broadcast_shapes(n.shape, self.po.shape, np.shape(self.vi), np.shape(self.vo), np.shape(self.f),
+                                    np.shape(self.ind), np.shape(self.cap))
+        nf = np.broadcast_to(n, shape).ravel()
+        po = np.broadcast_to(self.po, shape).ravel()
+        vi, vo, f, ind, cap = [np.broadcast_to(np.asarray(v, dtype=float), shape).ravel()
+                               for v in (self.vi, self.vo, self.f, self.ind, self.cap)]
+
+        op = symbolic.operating_point("buck", vi, vo, po / nf, f, ind, cap)
+        t = 1 / f
+        io = po / vo
+
+        tot = self.__totals(nf, op, t, io)
+
+        p = losses("buck", op, f, self.par)
+        p_total = nf * (p["p_total"] - p["p_c"]) + self.par.esr * tot["ic_out_rms"] ** 2
+
+        res = {"phases": nf,
+               "d": op["d"],
+               "dcm": op["dcm"],
+               "il_max": op["il_max"],
+               "il_min": op["il_min"],
+               "il_rms": op["il_rms"],
+               "ids_rms": op["ids_rms"],
+               "id_avg": op["id_avg"],
+               "delta_il_total": tot["delta_il_total"],
+               "cancel": tot["delta_il_total"] / op["delta_il"],
+               "delta_vo_cap": tot["delta_q"] / cap,
+               "delta_vo_esr": self.par.esr * tot["delta_il_total"],
+               "ii_rms": tot["ii_rms"],
+               "ic_in_rms": tot["ic_in_rms"],
+               "ic_out_rms": tot["ic_out_rms"],
+               "p_total": p_total,
+               "efficiency": po / (po + p_total)}
+        res["delta_vo"] = res["delta_vo_cap"] + res["delta_vo_esr"]
+        return {k: v.reshape(shape) for k, v in res.items()}
+
+    @staticmethod
+    def __totals(nf, op, t, io):
+        """
+        Soma exata das formas de onda lineares por partes das fases.
+
+        Entre dois instantes de comutação consecutivos (de qualquer fase) a soma é linear, então valor médio e
+        inclinação no meio do segmento bastam para integrais, picos e cargas.
+        """
+        kmax = int(nf.max())
+        k = np.arange(kmax)
+        ativa = k[None, :] < nf[:, None]                                    # (M, K)
+        shift = k[None, :] * (t / nf)[:, None]                              # (M, K)
+        dt_on = (op["d"] * t)[:, None]
+        tx = op["tx"][:, None]
+        il_min = op["il_min"][:, None]
+        il_max = op["il_max"][:, None]
+        sobe = (il_max - il_min) / dt_on
+        desce = (il_max - il_min) / (tx - dt_on)
+
+        # instantes de comutação de todas as fases dentro de [0, T)
+        pts = np.concatenate([shift, shift + dt_on, shift + tx], axis=1) % t[:, None]
+        pts = np.where(np.tile(ativa, 3), pts, 0.0)
+        pts = np.sort(np.concatenate([pts, np.zeros((len(t), 1)), t[:, None]], axis=1), axis=1)
+        h = np.diff(pts, axis=1)                                            # (M, P)
+        meio = 0.5 * (pts[:, 1:] + pts[:, :-1])
+
+        s = (meio[:, :, None] - shift[:, None, :]) % t[:, None, None]       # tempo local de cada fase
+        on = s < dt_on[:, None]
+        fall = ~on & (s < tx[:, None])
+        valor = np.where(on, il_min[:, None] + sobe[:, None] * s,
+                         np.where(fall, il_max[:, None] - desce[:, None] * (s - dt_on[:, None]), il_min[:, None]))
+        incl = np.where(on, sobe[:, None], np.where(fall, -desce[:, None], 0.0))
+        mask = ativa[:, None, :]
+
+        # corrente total nos indutores
+        m_l = np.where(mask, valor, 0.0).sum(axis=2)
+        k_l = np.where(mask, incl, 0.0).sum(axis=2)
+        ini = m_l - 0.5 * k_l * h
+        fim = m_l + 0.5 * k_l * h
+        delta_il_total = np.maximum(ini.max(axis=1), fim.max(axis=1)) - np.minimum(ini.min(axis=1), fim.min(axis=1))
+
+        # carga no capacitor de saída: integral de (iL_total - Io), com extremos nos cruzamentos por Io
+        a = m_l - io[:, None]
+        q_fim = np.cumsum(a * h, axis=1)
+        q_ini = q_fim - a * h
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tc = np.where(k_l != 0, -a / k_l, 0.0)                          # cruzamento relativo ao meio
+        dentro = np.abs(tc) < 0.5 * h
+        tc = np.where(dentro, tc, -0.5 * h)
+        q_c = q_ini + (a - 0.5 * k_l * h) * (tc + 0.5 * h) + 0.5 * k_l * (tc + 0.5 * h) ** 2
+        q_all = np.concatenate([q_ini, q_fim, q_c], axis=1)
+        delta_q = q_all.max(axis=1) - q_all.min(axis=1)
+        ic_out_rms = np.sqrt(((a ** 2 + k_l ** 2 * h ** 2 / 12) * h).sum(axis=1) / t)
+
+        # corrente de entrada: soma das correntes das chaves
+        m_s = np.where(mask & on, valor, 0.0).sum(axis=2)
+        k_s = np.where(mask & on, incl, 0.0).sum(axis=2)
+        ii2 = ((m_s ** 2 + k_s ** 2 * h ** 2 / 12) * h).sum(axis=1) / t
+        ii_avg = (m_s * h).sum(axis=1) / t
+
+        return {"delta_il_total": delta_il_total,
+                "delta_q": delta_q,
+                "ic_out_rms": ic_out_rms,
+                "ii_rms": np.sqrt(ii2),
+                "ic_in_rms": np.sqrt(np.maximum(ii2 - ii_avg ** 2, 0.0))}
+
+    def best_phases(self, res=None):
+        """
+        Número de fases de maior eficiência em cada carga (phase shedding).
+
+        :return: (fases, eficiência), arrays (n_cargas,)
+        """
+        res = res or self.evaluate()
+        i = np.argmax(res["efficiency"], axis=0)
+        cols = np.arange(res["efficiency"].shape[1])
+        return res["phases"][i, cols], res["efficiency"][i, cols]
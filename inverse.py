@@ -0,0 +1,144 @@
+import numpy as np
+
+import symbolic
+from losses import Parasitics
+
+REASONS = ("ok", "spec", "il_max", "ids_rms", "f_min")
+
+_GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+class InverseDesign:
+    def __init__(self, topology, vi, vo, po, dvo, il_max_lim=np.inf, ids_rms_lim=np.inf, f_min=1e3, f_max=1e6,
+                 dcm=False, dil_min=0.01, dil_max=1.99, kd_min=0.05, par=None, p_sw_max=np.inf):
+        """
+        Projeto inverso em lote: para cada linha de especificação encontra f, L e C que atendem aos limites de
+        corrente com a menor energia armazenada E = L iLmax^2 / 2 + C Vo^2 / 2.
+
+        Para uma ondulação fixa, iLmax e Ids_rms não dependem de f, enquanto L e C caem com 1/f; a frequência ótima é
+        então a maior permitida por f_max e pela perda de comutação (p_sw_max). Resta uma variável por linha:
+        a ondulação relativa de iL (CCM) ou a fração do duty kd (DCM). Os limites de corrente são monótonos nessa
+        variável, então a fronteira viável sai por bissecção vetorizada e o mínimo de E por seção áurea.
+
+        Todas as entradas aceitam escalares ou arrays (broadcasting), uma linha por especificação.
+
+        :param topology: 'buck' ou 'buckboost'
+        :param dvo: ondulação relativa máxima de Vo (C é dimensionado nesse limite)
+        :param il_max_lim: pico máximo de iL / corrente de pico nas chaves [A]
+        :param ids_rms_lim: corrente RMS máxima no MOSFET [A]
+        :param f_min: menor frequência aceitável [Hz]
+        :param f_max: maior frequência aceitável [Hz]
+        :param dcm: bool ou array de bool com o modo de cada linha
+        :param dil_min: menor ondulação relativa de iL considerada no CCM
+        :param dil_max: maior ondulação relativa de iL no CCM (abaixo de 2 para manter o CCM)
+        :param kd_min: menor kd considerado no DCM
+        :param par: Parasitics com tr/tf para o limite de perda de comutação
+        :param p_sw_max: perda de comutação máxima no MOSFET [W]
+        """
+        self.topology = topology
+        arrays = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in
+                                       (vi, vo, po, dvo, il_max_lim, ids_rms_lim, f_min, f_max, dcm, p_sw_max)])
+        (self.vi, self.vo, self.po, self.dvo, self.il_max_lim, self.ids_rms_lim, self.f_min, self.f_max, dcm,
+         self.p_sw_max) = [np.ravel(a) for a in arrays]
+        self.dcm = dcm != 0
+        self.shape = arrays[0].shape
+        self.dil_min = dil_min
+        self.dil_max = dil_max
+        self.kd_min = kd_min
+        self.par = par or Parasitics()
+
+    def __evaluate(self, x):
+        """
+        :param x: ondulação relativa (linhas CCM) ou kd (linhas DCM)
+        :return: saídas de projeto com f = 1 Hz, frequência máxima viável e margem das restrições de corrente
+        """
+        base = symbolic.design(self.topology, self.vi, self.vo, self.po, 1.0, np.where(self.dcm, 0.1, x), self.dvo,
+                               dcm=self.dcm, kd=np.where(self.dcm, x, 1.0))
+        # perda de comutação: 0.5 Vds (iLmin tr + iLmax tf) f <= p_sw_max
+        e_sw = 0.5 * base["vds_max"] * (base["il_min"] * self.par.tr + base["il_max"] * self.par.tf)
+        with np.errstate(divide="ignore"):
+            f_sw = np.where(e_sw > 0, self.p_sw_max / e_sw, np.inf)
+        f = np.minimum(self.f_max, f_sw)
+        margem = np.maximum.reduce([base["il_max"] / self.il_max_lim - 1,
+                                    base["ids_rms"] / self.ids_rms_lim - 1,
+                                    self.f_min / f - 1])
+        return base, f, margem
+
+    def __energy(self, x):
+        base, f, _ = self.__evaluate(x)
+        ind = base["ind"] / f
+        cap = base["cap"] / f
+        return 0.5 * ind * base["il_max"] ** 2 + 0.5 * cap * self.vo ** 2
+
+    def solve(self, iterations=60):
+        """
+        :return: dicionário com f, ind, cap, x (dil ou kd), energy, feasible, reason (índice em REASONS) e as
+        demais saídas de symbolic.design no ponto ótimo. Linhas inviáveis recebem NaN.
+        """
+        n = self.vi.size
+        # x favorável: menor ondulação no CCM, kd = 1 no DCM (menor pico); x desfavorável no extremo oposto
+        melhor = np.where(self.dcm, 1.0, self.dil_min)
+        pior = np.where(self.dcm, self.kd_min, self.dil_max)
+
+        valido = (self.vi > 0) & (self.vo > 0) & (self.po > 0) & (self.dvo > 0) & (self.f_max >= self.f_min)
+        if self.topology == "buck":
+            valido &= self.vo < self.vi
+
+        base, f, _ = self.__evaluate(melhor)
+        reason = np.zeros(n, dtype=np.int8)
+        reason[~valido] = REASONS.index("spec")
+        for nome, m in (("il_max", base["il_max"] / self.il_max_lim - 1),
+                        ("ids_rms", base["ids_rms"] / self.ids_rms_lim - 1),
+                        ("f_min", self.f_min / f - 1)):
+            reason[(reason == 0) & ~(m <= 0)] = REASONS.index(nome)
+        feasible = reason == 0
+
+        # bissecção: maior afastamento de 'melhor' que ainda respeita as restrições
+        a, b = melhor.copy(), pior.copy()
+        _, _, m_pior = self.__evaluate(b)
+        ok_pior = m_pior <= 0
+        for _ in range(iterations):
+            meio = 0.5 * (a + b)
+            _, _, m = self.__evaluate(meio)
+            ok = m <= 0
+            a = np.where(ok, meio, a)
+            b = np.where(ok, b, meio)
+        limite = np.where(ok_pior, pior, a)
+
+        # seção áurea de E entre 'melhor' e 'limite'
+        lo, hi = np.minimum(melhor, limite), np.maximum(melhor, limite)
+        x1 = hi - _GOLDEN * (hi - lo)
+        x2 = lo + _GOLDEN * (hi - lo)
+        e1, e2 = self.__energy(x1), self.__energy(x2)
+        for _ in range(iterations):
+            menor = e1 < e2
+            hi = np.where(menor, x2, hi)
+            lo = np.where(menor, lo, x1)
+            novo_x1 = hi - _GOLDEN * (hi - lo)
+            novo_x2 = lo + _GOLDEN * (hi - lo)
+            e_novo = self.__energy(np.where(menor, novo_x1, novo_x2))
+            x1, x2 = np.where(menor, novo_x1, x2), np.where(menor, x1, novo_x2)
+            e1, e2 = np.where(menor, e_novo, e2), np.where(menor, e1, e_novo)
+        x = 0.5 * (lo + hi)
+
+        base, f, _ = self.__evaluate(x)
+        res = dict(base)
+        res["f"] = f
+        res["t"] = 1 / f
+        res["tx"] = base["tx"] / f
+        res["ind"] = base["ind"] / f
+        res["cap"] = base["cap"] / f
+        res["x"] = x
+        res["energy"] = 0.5 * res["ind"] * base["il_max"] ** 2 + 0.5 * res["cap"] * self.vo ** 2
+        for nome in list(res):
+            res[nome] = np.where(feasible, res[nome], np.nan).reshape(self.shape)
+        res["feasible"] = feasible.reshape(self.shape)
+        res["reason"] = reason.reshape(self.shape)
+        return res
+
+
+def solve(topology, vi, vo, po, dvo, **kwargs):
+    """
+    Atalho para InverseDesign(...).solve(). Ver InverseDesign.
+    """
+    return InverseDesign(topology, vi, vo, po, dvo, **kwargs).solve()
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class Parasitics:
+    def __init__(self, rds_on=0.0, vf=0.0, r_d=0.0, dcr=0.0, esr=0.0, tr=0.0, tf=0.0):
+        """
+        Elementos não ideais usados no cálculo de perdas.
+
+        :param rds_on: Resistência de condução do MOSFET [Ohm]
+        :param vf: Queda direta do diodo [V]
+        :param r_d: Resistência dinâmica do diodo [Ohm]
+        :param dcr: Resistência série do indutor [Ohm]
+        :param esr: Resistência série do capacitor de saída [Ohm]
+        :param tr: Tempo de subida da comutação do MOSFET [s]
+        :param tf: Tempo de descida da comutação do MOSFET [s]
+        """
+        self.rds_on = rds_on
+        self.vf = vf
+        self.r_d = r_d
+        self.dcr = dcr
+        self.esr = esr
+        self.tr = tr
+        self.tf = tf
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def losses(topology, op, f, par):
+    """
+    Perdas por elemento a partir das saídas de symbolic.design/operating_point (vetorizado).
+
+    :param topology: 'buck' ou 'buckboost'
+    :param op: dicionário com il_max, il_min, il_rms, ids_rms, id_avg, io e vds_max
+    :param par: Parasitics
+    :return: dicionário {p_s_cond, p_s_sw, p_d, p_l, p_c, p_total} [W]
+    """
+    il_rms2 = op["il_rms"] ** 2
+    ids_rms2 = op["ids_rms"] ** 2
+    id_rms2 = np.maximum(il_rms2 - ids_rms2, 0.0)
+    io2 = op["io"] ** 2
+    if topology == "buck":
+        ic_rms2 = np.maximum(il_rms2 - io2, 0.0)  # iC = iL - Io
+    else:
+        ic_rms2 = np.maximum(id_rms2 - io2, 0.0)  # iC = iD - Io
+
+    res = {"p_s_cond": par.rds_on * ids_rms2,
+           "p_s_sw": 0.5 * op["vds_max"] * (op["il_min"] * par.tr + op["il_max"] * par.tf) * f,
+           "p_d": par.vf * op["id_avg"] + par.r_d * id_rms2,
+           "p_l": par.dcr * il_rms2,
+           "p_c": par.esr * ic_rms2}
+    res["p_total"] = res["p_s_cond"] + res["p_s_sw"] + res["p_d"] + res["p_l"] + res["p_c"]
+    return res
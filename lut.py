@@ -0,0 +1,210 @@
+import numpy as np
+
+import symbolic
+
+# Tabelas padrão: duty de feedforward, pico de iL e a margem de DCM (iL mínimo da solução CCM; < 0 indica DCM)
+OUTPUTS = ["d", "il_max", "il_min_ccm"]
+
+
+def _uniforme(x):
+    passo = np.diff(x)
+    return len(x) > 1 and np.allclose(passo, passo[0], rtol=1e-9, atol=0.0)
+
+
+def _c_float(x):
+    return f"{float(x):.9e}f"
+
+
+def _exact(topology, vi, vo, po, f, ind, cap, outputs):
+    res = symbolic.operating_point(topology, vi, vo, po, f, ind, cap)
+    res["il_min_ccm"] = symbolic.kernel("analysis", topology, "ccm")(vi=vi, vo=vo, po=po, f=f, ind=ind,
+                                                                      cap=cap)["il_min"]
+    return {n: np.asarray(res[n], dtype=float) for n in outputs}
+
+
+def _fine(eixo, refine):
+    """
+    Grade refinada com 'refine' subintervalos por célula (inclui os nós).
+    """
+    s = np.arange(refine) / refine
+    return np.r_[(eixo[:-1, None] + np.diff(eixo)[:, None] * s).ravel(), eixo[-1]]
+
+
+def _per_cell(a, refine):
+    """
+    Máximo de um array da grade refinada sobre os (refine + 1)^2 nós de cada célula da grade original.
+    """
+    n, m = (a.shape[0] - 1) // refine, (a.shape[1] - 1) // refine
+    return np.max(np.stack([a[i:i + refine * n:refine, j:j + refine * m:refine]
+                            for i in range(refine + 1) for j in range(refine + 1)]), axis=0)
+
+
+def _curvature(t, x, modo, axis):
+    """
+    |f''| ao longo de um eixo, por segundas diferenças na grade refinada (bordas repetidas). Diferenças cujos três
+    pontos não estão no mesmo modo cruzam a quina da fronteira CCM/DCM e são descartadas.
+    """
+    t = np.moveaxis(t, axis, 0)
+    modo = np.moveaxis(modo, axis, 0)
+    h = np.diff(x)[:, None]
+    d2 = np.abs(2 * ((t[2:] - t[1:-1]) / h[1:] - (t[1:-1] - t[:-2]) / h[:-1]) / (h[1:] + h[:-1]))
+    d2 = np.where((modo[2:] == modo[1:-1]) & (modo[1:-1] == modo[:-2]), d2, 0.0)
+    return np.moveaxis(np.concatenate([d2[:1], d2, d2[-1:]]), 0, axis)
+
+
+class LookupTable:
+    def __init__(self, topology, vo, f, ind, cap, vi, po, outputs=None):
+        """
+        Tabelas de consulta em função de (vi, po) para L, C e f fixos, calculadas numa única avaliação vetorizada
+        de symbolic.operating_point sobre a grade.
+
+        :param topology: 'buck' ou 'buckboost'
+        :param vi: pontos da grade de tensão de entrada [V] (crescentes; espaçamento uniforme permite exportar
+                   só origem e passo)
+        :param po: pontos da grade de potência [W] (crescentes)
+        :param outputs: saídas tabeladas (padrão: OUTPUTS); qualquer saída de operating_point, mais il_min_ccm
+        """
+        self.topology = topology
+        self.vo, self.f, self.ind, self.cap = vo, f, ind, cap
+        self.vi = np.asarray(vi, dtype=float)
+        self.po = np.asarray(po, dtype=float)
+        self.outputs = list(outputs or OUTPUTS)
+        vi_g, po_g = np.meshgrid(self.vi, self.po, indexing="ij")
+        self.tables = _exact(topology, vi_g, vo, po_g, f, ind, cap, self.outputs)
+        self.quantized = {}
+
+    @classmethod
+    def linspace(cls, topology, vo, f, ind, cap, vi_range, po_range, n_vi=64, n_po=64, outputs=None):
+        """
+        Grade uniforme: vi_range = (vi_min, vi_max), po_range = (po_min, po_max).
+        """
+        return cls(topology, vo, f, ind, cap, np.linspace(*vi_range, n_vi), np.linspace(*po_range, n_po), outputs)
+
+    def quantize(self, name, bits=16, frac=None, signed=None):
+        """
+        Quantiza uma tabela em ponto fixo Qm.n (arredondamento para o mais próximo, com saturação).
+
+        :param bits: largura da palavra
+        :param frac: bits fracionários; None usa o máximo que ainda representa o maior valor da tabela
+        :param signed: None escolhe pelo sinal dos valores
+        :return: array inteiro
+        """
+        t = self.tables[name]
+        if signed is None:
+            signed = bool(np.any(t < 0))
+        inteiros = bits - (1 if signed else 0)
+        if frac is None:
+            maximo = float(np.max(np.abs(t)))
+            frac = inteiros - max(int(np.floor(np.log2(maximo))) + 1, 0) if maximo > 0 else inteiros
+        lo, hi = (-(1 << inteiros), (1 << inteiros) - 1) if signed else (0, (1 << bits) - 1)
+        q = np.clip(np.rint(t * 2.0 ** frac), lo, hi)
+        tamanho = next(b for b in (1, 2, 4, 8) if 8 * b >= bits)
+        dtype = np.dtype(f"{'i' if signed else 'u'}{tamanho}")
+        self.quantized[name] = {"data": q.astype(dtype), "frac": int(frac), "bits": bits, "signed": signed}
+        return self.quantized[name]["data"]
+
+    def __cell(self, eixo, x):
+        """
+        Índice da célula e coordenada local em [0, 1] (fora da grade: extrapolação linear pela célula da borda).
+        """
+        if _uniforme(eixo):
+            u = (x - eixo[0]) / (eixo[1] - eixo[0])
+            i = np.clip(np.floor(u), 0, len(eixo) - 2).astype(np.intp)
+            return i, u - i
+        i = np.clip(np.searchsorted(eixo, x, side="right") - 1, 0, len(eixo) - 2)
+        return i, (x - eixo[i]) / (eixo[i + 1] - eixo[i])
+
+    def query(self, vi, po, outputs=None, quantized=False):
+        """
+        Consulta em lote por interpolação bilinear.
+
+        :param quantized: usa as tabelas quantizadas (como o firmware), convertidas de volta para ponto flutuante
+        :return: dicionário {saída: array}; com il_min_ccm tabelado, inclui 'dcm' (margem interpolada < 0)
+        """
+        vi, po = np.broadcast_arrays(np.asarray(vi, dtype=float), np.asarray(po, dtype=float))
+        i, u = self.__cell(self.vi, vi)
+        j, v = self.__cell(self.po, po)
+        res = {}
+        for n in outputs or self.outputs:
+            if quantized:
+                q = self.quantized[n]
+                t = q["data"].astype(float) * 2.0 ** -q["frac"]
+            else:
+                t = self.tables[n]
+            a, b = t[i, j], t[i, j + 1]
+            c, d = t[i + 1, j], t[i + 1, j + 1]
+            res[n] = (1 - u) * ((1 - v) * a + v * b) + u * ((1 - v) * c + v * d)
+        if "il_min_ccm" in res:
+            res["dcm"] = res["il_min_ccm"] < 0
+        return res
+
+    def error(self, refine=4, quantized=False):
+        """
+        Erro da interpolação em relação às equações exatas, avaliadas numa grade com 'refine' subdivisões por
+        célula.
+
+        'bound' é o limite da interpolação bilinear, h^2/8 max|f_vi,vi| + k^2/8 max|f_po,po| por célula, com as
+        segundas derivadas tiradas da grade refinada (mais 1/2 LSB com quantized). Nas células cortadas pela
+        fronteira CCM/DCM as saídas têm uma quina e esse limite não vale; elas ficam fora de 'bound', contadas em
+        'boundary_cells' e com o erro medido em 'max_abs_boundary'.
+
+        :return: {saída: {max_abs, max_rel, bound, max_abs_boundary}}, 'boundary_cells' e 'dcm_mismatch' (fração
+                 dos pontos refinados com o modo trocado)
+        """
+        vi, po = _fine(self.vi, refine), _fine(self.po, refine)
+        vi_g, po_g = np.meshgrid(vi, po, indexing="ij")
+        saidas = list(dict.fromkeys(self.outputs + ["il_min_ccm"]))
+        exato = _exact(self.topology, vi_g, self.vo, po_g, self.f, self.ind, self.cap, saidas)
+        aprox = self.query(vi_g, po_g, self.outputs, quantized=quantized)
+
+        # células com pontos dos dois modos
+        dcm = exato["il_min_ccm"] < 0
+        fronteira = _per_cell(dcm, refine) & _per_cell(~dcm, refine)
+
+        h = np.diff(self.vi)[:, None]
+        k = np.diff(self.po)[None, :]
+        res = {}
+        for n in self.outputs:
+            erro = np.abs(aprox[n] - exato[n])
+            escala = np.max(np.abs(exato[n]))
+            limite = h ** 2 / 8 * _per_cell(_curvature(exato[n], vi, dcm, 0), refine) + \
+                k ** 2 / 8 * _per_cell(_curvature(exato[n], po, dcm, 1), refine)
+            if quantized:
+                limite = limite + 0.5 * 2.0 ** -self.quantized[n]["frac"]
+            por_celula = _per_cell(erro, refine)
+            res[n] = {"max_abs": float(erro.max()), "max_rel": float(erro.max() / escala) if escala > 0 else 0.0,
+                      "bound": float(limite[~fronteira].max()) if (~fronteira).any() else np.nan,
+                      "max_abs_boundary": float(por_celula[fronteira].max()) if fronteira.any() else 0.0}
+        res["boundary_cells"] = int(fronteira.sum())
+        if "il_min_ccm" in self.outputs:
+            res["dcm_mismatch"] = float(np.mean((aprox["il_min_ccm"] < 0) != dcm))
+        return res
+
+    def export_c(self, path, prefix="lut", bits=16):
+        """
+        Gera um header C com as tabelas quantizadas (as que ainda não foram quantizadas usam 'bits' e o formato
+        automático), os eixos e o formato Q de cada tabela.
+        """
+        p = prefix.upper()
+        linhas = [f"/* Tabelas {self.topology}: vo = {self.vo} V, f = {self.f} Hz, L = {self.ind} H, "
+                  f"C = {self.cap} F. Gerado por lut.py */",
+                  f"#ifndef {p}_H", f"#define {p}_H", "", "#include <stdint.h>", "",
+                  f"#define {p}_N_VI {len(self.vi)}", f"#define {p}_N_PO {len(self.po)}"]
+        for nome, eixo in (("VI", self.vi), ("PO", self.po)):
+            if _uniforme(eixo):
+                linhas += [f"#define {p}_{nome}_MIN {_c_float(eixo[0])}", f"#define {p}_{nome}_STEP {_c_float(eixo[1] - eixo[0])}",
+                           f"#define {p}_{nome}_INV_STEP {_c_float(1 / (eixo[1] - eixo[0]))}"]
+            linhas.append(f"static const float {prefix}_{nome.lower()}[{p}_N_{nome}] = {{"
+                          + ", ".join(_c_float(x) for x in eixo) + "};")
+        for n in self.outputs:
+            if n not in self.quantized:
+                self.quantize(n, bits)
+            q = self.quantized[n]
+            tipo = f"{'' if q['signed'] else 'u'}int{q['data'].dtype.itemsize * 8}_t"
+            linhas += ["", f"#define {p}_{n.upper()}_FRAC {q['frac']}",
+                       f"static const {tipo} {prefix}_{n}[{p}_N_VI][{p}_N_PO] = {{"]
+            linhas += ["    {" + ", ".join(str(int(x)) for x in linha) + "}," for linha in q["data"]]
+            linhas.append("};")
+        linhas += ["", f"#endif /* {p}_H */", ""]
+        with open(path, "w") as fp:
+            fp.write("\n".join(linhas))
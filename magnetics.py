@@ -0,0 +1,253 @@
+import os
+
+import numpy as np
+from scipy.special import gamma
+
+MU0 = 4e-7 * np.pi
+RHO_CU = 2.3e-8  # resistividade do cobre a ~100 °C [Ohm m]
+
+# Colunas do arquivo de núcleos (SI). mur é a permeabilidade relativa do material (inf se ausente); k, alpha e beta
+# são os coeficientes de Steinmetz, Pv = k f^alpha B^beta [W/m^3] com B de pico senoidal [T].
+CORE_COLUMNS = ["name", "ae", "wa", "le", "ve", "mlt", "bsat", "mur", "k", "alpha", "beta"]
+WIRE_COLUMNS = ["name", "d_cu", "d_out"]
+
+
+def awg(gauges=range(10, 41)):
+    """
+    Tabela AWG: diâmetro do cobre pela fórmula da norma e diâmetro externo com esmalte grau 2 aproximado.
+
+    :return: dicionário {name, d_cu, d_out} [m]
+    """
+    n = np.asarray(list(gauges), dtype=float)
+    d_cu = 0.127e-3 * 92 ** ((36 - n) / 39)
+    return {"name": np.array([f"AWG{int(g)}" for g in n]), "d_cu": d_cu, "d_out": d_cu * (1.09 + 0.0016e-3 / d_cu)}
+
+
+def _read_csv(path, colunas, obrigatorias):
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    faltando = [c for c in obrigatorias if c not in df]
+    if faltando:
+        raise ValueError(f"{path}: colunas ausentes: {', '.join(faltando)}")
+    return {c: df[c].to_numpy(dtype=object if c == "name" else float) for c in colunas if c in df}
+
+
+class CoreDatabase:
+    def __init__(self, cores, wires=None):
+        """
+        Base de núcleos e fios indexada por produto de áreas Ap = Ae Wa: os núcleos ficam ordenados por Ap, então os
+        que não comportam um projeto são descartados por busca binária antes de qualquer cálculo.
+
+        :param cores: dicionário de arrays com as colunas CORE_COLUMNS (mur opcional)
+        :param wires: dicionário {name, d_cu, d_out}; padrão: awg()
+        """
+        cores = {c: np.asarray(v, dtype=object if c == "name" else float) for c, v in cores.items()}
+        n = len(cores["ae"])
+        if "mur" not in cores:
+            cores["mur"] = np.full(n, np.inf)
+        ap = cores["ae"] * cores["wa"]
+        ordem = np.argsort(ap, kind="stable")
+        self.cores = {c: v[ordem] for c, v in cores.items()}
+        self.ap = ap[ordem]
+        self.ki = _ki(self.cores["k"], self.cores["alpha"], self.cores["beta"])
+        self.order = ordem
+        wires = wires or awg()
+        ordem = np.argsort(wires["d_cu"])
+        self.wires = {c: np.asarray(v)[ordem] for c, v in wires.items()}
+
+    @classmethod
+    def from_csv(cls, cores_path, wires_path=None):
+        """
+        :param cores_path: CSV com as colunas CORE_COLUMNS
+        :param wires_path: CSV com as colunas WIRE_COLUMNS; None para a tabela AWG
+        """
+        cores = _read_csv(cores_path, CORE_COLUMNS, [c for c in CORE_COLUMNS if c != "mur"])
+        wires = _read_csv(wires_path, WIRE_COLUMNS, WIRE_COLUMNS) if wires_path else None
+        return cls(cores, wires)
+
+    def save(self, path):
+        """
+        Grava a base já indexada em .npz (carregada por load sem reordenar).
+        """
+        np.savez(path, **{"core/" + c: v for c, v in self.cores.items()},
+                 **{"wire/" + c: v for c, v in self.wires.items()})
+
+    @classmethod
+    def load(cls, path):
+        if os.path.splitext(path)[1].lower() == ".csv":
+            return cls.from_csv(path)
+        with np.load(path, allow_pickle=True) as data:
+            cores = {n[5:]: data[n] for n in data.files if n.startswith("core/")}
+            wires = {n[5:]: data[n] for n in data.files if n.startswith("wire/")}
+        return cls(cores, wires)
+
+    def __len__(self):
+        return len(self.ap)
+
+    def names(self, idx):
+        return self.cores["name"][idx]
+
+
+def _ki(k, alpha, beta):
+    """
+    Coeficiente ki da iGSE a partir dos coeficientes de Steinmetz.
+    """
+    integral = 2 * np.sqrt(np.pi) * gamma((alpha + 1) / 2) / gamma(alpha / 2 + 1)  # integral de 0 a 2pi |cos|^alpha
+    return k / ((2 * np.pi) ** (alpha - 1) * integral * 2 ** (beta - alpha))
+
+
+def _igse(ki, alpha, beta, delta_b, f, d, d2):
+    """
+    Perda volumétrica pela iGSE para fluxo triangular (trapezoidal no DCM): sobe em d T, desce em d2 T e fica
+    parado no resto do período.
+
+    Pv = ki dB^(beta - alpha) (1/T) integral |dB/dt|^alpha dt = ki dB^beta f^alpha (d^(1-alpha) + d2^(1-alpha))
+    """
+    with np.errstate(divide="ignore"):
+        forma = np.where(d > 0, d ** (1 - alpha), 0.0) + np.where(d2 > 0, d2 ** (1 - alpha), 0.0)
+    return ki * delta_b ** beta * f ** alpha * forma
+
+
+def _evaluate(db, ic, ind, il_max, delta_il, il_rms, f, d, d2, wire, b_max, ku, j_max, rho):
+    """
+    Avalia pares (projeto, núcleo): ic indexa os núcleos, com forma (n, m) ou (1, m) (fatia comum a todos os
+    projetos), e as grandezas do projeto têm forma (n, 1).
+    """
+    c = db.cores
+    ae, wa, le, ve, mlt, mur = (c[n][ic] for n in ("ae", "wa", "le", "ve", "mlt", "mur"))
+    bpk_lim = np.minimum(c["bsat"][ic], b_max)
+    # espiras: limite de fluxo de pico e, para núcleos sem entreferro suficiente, a indutância sem gap
+    n_b = np.ceil(ind * il_max / (bpk_lim * ae))
+    with np.errstate(divide="ignore"):
+        n_l = np.ceil(np.sqrt(ind * le / (MU0 * mur * ae)))
+    espiras = np.maximum(np.maximum(n_b, n_l), 1.0)
+    bpk = ind * il_max / (espiras * ae)
+    delta_b = ind * delta_il / (espiras * ae)
+    gap = np.maximum(MU0 * espiras ** 2 * ae / ind - le / mur, 0.0)
+
+    # enrolamento: o fio escolhido (limitado pelo efeito pelicular) em paralelo até preencher a janela
+    a_cu = 0.25 * np.pi * db.wires["d_cu"][wire] ** 2
+    a_out = 0.25 * np.pi * db.wires["d_out"][wire] ** 2
+    fios = np.floor(ku * wa / (espiras * a_out))
+    cobre = fios * a_cu
+    with np.errstate(divide="ignore"):
+        r_dc = np.where(fios > 0, rho * espiras * mlt / cobre, np.inf)
+        j = np.where(fios > 0, il_rms / cobre, np.inf)
+
+    p_core = _igse(db.ki[ic], c["alpha"][ic], c["beta"][ic], delta_b, f, d, d2) * ve
+    p_cu = r_dc * il_rms ** 2
+    feasible = (fios >= 1) & (j <= j_max) & (bpk <= bpk_lim * (1 + 1e-12))
+    return {"turns": espiras, "strands": fios, "bpk": bpk, "delta_b": delta_b, "gap": gap, "j": j, "r_dc": r_dc,
+            "p_core": p_core, "p_cu": p_cu, "p_total": p_core + p_cu, "feasible": feasible}
+
+
+def design(db, ind, il_max, delta_il, il_rms, f, d, d2=None, n_best=5, b_max=0.3, ku=0.4, j_max=5e6, rho=RHO_CU,
+           candidates=None, chunk=1 << 22):
+    """
+    Projeto de indutor em lote sobre toda a base de núcleos: espiras, densidade de fluxo de pico, perda no núcleo
+    (iGSE com a forma de onda triangular da ondulação) e no cobre (com a corrente eficaz), e a lista dos n_best
+    núcleos viáveis de menor perda total por projeto.
+
+    Um núcleo só é viável com Ap >= L iL_max iL_rms / (B_max J_max ku), então cada projeto só avalia os núcleos
+    a partir do seu Ap mínimo (busca binária no índice). Os projetos são processados em ordem de Ap mínimo, em
+    blocos de até 'chunk' pares (projeto, núcleo).
+
+    O fio é o mais grosso com diâmetro até duas profundidades peliculares na frequência de chaveamento; os fios em
+    paralelo preenchem a janela até ku, e a perda no cobre usa a resistência CC desse feixe.
+
+    :param db: CoreDatabase
+    :param ind: Indutância [H]
+    :param il_max: corrente de pico no indutor [A]
+    :param delta_il: ondulação de pico a pico [A]
+    :param il_rms: corrente eficaz no indutor [A]
+    :param d: razão cíclica (subida da corrente)
+    :param d2: fração do período de descida (padrão 1 - d, CCM)
+    :param b_max: densidade de fluxo de pico máxima [T] (também limitada pelo bsat de cada núcleo)
+    :param ku: fator de utilização da janela
+    :param j_max: densidade de corrente máxima [A/m^2]
+    :param candidates: se dado, avalia só os 'candidates' núcleos seguintes ao Ap mínimo de cada projeto
+    :return: dicionário com arrays (n, n_best): core (índice na base indexada), name, turns, strands, bpk,
+             delta_b, gap, j, r_dc, p_core, p_cu, p_total e feasible; e 'wire' (n,), índice do fio de cada projeto
+    """
+    if d2 is None:
+        d2 = 1 - np.asarray(d, dtype=float)
+    arrays = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (ind, il_max, delta_il, il_rms, f, d, d2)])
+    shape = arrays[0].shape
+    ind, il_max, delta_il, il_rms, f, d, d2 = [a.ravel() for a in arrays]
+    n, m = len(ind), len(db)
+
+    profundidade = np.sqrt(rho / (np.pi * f * MU0))
+    wire = np.searchsorted(db.wires["d_cu"], 2 * profundidade, side="right") - 1
+    wire = np.clip(wire, 0, len(db.wires["d_cu"]) - 1)
+
+    b_lim = min(b_max, float(np.max(db.cores["bsat"])))
+    ap_min = ind * il_max * il_rms / (b_lim * j_max * ku)
+    inicio = np.searchsorted(db.ap, ap_min)
+
+    campos = ["turns", "strands", "bpk", "delta_b", "gap", "j", "r_dc", "p_core", "p_cu", "p_total"]
+    res = {c: np.full((n, n_best), np.nan) for c in campos}
+    res["core"] = np.full((n, n_best), -1, dtype=np.int64)
+    res["feasible"] = np.zeros((n, n_best), dtype=bool)
+
+    ordem = np.argsort(inicio, kind="stable")
+    pos = 0
+    while pos < n:
+        # bloco de projetos com Ap mínimo próximo: todos avaliam os mesmos núcleos [inicio do primeiro, m)
+        a = inicio[ordem[pos]]
+        largura = (m - a) if candidates is None else min(candidates, m)
+        linhas = max(1, chunk // max(largura, 1))
+        sel = ordem[pos:pos + linhas]
+        pos += len(sel)
+        if largura == 0 or a >= m:
+            continue
+        if candidates is None:
+            ic = np.arange(a, m)[None, :]
+            valido = ic >= inicio[sel, None]
+        else:
+            ic = inicio[sel, None] + np.arange(largura)
+            valido = ic < m
+            ic = np.minimum(ic, m - 1)
+        col = lambda v: v[sel, None]
+        r = _evaluate(db, ic, col(ind), col(il_max), col(delta_il), col(il_rms), col(f), col(d), col(d2),
+                      col(wire), b_max, ku, j_max, rho)
+        ok = r["feasible"] & valido
+        perda = np.where(ok, r["p_total"], np.inf)
+        k = min(n_best, largura)
+        melhores = np.argpartition(perda, k - 1, axis=1)[:, :k] if k < largura else np.tile(np.arange(k),
+                                                                                            (len(sel), 1))
+        melhores = np.take_along_axis(melhores, np.argsort(np.take_along_axis(perda, melhores, 1), axis=1), 1)
+        for c in campos:
+            res[c][sel, :k] = np.take_along_axis(r[c], melhores, 1)
+        res["feasible"][sel, :k] = np.take_along_axis(ok, melhores, 1)
+        res["core"][sel, :k] = np.take_along_axis(np.broadcast_to(ic, perda.shape), melhores, 1)
+
+    res["core"] = np.where(res["feasible"], res["core"], -1)
+    for c in campos:
+        res[c] = np.where(res["feasible"], res[c], np.nan)
+    res["name"] = np.where(res["feasible"], db.names(np.maximum(res["core"], 0)), None)
+    res["wire"] = wire
+    return {c: v.reshape(shape + v.shape[1:]) for c, v in res.items()}
+
+
+def from_design(db, res, f, **kwargs):
+    """
+    Atalho para saídas de symbolic.design/operating_point (d2 vem de tx: d2 = tx / T - d).
+    """
+    d2 = res["tx"] / res["t"] - res["d"]
+    return design(db, res["ind"], res["il_max"], res["delta_il"], res["il_rms"], f, res["d"], d2, **kwargs)
+
+
+def show_info(db, res, row=None):
+    """
+    Imprime a lista de núcleos de um projeto (linha 'row' de um lote, ou o único projeto).
+    """
+    sel = (lambda v: v) if row is None else (lambda v: v[row])
+    print(f"\n===============\t\tNÚCLEOS ({db.wires['name'][sel(res['wire'])]})\t===============")
+    for i in range(sel(res["core"]).shape[-1]):
+        if not sel(res["feasible"])[i]:
+            continue
+        print(f"\t{sel(res['name'])[i]}\t\tN = {int(sel(res['turns'])[i])} x {int(sel(res['strands'])[i])}"
+              f"\tBpk = {'{:2.3f}'.format(sel(res['bpk'])[i])} T"
+              f"\tPnúcleo = {'{:2.3f}'.format(sel(res['p_core'])[i])} W"
+              f"\tPcobre = {'{:2.3f}'.format(sel(res['p_cu'])[i])} W")
@@ -0,0 +1,183 @@
+import os
+
+import numpy as np
+
+import symbolic
+from losses import Parasitics, losses
+
+
+def read_profile(path, chunk_size=1 << 20, dt=None):
+    """
+    Lê um perfil de missão em blocos, sem carregar o arquivo inteiro.
+
+    Formatos:
+        .npy - array (n, 2) com [t, po] ou (n, 3) com [t, po, vi], ou array estruturado com campos t, po e vi.
+               Lido por mmap.
+        .csv - colunas nomeadas t, po e (opcional) vi.
+        outro - binário float64 cru com 3 colunas [t, po, vi], ou 2 colunas [po, vi] quando dt é dado.
+
+    :param dt: período de amostragem [s] quando o arquivo não tem a coluna t (a coluna po passa a ser a primeira)
+    :return: gerador de dicionários {t, po, vi} (vi ausente se não existir no arquivo)
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        import pandas as pd
+
+        for bloco in pd.read_csv(path, chunksize=chunk_size):
+            yield {n: bloco[n].to_numpy(dtype=float) for n in ("t", "po", "vi") if n in bloco}
+        return
+
+    nomes = ["po", "vi"] if dt is not None else ["t", "po", "vi"]
+    if ext == ".npy":
+        data = np.load(path, mmap_mode="r")
+    else:
+        data = np.memmap(path, dtype=np.float64, mode="r").reshape(-1, len(nomes))
+
+    if data.dtype.names:
+        nomes = [n for n in ("t", "po", "vi") if n in data.dtype.names]
+        colunas = {n: data[n] for n in nomes}
+    else:
+        colunas = {n: data[:, i] for i, n in enumerate(nomes[:data.shape[1]])}
+
+    n = len(data)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        bloco = {k: np.asarray(v[start:stop], dtype=float) for k, v in colunas.items()}
+        if "t" not in bloco:
+            bloco["t"] = np.arange(start, stop) * dt
+        yield bloco
+
+
+class Mission:
+    def __init__(self, topology, vo, f, ind, cap, par=None, vi=None, bins=64, ranges=None, thermal=None):
+        """
+        Avaliação de um projeto (L e C fixos) ao longo de um perfil de carga po(t), vi(t).
+
+        Cada amostra vale até a próxima (retenção de ordem zero). Os acumuladores têm tamanho fixo, então a memória
+        não depende do comprimento do perfil.
+
+        :param topology: 'buck' ou 'buckboost'
+        :param vo: Tensão de saída [V]
+        :param f: Frequência de chaveamento [Hz]
+        :param ind: Indutância [H]
+        :param cap: Capacitância [F]
+        :param par: Parasitics usado nas perdas (padrão: ideal)
+        :param vi: Tensão de entrada [V] quando o perfil não traz a coluna vi
+        :param bins: número de classes dos histogramas de tempo por nível
+        :param ranges: {grandeza: (mín, máx)} para os histogramas de il_max, ids_rms, d e p_total.
+        Sem faixa informada, ela é fixada no primeiro bloco com folga de 2x e valores acima vão para a última classe.
+        :param thermal: thermal.JunctionTemperature com 2 dispositivos (MOSFET, diodo) alimentado com as perdas
+        """
+        self.topology = topology
+        self.vo = vo
+        self.f = f
+        self.ind = ind
+        self.cap = cap
+        self.par = par or Parasitics()
+        self.vi = vi
+        self.bins = bins
+        self.ranges = dict(ranges or {})
+        self.thermal = thermal
+        self.reset()
+
+    HISTOGRAMS = ("il_max", "ids_rms", "d", "p_total")
+
+    def reset(self):
+        self.samples = 0
+        self.time = 0.0
+        self.time_dcm = 0.0
+        self.energy_out = 0.0
+        self.energy_loss = 0.0
+        self.peak = {n: 0.0 for n in self.HISTOGRAMS}
+        self.edges = {}
+        self.hist = {}
+        self.__pendente = None
+
+    def operating(self, chunks):
+        """
+        Etapa do pipeline: calcula modo, duty, correntes e perdas de cada amostra.
+
+        :return: gerador de (dt, op) com dt [s] de cada amostra e op o dicionário de grandezas vetorizadas
+        """
+        for bloco in chunks:
+            t = bloco["t"]
+            # dt de cada amostra: distância até a próxima; a última do bloco espera o primeiro t do bloco seguinte
+            if self.__pendente is not None:
+                yield self.__close(self.__pendente, t[0])
+            if len(t) > 1:
+                atual = {k: v[:-1] for k, v in bloco.items()}
+                atual["dt"] = np.diff(t)
+                yield self.__evaluate(atual)
+            self.__pendente = {k: v[-1:] for k, v in bloco.items()}
+        # a última amostra do perfil não tem duração conhecida
+        self.__pendente = None
+
+    def __close(self, amostra, t_prox):
+        amostra = dict(amostra)
+        amostra["dt"] = np.array([t_prox - amostra["t"][0]])
+        return self.__evaluate(amostra)
+
+    def __evaluate(self, bloco):
+        po = bloco["po"]
+        vi = bloco.get("vi", self.vi)
+        if vi is None:
+            raise ValueError("perfil sem coluna vi: informe vi no construtor")
+        ativo = po > 0
+        po_ef = np.where(ativo, po, 1.0)
+        op = symbolic.operating_point(self.topology, vi, self.vo, po_ef, self.f, self.ind, self.cap)
+        op.update(losses(self.topology, op, self.f, self.par))
+        for n in op:
+            if n != "dcm":
+                op[n] = np.where(ativo, op[n], 0.0)
+        op["dcm"] = op["dcm"] & ativo
+        op["po"] = np.where(ativo, po, 0.0)
+        return bloco["dt"], op
+
+    def accumulate(self, stream):
+        """
+        Etapa final do pipeline: energia, tempo em DCM, picos e histogramas ponderados pelo tempo.
+        """
+        for dt, op in stream:
+            self.samples += len(dt)
+            self.time += dt.sum()
+            self.time_dcm += dt[op["dcm"]].sum()
+            self.energy_out += np.dot(op["po"], dt)
+            self.energy_loss += np.dot(op["p_total"], dt)
+            for n in self.HISTOGRAMS:
+                v = op[n]
+                if len(v):
+                    self.peak[n] = max(self.peak[n], float(v.max()))
+                edges = self.edges.get(n)
+                if edges is None:
+                    lo, hi = self.ranges.get(n, (0.0, 2.0 * float(v.max()) if len(v) else 1.0))
+                    edges = self.edges[n] = np.linspace(lo, hi if hi > lo else lo + 1.0, self.bins + 1)
+                    self.hist[n] = np.zeros(self.bins)
+                idx = np.clip(np.searchsorted(edges, v, side="right") - 1, 0, self.bins - 1)
+                self.hist[n] += np.bincount(idx, weights=dt, minlength=self.bins)
+            if self.thermal is not None:
+                self.thermal.update(np.stack([op["p_s_cond"] + op["p_s_sw"], op["p_d"]]), dt)
+        return self
+
+    def evaluate(self, source, chunk_size=1 << 20, dt=None):
+        """
+        :param source: caminho do arquivo (ver read_profile) ou iterável de blocos {t, po, vi}
+        """
+        if isinstance(source, (str, os.PathLike)):
+            source = read_profile(source, chunk_size=chunk_size, dt=dt)
+        return self.accumulate(self.operating(source))
+
+    def efficiency(self):
+        total = self.energy_out + self.energy_loss
+        return self.energy_out / total if total > 0 else 0.0
+
+    def show_info(self):
+        print(f"\n===============\t\tMISSÃO {self.topology.upper()}\t===============")
+        print(f"\tAmostras\t=\t{self.samples}"
+              f"\n\tTempo\t\t=\t{'{:2.3e}'.format(self.time)}\t[s]"
+              f"\n\tTempo DCM\t=\t{'{:.3f}'.format(100 * self.time_dcm / self.time if self.time else 0.0)}\t\t[%]"
+              f"\n\tE saída\t\t=\t{'{:2.3e}'.format(self.energy_out)}\t[J]"
+              f"\n\tE perdas\t=\t{'{:2.3e}'.format(self.energy_loss)}\t[J]"
+              f"\n\tEficiência\t=\t{'{:.3f}'.format(100 * self.efficiency())}\t\t[%]")
+        print(f"\tiLmax pico\t=\t{'{:.3f}'.format(self.peak['il_max'])}\t\t[A]"
+              f"\n\tIds_rms pico\t=\t{'{:.3f}'.format(self.peak['ids_rms'])}\t\t[A]"
+              f"\n\tD máx\t\t=\t{'{:.3f}'.format(100 * self.peak['d'])}\t\t[%]")
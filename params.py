@@ -0,0 +1,110 @@
+class Input:
+    """
+    Parâmetro de entrada de um modelo Reactive. Atribuir um novo valor invalida apenas as grandezas que dependem dele.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return obj._values[self.name]
+        except KeyError:
+            raise AttributeError(f"'{type(obj).__name__}' sem valor para '{self.name}'") from None
+
+    def __set__(self, obj, value):
+        obj._values[self.name] = value
+        obj.invalidate(self.name)
+
+
+class Derived:
+    """
+    Grandeza derivada, calculada somente quando lida e guardada até que uma dependência mude.
+
+    Atribuir um valor fixa a grandeza (ex.: um indutor comercial no lugar do calculado) até 'release(nome)'.
+    """
+
+    def __init__(self, func, deps):
+        self.func = func
+        self.deps = deps
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        values = obj._values
+        try:
+            return values[self.name]
+        except KeyError:
+            value = values[self.name] = self.func(obj)
+            return value
+
+    def __set__(self, obj, value):
+        obj._pinned.add(self.name)
+        obj._values[self.name] = value
+        obj.invalidate(self.name)
+
+
+def derived(*deps):
+    """
+    :param deps: nomes das entradas/grandezas usadas pelo método decorado
+    """
+    def wrapper(func):
+        return Derived(func, deps)
+
+    return wrapper
+
+
+class Reactive:
+    """
+    Base dos modelos com grafo de dependências entre parâmetros.
+
+    O grafo é montado uma vez por classe a partir das dependências declaradas em 'derived'.
+    """
+    _dependents = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        dependents = {}
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if isinstance(attr, Derived):
+                    for dep in attr.deps:
+                        dependents.setdefault(dep, []).append(name)
+        cls._dependents = dependents
+
+    def __init__(self):
+        self._values = {}
+        self._pinned = set()
+
+    def invalidate(self, name):
+        """
+        Descarta as grandezas a jusante de 'name'. Grandezas fixadas interrompem a propagação.
+        """
+        values = self._values
+        pinned = self._pinned
+        pendentes = list(self._dependents.get(name, ()))
+        vistos = set()
+        while pendentes:
+            dep = pendentes.pop()
+            if dep in vistos or dep in pinned:
+                continue
+            vistos.add(dep)
+            values.pop(dep, None)
+            pendentes.extend(self._dependents.get(dep, ()))
+
+    def release(self, name):
+        """
+        Libera uma grandeza fixada, que volta a ser calculada pelas equações do modelo.
+        """
+        self._pinned.discard(name)
+        self._values.pop(name, None)
+        self.invalidate(name)
+
+    def is_cached(self, name):
+        return name in self._values
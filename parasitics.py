@@ -0,0 +1,183 @@
+import numpy as np
+
+import symbolic
+from losses import Parasitics, losses
+
+_H = 1e-30  # passo da derivada por passo complexo
+
+
+def newton(g, x0, lower=None, upper=None, tol=1e-12, max_iter=50, patience=8):
+    """
+    Newton vetorizado para n equações escalares independentes g(x) = 0, uma por linha.
+
+    A derivada sai por passo complexo, g'(x) = Im g(x + ih) / h, exata até o arredondamento, então g deve ser
+    escrita só com operações analíticas (sem abs, clip ou where sobre x). Cada linha para ao convergir; o passo é
+    limitado a [lower, upper] por bissecção do passo. Linhas cujo |g| não melhora por 'patience' iterações
+    seguidas (sem raiz no intervalo) saem sem convergir, para não gastar as max_iter iterações.
+
+    :param g: função vetorizada, aceita arrays complexos
+    :param x0: chute inicial (n,)
+    :return: (x, convergiu, iterações, resíduo)
+    """
+    x = np.array(x0, dtype=float)
+    n = x.size
+    lower = np.broadcast_to(-np.inf if lower is None else lower, (n,))
+    upper = np.broadcast_to(np.inf if upper is None else upper, (n,))
+    convergiu = np.zeros(n, dtype=bool)
+    iteracoes = np.zeros(n, dtype=np.int32)
+    melhor = np.full(n, np.inf)
+    parado = np.zeros(n, dtype=np.int32)
+    ativo = np.isfinite(x)
+    for _ in range(max_iter):
+        if not ativo.any():
+            break
+        xa = x[ativo]
+        gz = g(xa + 1j * _H, ativo)
+        gx = gz.real
+        dg = gz.imag / _H
+        with np.errstate(divide="ignore", invalid="ignore"):
+            passo = -gx / dg
+        passo = np.where(np.isfinite(passo), passo, 0.0)
+        novo = xa + passo
+        # fora dos limites: vai só até a metade do caminho (e o passo não conta como convergência)
+        lo, hi = lower[ativo], upper[ativo]
+        fora = (novo <= lo) | (novo >= hi)
+        novo = np.where(novo <= lo, 0.5 * (xa + lo), novo)
+        novo = np.where(novo >= hi, 0.5 * (xa + hi), novo)
+        x[ativo] = novo
+        iteracoes[ativo] += 1
+        ok = ~fora & (np.abs(passo) <= tol * np.maximum(np.abs(novo), 1.0))
+        idx = np.flatnonzero(ativo)
+        convergiu[idx[ok]] = True
+        ativo[idx[ok]] = False
+        erro = np.abs(gx)
+        melhorou = erro < melhor[idx]
+        melhor[idx] = np.minimum(erro, melhor[idx])
+        parado[idx] = np.where(melhorou, 0, parado[idx] + 1)
+        ativo[idx[parado[idx] >= patience]] = False
+    residuo = np.abs(g(x.astype(complex), np.ones(n, dtype=bool)).real)
+    return x, convergiu, iteracoes, residuo
+
+
+def design(topology, vi, vo, po, f, dil, dvo, par=None, dcm=False, kd=None, tol=1e-12, max_iter=50):
+    """
+    Projeto não ideal em lote: duty, correntes, L e C com Rds_on, queda e resistência do diodo, DCR e ESR.
+
+    O duty sai do balanço volt-segundo no indutor com as quedas resistivas, acoplado à corrente média (no
+    BuckBoost iL = Io / (1 - D)). No DCM D = kd D_ccm (D_ccm já não ideal) e a incógnita é o pico de iL, ligado a
+    d2 pelo balanço e à carga entregue. C é dimensionado para a ondulação restante depois da parcela da ESR
+    (ESR x ondulação de iC, soma conservadora); quando a ESR sozinha já passa do limite a linha é marcada como
+    inviável.
+
+    Sem parasitas o resultado coincide com symbolic.design, menos o C do DCM: aqui C vem da carga exata acima de Io
+    (triângulo de iC), e não das aproximações das classes. No Buck, t (iL_max - Io) / (4 dVo) é conservadora: a
+    razão entre os dois é 1 - (1 - kd)^2, pois d + d2 = kd (0.91 com kd = 0.7; iguais só no limite kd = 1). No
+    BuckBoost, Io D T / dVo despreza a carga do intervalo do diodo e subestima C: a razão é (1 - d2 / 2)^2 / D, com
+    D = kd Vo / (Vi + Vo) e d2 = kd Vi / (Vi + Vo), que cresce quando Vo / Vi cai (1 / kd com Vo >> Vi; com kd = 0.7,
+    1.9x em Vo = Vi e 3.7x, 4.3x e 4.9x em Vo / Vi = 1/4, 1/5 e 1/6). É também quanto a ondulação real no C das
+    classes passa do alvo.
+
+    Para atingir dVo use este C: ripple.py (e Buck._vc_wave, que desenha com o C do objeto) dá a ondulação exata do
+    C recebido, sem corrigir nada, então ripple.from_design sobre symbolic.design mostra a ondulação do C das
+    classes, e não a pedida.
+
+    :param topology: 'buck' ou 'buckboost'
+    :param dil: ondulação relativa de iL no CCM
+    :param dvo: ondulação relativa total de Vo (capacitiva + ESR)
+    :param par: Parasitics
+    :param dcm: bool ou array de bool
+    :param kd: fração do duty CCM no DCM (padrão de symbolic.DEFAULT_KD)
+    :return: dicionário com d, d2, io, ii, il_avg, il_max, il_min, delta_il, ind, cap, il_rms, ids_rms, id_avg,
+             id_rms, vds_max, delta_vo_esr, perdas (losses), efficiency, feasible, converged, iterations, residual
+    """
+    par = par or Parasitics()
+    if kd is None:
+        kd = symbolic.DEFAULT_KD[topology]
+    arrays = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in (vi, vo, po, f, dil, dvo, dcm, kd)])
+    shape = arrays[0].shape
+    vi, vo, po, f, dil, dvo, dcm, kd = [a.ravel() for a in arrays]
+    dcm = dcm != 0
+    buck = topology == "buck"
+    t = 1 / f
+    io = po / vo
+    r_on = par.rds_on + par.dcr
+    r_off = par.r_d + par.dcr
+
+    # CCM: d (vL no ligado) + (1 - d) (vL no desligado) = 0
+    def g_ccm(d, m):
+        il = io[m] if buck else io[m] / (1 - d)
+        v_on = vi[m] - vo[m] - il * r_on if buck else vi[m] - il * r_on
+        v_off = vo[m] + par.vf + il * r_off
+        return d * v_on - (1 - d) * v_off
+
+    d0 = vo / vi if buck else vo / (vi + vo)
+    d_ccm, conv_ccm, it_ccm, res_ccm = newton(g_ccm, d0, 0.0, 1.0, tol, max_iter)
+
+    # DCM: incógnita é o pico de iL; d2 vem do balanço volt-segundo com as quedas no valor médio do triângulo
+    d_dcm = kd * d_ccm
+
+    def d2_de(ipk, m):
+        v_on = (vi[m] - vo[m] if buck else vi[m]) - 0.5 * ipk * r_on
+        v_off = vo[m] + par.vf + 0.5 * ipk * r_off
+        return d_dcm[m] * v_on / v_off
+
+    def g_dcm(ipk, m):
+        d2 = d2_de(ipk, m)
+        carga = ipk * (d_dcm[m] + d2) if buck else ipk * d2  # 2 x corrente média entregue
+        return carga - 2 * io[m]
+
+    d2_ideal = d_dcm * ((vi - vo) / vo if buck else vi / vo)
+    ipk0 = 2 * io / (d_dcm + d2_ideal if buck else d2_ideal)
+    ipk, conv_dcm, it_dcm, res_dcm = newton(g_dcm, ipk0, 0.0, None, tol, max_iter)
+    todos = np.ones(len(vi), dtype=bool)
+    d2_dcm = d2_de(ipk, todos)
+
+    # correntes
+    il_ccm = io if buck else io / (1 - d_ccm)
+    delta_ccm = dil * il_ccm
+    v_on_ccm = (vi - vo if buck else vi) - il_ccm * r_on
+    v_on_dcm = (vi - vo if buck else vi) - 0.5 * ipk * r_on
+
+    d = np.where(dcm, d_dcm, d_ccm)
+    d2 = np.where(dcm, d2_dcm, 1 - d_ccm)
+    il_max = np.where(dcm, ipk, il_ccm + 0.5 * delta_ccm)
+    il_min = np.where(dcm, 0.0, il_ccm - 0.5 * delta_ccm)
+    delta_il = il_max - il_min
+    il_avg = np.where(dcm, 0.5 * ipk * (d_dcm + d2_dcm), il_ccm)
+    ind = np.where(dcm, v_on_dcm * d_dcm * t / ipk, v_on_ccm * d_ccm * t / delta_ccm)
+    il2_ccm = il_ccm ** 2 + delta_ccm ** 2 / 12
+    with np.errstate(invalid="ignore"):  # linhas sem solução ficam NaN (feasible = False)
+        il_rms = np.sqrt(np.where(dcm, ipk ** 2 * (d_dcm + d2_dcm) / 3, il2_ccm))
+        ids_rms = np.sqrt(np.where(dcm, ipk ** 2 * d_dcm / 3, d_ccm * il2_ccm))
+        id_rms = np.sqrt(np.where(dcm, ipk ** 2 * d2_dcm / 3, (1 - d_ccm) * il2_ccm))
+    ids_avg = np.where(dcm, 0.5 * ipk * d_dcm, d_ccm * il_ccm)
+    id_avg = np.where(dcm, 0.5 * ipk * d2_dcm, (1 - d_ccm) * il_ccm)
+
+    # capacitor: ondulação de iC e carga acima de Io
+    delta_ic = delta_il if buck else il_max
+    delta_vo_esr = par.esr * delta_ic
+    dv_cap = dvo * vo - delta_vo_esr
+    if buck:
+        cond = np.where(dcm, d_dcm + d2_dcm, 1.0)  # fração do período com iL > 0
+        q_dcm = 0.5 * (ipk - io) * (1 - io / ipk) * cond * t
+        q = np.where(dcm, q_dcm, delta_ccm * t / 8)
+    else:
+        q_dcm = 0.5 * (ipk - io) * (1 - io / ipk) * d2_dcm * t
+        q = np.where(dcm, q_dcm, io * d_ccm * t)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cap = np.where(dv_cap > 0, q / dv_cap, np.nan)
+
+    converged = np.where(dcm, conv_ccm & conv_dcm, conv_ccm)
+    feasible = converged & (dv_cap > 0) & (d > 0) & (d < 1) & (ind > 0) & (d + d2 <= 1 + 1e-9)
+    vds_max = vi if buck else vi + vo
+    res = {"d": d, "d2": d2, "t": t, "io": io, "ii": ids_avg, "il_avg": il_avg, "il_max": il_max,
+           "il_min": il_min, "delta_il": delta_il, "ind": ind, "cap": cap, "il_rms": il_rms, "ids_rms": ids_rms,
+           "ids_avg": ids_avg, "id_avg": id_avg, "id_rms": id_rms, "ids_max": il_max, "id_max": il_max,
+           "vds_max": vds_max + 0 * vi, "vd_max": vds_max + 0 * vi, "delta_vo_esr": delta_vo_esr}
+    res.update(losses(topology, res, f, par))
+    res["efficiency"] = po / (po + res["p_total"])
+    res["feasible"] = feasible
+    res["converged"] = converged
+    res["iterations"] = np.where(dcm, it_ccm + it_dcm, it_ccm)
+    res["residual"] = np.where(dcm, res_dcm, res_ccm)
+    return {n: v.reshape(shape) for n, v in res.items()}
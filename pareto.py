@@ -0,0 +1,425 @@
+import os
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import symbolic
+
+VARIABLES = ["f", "dil", "dvo", "kd", "dcm"]
+BOUNDS = {"f": (10e3, 500e3), "dil": (0.05, 0.6), "dvo": (0.002, 0.05), "kd": (0.3, 1.0)}
+
+# Objetivos (todos minimizados) a partir das saídas de symbolic.design, das variáveis e de vo
+OBJECTIVES = {
+    "energy": lambda res, x, vo: 0.5 * res["ind"] * res["il_max"] ** 2 + 0.5 * res["cap"] * vo ** 2,
+    "lc": lambda res, x, vo: res["ind"] * res["cap"],
+    "ids_rms": lambda res, x, vo: res["ids_rms"],
+    "il_max": lambda res, x, vo: res["il_max"],
+    "delta_vo": lambda res, x, vo: x["dvo"] * vo,
+    "dil": lambda res, x, vo: x["dil"],
+    "f": lambda res, x, vo: x["f"],
+}
+
+
+def _rank_2d(obj):
+    """
+    Frentes não dominadas para dois objetivos em O(n log n): em ordem lexicográfica (f1, f2), cada ponto entra na
+    primeira frente cujo último ponto não o domina. O f2 do último ponto de cada frente cresce com a frente, então
+    a frente certa sai por busca binária.
+    """
+    n = len(obj)
+    ordem = np.lexsort((obj[:, 1], obj[:, 0]))
+    rank = np.empty(n, dtype=np.int64)
+    ultimo_f2 = []
+    ultimo = []
+    for i in ordem:
+        a, b = obj[i]
+        k = bisect_right(ultimo_f2, b)
+        # empate em f2 com o último ponto da frente k-1: só é dominado se f1 for maior
+        if k > 0 and ultimo_f2[k - 1] == b and obj[ultimo[k - 1], 0] == a:
+            k -= 1
+        if k == len(ultimo_f2):
+            ultimo_f2.append(b)
+            ultimo.append(i)
+        else:
+            ultimo_f2[k] = b
+            ultimo[k] = i
+        rank[i] = k
+    return rank
+
+
+class _Staircase:
+    """
+    Máximo do rank entre os pontos inseridos com f2 <= q: guarda só os pontos em que o rank cresce com f2.
+    """
+
+    def __init__(self):
+        self.f2 = []
+        self.rank = []
+
+    def query(self, q):
+        k = bisect_right(self.f2, q)
+        return self.rank[k - 1] if k else -1
+
+    def insert(self, v, r):
+        k = bisect_right(self.f2, v)
+        if k and self.rank[k - 1] >= r:
+            return
+        if k and self.f2[k - 1] == v:
+            k -= 1
+        fim = k
+        while fim < len(self.rank) and self.rank[fim] <= r:
+            fim += 1
+        self.f2[k:fim] = [v]
+        self.rank[k:fim] = [r]
+
+
+class _JensenFortin:
+    # Subproblemas menores que isto (pontos, ou pares L x H) vão por matriz de dominância vetorizada
+    BRUTE = 64
+    BRUTE_PAIRS = 1 << 14
+
+    def __init__(self, obj):
+        """
+        Ordenação não dominada de Jensen-Fortin, na versão de Buzdalov e Shalyto, em O(n log^(m-1) n). Os pontos
+        estão em ordem lexicográfica e sem repetição, então p antes de q e p <= q em todos os objetivos já implica
+        dominação. helper_a ordena um conjunto pelos k primeiros objetivos; helper_b propaga os ranks já finais de
+        L para H, sabendo que L <= H nos objetivos de índice >= k.
+        """
+        self.obj = obj
+        self.rank = np.zeros(len(obj), dtype=np.int64)
+
+    def __brute_a(self, s, k):
+        v = self.obj[s, :k]
+        d = np.all(v[:, None, :] <= v[None, :, :], axis=2)  # d[i, j]: i domina j (i antes de j)
+        d = np.triu(d, 1)
+        r = self.rank[s]
+        for j in range(1, len(s)):
+            dom = d[:j, j]
+            if dom.any():
+                r[j] = max(r[j], r[:j][dom].max() + 1)
+        self.rank[s] = r
+
+    def __brute_b(self, lo, hi, k):
+        d = np.all(self.obj[lo, None, :k] <= self.obj[None, hi, :k], axis=2) & (lo[:, None] < hi[None, :])
+        cand = np.where(d, self.rank[lo][:, None] + 1, -1).max(axis=0)
+        self.rank[hi] = np.maximum(self.rank[hi], cand)
+
+    def __sweep_a(self, s):
+        escada = _Staircase()
+        rank = self.rank
+        for i, v in zip(s.tolist(), self.obj[s, 1].tolist()):
+            r = max(rank[i], escada.query(v) + 1)
+            rank[i] = r
+            escada.insert(v, r)
+
+    def __sweep_b(self, lo, hi):
+        escada = _Staircase()
+        rank = self.rank
+        lo_l, hi_l = lo.tolist(), hi.tolist()
+        lo_v, hi_v = self.obj[lo, 1].tolist(), self.obj[hi, 1].tolist()
+        a = 0
+        for i, v in zip(hi_l, hi_v):
+            while a < len(lo_l) and lo_l[a] < i:
+                escada.insert(lo_v[a], rank[lo_l[a]])
+                a += 1
+            q = escada.query(v)
+            if q >= rank[i]:
+                rank[i] = q + 1
+
+    def helper_a(self, s, k):
+        if len(s) < 2:
+            return
+        if len(s) <= self.BRUTE:
+            return self.__brute_a(s, k)
+        if k == 2:
+            return self.__sweep_a(s)
+        v = self.obj[s, k - 1]
+        m = np.partition(v, len(v) // 2)[len(v) // 2]
+        if v.min() == v.max():
+            return self.helper_a(s, k - 1)
+        menor, igual, maior = s[v < m], s[v == m], s[v > m]
+        self.helper_a(menor, k)
+        self.helper_b(menor, igual, k - 1)
+        self.helper_a(igual, k - 1)
+        self.helper_b(s[v <= m], maior, k - 1)
+        self.helper_a(maior, k)
+
+    def helper_b(self, lo, hi, k):
+        if not len(lo) or not len(hi):
+            return
+        if len(lo) * len(hi) <= self.BRUTE_PAIRS:
+            return self.__brute_b(lo, hi, k)
+        if k == 2:
+            return self.__sweep_b(lo, hi)
+        vl, vh = self.obj[lo, k - 1], self.obj[hi, k - 1]
+        if vl.max() <= vh.min():
+            return self.helper_b(lo, hi, k - 1)
+        if vl.min() > vh.max():
+            return
+        todos = np.concatenate([vl, vh])
+        m = np.partition(todos, len(todos) // 2)[len(todos) // 2]
+        self.helper_b(lo[vl < m], hi[vh < m], k)
+        self.helper_b(lo[vl > m], hi[vh > m], k)
+        self.helper_b(lo[vl <= m], hi[vh >= m], k - 1)
+
+
+def _rank_nd(obj):
+    """
+    Frentes não dominadas para três ou mais objetivos em O(n log^(m-1) n) (_JensenFortin). Pontos repetidos
+    recebem o mesmo rank.
+    """
+    unicos, inverso = np.unique(obj, axis=0, return_inverse=True)  # já em ordem lexicográfica
+    jf = _JensenFortin(unicos)
+    jf.helper_a(np.arange(len(unicos)), obj.shape[1])
+    return jf.rank[inverso.ravel()]
+
+
+def non_dominated_rank(obj, violation=None):
+    """
+    Índice da frente de cada ponto (0 = não dominado), com dominação por restrições: todo ponto viável vem antes
+    de qualquer inviável, e os inviáveis são ordenados pela violação.
+
+    :param obj: (n, n_objetivos), minimização
+    :param violation: (n,) >= 0; 0 para pontos viáveis
+    """
+    obj = np.asarray(obj, dtype=float)
+    n = len(obj)
+    rank = np.zeros(n, dtype=np.int64)
+    viavel = np.ones(n, dtype=bool) if violation is None else violation <= 0
+    v = obj[viavel]
+    if len(v):
+        rank[viavel] = _rank_2d(v) if obj.shape[1] == 2 else _rank_nd(v) if obj.shape[1] > 2 else \
+            np.unique(v[:, 0], return_inverse=True)[1]
+    if not viavel.all():
+        base = rank[viavel].max() + 1 if viavel.any() else 0
+        rank[~viavel] = base + np.unique(violation[~viavel], return_inverse=True)[1]
+    return rank
+
+
+def crowding(obj, rank):
+    """
+    Distância de aglomeração do NSGA-II dentro de cada frente (infinita nos extremos).
+    """
+    n, m = obj.shape
+    dist = np.zeros(n)
+    if n <= 2:
+        return np.full(n, np.inf)
+    for j in range(m):
+        # ordem por frente e, dentro dela, pelo objetivo j
+        ordem = np.lexsort((obj[:, j], rank))
+        r = rank[ordem]
+        v = obj[ordem, j]
+        inicio = np.r_[True, r[1:] != r[:-1]]
+        fim = np.r_[r[1:] != r[:-1], True]
+        faixa = np.maximum.reduceat(v, np.flatnonzero(inicio)) - np.minimum.reduceat(v, np.flatnonzero(inicio))
+        faixa = np.repeat(faixa, np.diff(np.r_[np.flatnonzero(inicio), n]))
+        meio = np.r_[0.0, (v[2:] - v[:-2]), 0.0] / np.where(faixa > 0, faixa, np.inf)
+        contrib = np.where(inicio | fim, np.inf, meio)
+        dist[ordem] += contrib
+    return dist
+
+
+class NSGA2:
+    def __init__(self, topology, vi, vo, po, objectives=("energy", "ids_rms", "delta_vo", "f"), bounds=None,
+                 mode="both", pop_size=200, eta_c=15.0, eta_m=20.0, p_mut=None, seed=None):
+        """
+        Otimização multiobjetivo (NSGA-II) das variáveis de projeto f, dil, dvo, kd (percent_duty) e modo, com a
+        população inteira avaliada como arrays por symbolic.design a cada geração.
+
+        Projetos sem solução (saídas não finitas, L ou C não positivos, ou d + d2 > 1 no DCM) são inviáveis e ficam
+        atrás de todos os viáveis na seleção.
+
+        :param topology: 'buck' ou 'buckboost'
+        :param vi, vo, po: ponto de operação fixo
+        :param objectives: nomes de OBJECTIVES ou funções (res, x, vo) -> array, todos minimizados (com ilhas em
+        processos separados, só funções definidas no nível de um módulo)
+        :param bounds: limites {variável: (min, max)} que substituem BOUNDS; f é buscada em escala logarítmica
+        :param mode: 'ccm', 'dcm' ou 'both' (o modo vira uma variável binária)
+        :param eta_c, eta_m: índices de distribuição do cruzamento SBX e da mutação polinomial
+        :param p_mut: probabilidade de mutação por variável (padrão 1 / n_variáveis)
+        """
+        self.topology = topology
+        self.vi, self.vo, self.po = vi, vo, po
+        self.objectives = list(objectives)
+        self.bounds = dict(BOUNDS, **(bounds or {}))
+        self.mode = mode
+        self.pop_size = pop_size
+        self.eta_c = eta_c
+        self.eta_m = eta_m
+        self.p_mut = p_mut if p_mut is not None else 1 / len(VARIABLES)
+        self.rng = np.random.default_rng(seed)
+        lo = np.array([self.bounds[n][0] for n in VARIABLES[:-1]], dtype=float)
+        hi = np.array([self.bounds[n][1] for n in VARIABLES[:-1]], dtype=float)
+        lo[0], hi[0] = np.log(lo[0]), np.log(hi[0])
+        self.__lo, self.__hi = lo, hi
+
+    def to_dict(self):
+        return {"topology": self.topology, "vi": self.vi, "vo": self.vo, "po": self.po,
+                "objectives": self.objectives, "bounds": self.bounds, "mode": self.mode, "pop_size": self.pop_size,
+                "eta_c": self.eta_c, "eta_m": self.eta_m, "p_mut": self.p_mut}
+
+    def decode(self, z):
+        """
+        :param z: genes (n, 5) em [0, 1]
+        :return: {f, dil, dvo, kd, dcm}
+        """
+        v = self.__lo + z[:, :4] * (self.__hi - self.__lo)
+        x = {"f": np.exp(v[:, 0]), "dil": v[:, 1], "dvo": v[:, 2], "kd": v[:, 3]}
+        if self.mode == "both":
+            x["dcm"] = z[:, 4] >= 0.5
+        else:
+            x["dcm"] = np.full(len(z), self.mode == "dcm")
+        return x
+
+    def evaluate(self, z):
+        """
+        :return: (objetivos (n, n_obj), violação (n,), variáveis, saídas de symbolic.design)
+        """
+        x = self.decode(z)
+        with np.errstate(all="ignore"):
+            res = symbolic.design(self.topology, self.vi, self.vo, self.po, x["f"], x["dil"], x["dvo"], x["dcm"],
+                                  x["kd"])
+            obj = np.stack([np.broadcast_to(OBJECTIVES[o](res, x, self.vo) if isinstance(o, str)
+                                            else o(res, x, self.vo), (len(z),)) for o in self.objectives], axis=1)
+            excesso = np.maximum(res["tx"] / res["t"] - 1, 0.0)
+            violacao = excesso + np.maximum(-res["ind"], 0.0) + np.maximum(-res["cap"], 0.0)
+        violacao = np.where(np.all(np.isfinite(obj), axis=1) & np.isfinite(violacao), violacao, np.inf)
+        return obj, violacao, x, res
+
+    def initial(self, n=None):
+        return self.rng.random((n or self.pop_size, len(VARIABLES)))
+
+    def __variation(self, pais):
+        """
+        Cruzamento SBX e mutação polinomial nos genes contínuos; troca uniforme e inversão no gene do modo.
+        """
+        n = len(pais) // 2 * 2
+        a, b = pais[0:n:2], pais[1:n:2]
+        u = self.rng.random(a.shape)
+        beta = np.where(u <= 0.5, (2 * u) ** (1 / (self.eta_c + 1)), (1 / (2 * (1 - u))) ** (1 / (self.eta_c + 1)))
+        troca = self.rng.random(a.shape) < 0.5
+        c1 = 0.5 * ((1 + beta) * a + (1 - beta) * b)
+        c2 = 0.5 * ((1 - beta) * a + (1 + beta) * b)
+        c1[:, 4] = np.where(troca[:, 4], b[:, 4], a[:, 4])
+        c2[:, 4] = np.where(troca[:, 4], a[:, 4], b[:, 4])
+        filhos = np.clip(np.concatenate([c1, c2]), 0.0, 1.0)
+
+        muta = self.rng.random(filhos.shape) < self.p_mut
+        u = self.rng.random(filhos.shape)
+        delta = np.where(u < 0.5, (2 * u) ** (1 / (self.eta_m + 1)) - 1, 1 - (2 * (1 - u)) ** (1 / (self.eta_m + 1)))
+        mutado = np.clip(filhos + delta * np.where(u < 0.5, filhos, 1 - filhos), 0.0, 1.0)
+        mutado[:, 4] = 1 - filhos[:, 4]
+        return np.where(muta, mutado, filhos)
+
+    def __tournament(self, rank, dist, n):
+        i, j = self.rng.integers(0, len(rank), (2, n))
+        melhor = (rank[i] < rank[j]) | ((rank[i] == rank[j]) & (dist[i] > dist[j]))
+        return np.where(melhor, i, j)
+
+    def select(self, z, obj, violacao, n):
+        """
+        Sobrevivência do NSGA-II: frentes inteiras em ordem e, na última que cabe, os de maior aglomeração.
+
+        :return: índices dos n sobreviventes, rank e distância de aglomeração
+        """
+        rank = non_dominated_rank(obj, violacao)
+        dist = crowding(np.where(np.isfinite(obj), obj, 0.0), rank)
+        ordem = np.lexsort((-dist, rank))[:n]
+        return ordem, rank[ordem], dist[ordem]
+
+    def evolve(self, z, generations):
+        """
+        Roda 'generations' gerações a partir da população z.
+
+        :return: população final (pop_size, 5)
+        """
+        obj, violacao, _, _ = self.evaluate(z)
+        ordem, rank, dist = self.select(z, obj, violacao, len(z))
+        z, obj, violacao = z[ordem], obj[ordem], violacao[ordem]
+        for _ in range(generations):
+            pais = z[self.__tournament(rank, dist, self.pop_size)]
+            filhos = self.__variation(pais)
+            o, v, _, _ = self.evaluate(filhos)
+            z = np.concatenate([z, filhos])
+            obj = np.concatenate([obj, o])
+            violacao = np.concatenate([violacao, v])
+            ordem, rank, dist = self.select(z, obj, violacao, self.pop_size)
+            z, obj, violacao = z[ordem], obj[ordem], violacao[ordem]
+        return z
+
+    def front(self, z):
+        """
+        Frente não dominada viável de uma população.
+
+        :return: dicionário com as variáveis, os objetivos (por nome) e as saídas de symbolic.design da frente,
+                 ordenado pelo primeiro objetivo
+        """
+        obj, violacao, x, res = self.evaluate(z)
+        rank = non_dominated_rank(obj, violacao)
+        sel = np.flatnonzero((rank == 0) & (violacao <= 0))
+        sel = sel[np.argsort(obj[sel, 0], kind="stable")]
+        # projetos repetidos (mesmos genes) aparecem uma vez
+        _, unico = np.unique(z[sel], axis=0, return_index=True)
+        sel = sel[np.sort(unico)]
+        out = {n: np.asarray(v)[sel] for n, v in x.items()}
+        for i, o in enumerate(self.objectives):
+            out[o if isinstance(o, str) else f"obj{i}"] = obj[sel, i]
+        for n, v in res.items():
+            out.setdefault(n, np.broadcast_to(v, (len(z),))[sel])
+        return out
+
+    def run(self, generations=100, islands=1, migration=10, migrants=None, workers=None, seed=None):
+        """
+        Executa o NSGA-II. Com islands > 1 cada ilha evolui uma população própria num processo separado
+        (ProcessPoolExecutor); a cada 'migration' gerações os melhores de cada ilha substituem os piores da
+        seguinte (anel).
+
+        :param migrants: número de migrantes por ilha (padrão 5 % da população)
+        :param workers: processos (None = min(islands, os.cpu_count())); 0 roda as ilhas no processo atual
+        :return: frente (ver front) da união final das ilhas
+        """
+        if islands <= 1:
+            return self.front(self.evolve(self.initial(), generations))
+
+        semente = np.random.SeedSequence(seed)
+        sementes = [int(s.generate_state(1)[0]) for s in semente.spawn(islands * (-(-generations // migration)))]
+        migrants = migrants or max(1, self.pop_size // 20)
+        pops = [self.initial() for _ in range(islands)]
+        config = self.to_dict()
+        workers = min(islands, os.cpu_count() or 1) if workers is None else workers
+        ex = ProcessPoolExecutor(max_workers=workers) if workers else None
+        try:
+            feitas = 0
+            while feitas < generations:
+                n = min(migration, generations - feitas)
+                tarefas = [(config, p, sementes.pop(), n) for p in pops]
+                pops = list(ex.map(_island, tarefas) if ex else map(_island, tarefas))
+                feitas += n
+                # migração em anel: pops já vêm ordenadas por sobrevivência (melhores primeiro)
+                melhores = [p[:migrants].copy() for p in pops]
+                for i in range(islands):
+                    pops[i][-migrants:] = melhores[i - 1]
+        finally:
+            if ex:
+                ex.shutdown()
+        return self.front(np.concatenate(pops))
+
+
+def _island(tarefa):
+    config, z, semente, generations = tarefa
+    otimizador = NSGA2(seed=semente, **config)
+    z = otimizador.evolve(z, generations)
+    obj, violacao, _, _ = otimizador.evaluate(z)
+    ordem, _, _ = otimizador.select(z, obj, violacao, len(z))
+    return z[ordem]
+
+
+def optimize(topology, vi, vo, po, generations=100, islands=1, migration=10, migrants=None, workers=None, seed=None,
+             **kwargs):
+    """
+    Atalho para NSGA2(...).run(...): generations, islands, migration, migrants, workers e seed vão para run, o
+    resto (kwargs) para o construtor.
+    """
+    return NSGA2(topology, vi, vo, po, seed=seed, **kwargs).run(generations, islands, migration, migrants,
+                                                                 workers=workers, seed=seed)
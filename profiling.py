@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import functools
+import threading
+
+
+class Profiler:
+    def __init__(self):
+        """
+        Instrumentação opcional dos métodos de projeto e esforços.
+
+        Desativado por padrão: os métodos decorados com 'instrument' apenas testam 'self.enabled' e chamam a função
+        original. Quando ativo, acumula por método o número de chamadas, o tempo total/mínimo/máximo e o número de
+        avaliações de integrandos (quad, sp.integrate) feitas dentro dele.
+        """
+        self.enabled = False
+        self.trace = False
+        self.stats = {}
+        self.events = []
+        self.__local = threading.local()
+        self.__origem = time.perf_counter()
+
+    def enable(self, trace=False):
+        """
+        :param trace: True, se cada chamada deve ser guardada para exportação no formato Chrome-trace
+        """
+        self.enabled = True
+        self.trace = trace
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.stats.clear()
+        self.events.clear()
+        self.__origem = time.perf_counter()
+
+    def __enter__(self):
+        self.enable(trace=True)
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+        return False
+
+    def __stack(self):
+        stack = getattr(self.__local, "stack", None)
+        if stack is None:
+            stack = self.__local.stack = []
+        return stack
+
+    def _begin(self):
+        stack = self.__stack()
+        stack.append(0)
+        return time.perf_counter()
+
+    def _end(self, name, inicio):
+        fim = time.perf_counter()
+        dur = fim - inicio
+        evals = self.__stack().pop()
+
+        s = self.stats.get(name)
+        if s is None:
+            s = self.stats[name] = {"calls": 0, "total": 0.0, "min": dur, "max": dur, "evals": 0}
+        s["calls"] += 1
+        s["total"] += dur
+        s["evals"] += evals
+        if dur < s["min"]:
+            s["min"] = dur
+        if dur > s["max"]:
+            s["max"] = dur
+
+        if self.trace:
+            self.events.append((name, inicio - self.__origem, dur, threading.get_ident(), evals))
+
+    def count_evals(self, n=1):
+        """
+        Soma 'n' avaliações numéricas ao método instrumentado mais interno em execução.
+        """
+        if not self.enabled:
+            return
+        stack = self.__stack()
+        if stack:
+            stack[-1] += n
+
+    def counted(self, func):
+        """
+        Envolve um integrando para contar suas avaliações. Com o perfilador desativado devolve a própria função.
+        """
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self.count_evals()
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    def report(self):
+        """
+        :return: dicionário {método: {calls, total, mean, min, max, evals}}, tempos em segundos
+        """
+        rep = {}
+        for name, s in self.stats.items():
+            rep[name] = dict(s, mean=s["total"] / s["calls"])
+        return rep
+
+    def to_json(self, path):
+        with open(path, "w") as fp:
+            json.dump(self.report(), fp, indent=2)
+
+    def to_chrome_trace(self, path):
+        """
+        Exporta as chamadas guardadas (enable(trace=True)) no formato aceito por chrome://tracing e Perfetto.
+        """
+        pid = os.getpid()
+        eventos = [{"name": name,
+                    "ph": "X",
+                    "ts": inicio * 1e6,
+                    "dur": dur * 1e6,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"evals": evals}}
+                   for name, inicio, dur, tid, evals in self.events]
+        with open(path, "w") as fp:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, fp)
+
+    def show_info(self):
+        print(f"\n===============\t\tPROFILER\t===============")
+        for name, s in sorted(self.report().items(), key=lambda kv: -kv[1]["total"]):
+            print(f"\t{name}"
+                  f"\n\t\tcalls\t=\t{s['calls']}"
+                  f"\n\t\ttotal\t=\t{'{:2.3e}'.format(s['total'])}\t[s]"
+                  f"\n\t\tmin\t=\t{'{:2.3e}'.format(s['min'])}\t[s]"
+                  f"\n\t\tmax\t=\t{'{:2.3e}'.format(s['max'])}\t[s]"
+                  f"\n\t\tevals\t=\t{s['evals']}")
+
+
+profiler = Profiler()
+
+
+def instrument(func):
+    """
+    Decorador dos métodos de projeto/esforço. Custo quando desativado: um teste de atributo por chamada.
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        inicio = profiler._begin()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler._end(name, inicio)
+
+    return wrapper
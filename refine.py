@@ -0,0 +1,220 @@
+import numpy as np
+
+import symbolic
+
+
+def _limits(res, limits):
+    """
+    Flags de restrição: True dentro de [min, max] (None = sem limite daquele lado).
+    """
+    flags = {}
+    for nome, (lo, hi) in limits.items():
+        v = res[nome]
+        ok = np.ones(np.shape(v), dtype=bool)
+        if lo is not None:
+            ok &= v >= lo
+        if hi is not None:
+            ok &= v <= hi
+        flags[f"{nome}_ok"] = ok
+    return flags
+
+
+class AdaptiveMap:
+    def __init__(self, func, x_range, y_range, n0=(8, 8), max_level=5, metrics=None, log_x=False, log_y=False):
+        """
+        Mapa 2D refinado em quadtree: parte de uma grade grossa n0 e subdivide recursivamente as células em que
+        algum flag (modo, restrição) muda entre os cantos e o centro, ou em que alguma métrica se afasta da
+        interpolação bilinear dos cantos no centro mais que a tolerância relativa.
+
+        Os pontos vivem na rede da resolução mais fina (n0 * 2^max_level por eixo), identificados por índices
+        inteiros, então cada canto é avaliado uma única vez mesmo sendo compartilhado por células de níveis
+        diferentes. Cada nível é avaliado numa só chamada vetorizada de func.
+
+        :param func: func(x, y) -> (flags, valores): dicionários de arrays bool e float
+        :param x_range, y_range: (min, max) de cada eixo
+        :param n0: células da grade inicial (nx, ny)
+        :param max_level: níveis de subdivisão
+        :param metrics: {nome: tolerância relativa} das métricas que também guiam o refinamento
+        :param log_x, log_y: eixos em escala logarítmica (ex.: frequência)
+        """
+        self.func = func
+        self.n0 = tuple(n0)
+        self.max_level = max_level
+        self.metrics = dict(metrics or {})
+        self.log = (log_x, log_y)
+        self.range = [np.log(r) if lg else np.asarray(r, dtype=float) for r, lg in zip((x_range, y_range), self.log)]
+        self.size = tuple(n * (1 << max_level) for n in self.n0)  # células da rede mais fina
+        self.__keys = np.empty(0, dtype=np.int64)
+        self.__flags = {}
+        self.__values = {}
+        self.leaves = None
+        self.evaluations = 0
+
+    def __coord(self, ix, iy):
+        x = self.range[0][0] + (self.range[0][1] - self.range[0][0]) * ix / self.size[0]
+        y = self.range[1][0] + (self.range[1][1] - self.range[1][0]) * iy / self.size[1]
+        return (np.exp(x) if self.log[0] else x), (np.exp(y) if self.log[1] else y)
+
+    def __key(self, ix, iy):
+        return ix.astype(np.int64) * (self.size[1] + 1) + iy
+
+    def __lookup(self, ix, iy):
+        """
+        Índices dos pontos no cache, avaliando de uma vez os que ainda não existem. Inserir pontos muda os índices,
+        então todos os pontos de uma etapa devem ser pedidos numa só chamada.
+        """
+        chave = self.__key(ix, iy)
+        novas = np.setdiff1d(np.unique(chave), self.__keys, assume_unique=True)
+        if len(novas):
+            flags, valores = self.func(*self.__coord(novas // (self.size[1] + 1), novas % (self.size[1] + 1)))
+            self.evaluations += len(novas)
+            chaves = np.concatenate([self.__keys, novas])
+            ordem = np.argsort(chaves, kind="stable")
+            self.__keys = chaves[ordem]
+            for destino, fonte in ((self.__flags, flags), (self.__values, valores)):
+                for n, v in fonte.items():
+                    v = np.broadcast_to(v, novas.shape)
+                    antigo = destino.get(n, np.empty(0, dtype=v.dtype))
+                    destino[n] = np.concatenate([antigo, v])[ordem]
+        return np.searchsorted(self.__keys, chave)
+
+    def run(self):
+        """
+        :return: self, com as folhas em self.leaves (ver mesh)
+        """
+        nx, ny = self.n0
+        passo = 1 << self.max_level
+        i, j = np.meshgrid(np.arange(nx), np.arange(ny), indexing="ij")
+        ix, iy = (i.ravel() * passo).astype(np.int64), (j.ravel() * passo).astype(np.int64)
+        folhas = []
+        for nivel in range(self.max_level + 1):
+            if not len(ix):
+                break
+            lado = passo >> nivel
+            meio = lado // 2
+            pontos = [(ix, iy), (ix + lado, iy), (ix, iy + lado), (ix + lado, iy + lado), (ix + meio, iy + meio)]
+            k = self.__lookup(np.concatenate([a for a, _ in pontos]), np.concatenate([b for _, b in pontos]))
+            if nivel == self.max_level or meio == 0:
+                folhas.append((ix, iy, np.full(len(ix), nivel)))
+                break
+            k = k.reshape(5, -1)
+            k, kc = k[:4], k[4]
+            refinar = np.zeros(len(ix), dtype=bool)
+            for v in self.__flags.values():
+                todos = np.concatenate([v[k], v[kc][None]])
+                refinar |= todos.any(axis=0) & ~todos.all(axis=0)
+            for n, tol in self.metrics.items():
+                v = self.__values[n]
+                escala = np.maximum(np.max(np.abs(v[k]), axis=0), np.abs(v[kc]))
+                with np.errstate(invalid="ignore"):
+                    erro = np.abs(v[kc] - v[k].mean(axis=0))
+                refinar |= (erro > tol * escala) | (np.isfinite(v[kc]) != np.isfinite(v[k]).all(axis=0))
+            folhas.append((ix[~refinar], iy[~refinar], np.full(int((~refinar).sum()), nivel)))
+            ix, iy = ix[refinar], iy[refinar]
+            ix = np.concatenate([ix, ix + meio, ix, ix + meio])
+            iy = np.concatenate([iy, iy, iy + meio, iy + meio])
+        ix, iy, nivel = (np.concatenate(v) for v in zip(*folhas))
+        self.leaves = {"ix": ix, "iy": iy, "level": nivel}
+        return self
+
+    def mesh(self):
+        """
+        Malha refinada compacta.
+
+        :return: dicionário com 'cells' (n, 4) = (x0, y0, x1, y1) e 'level' das folhas, e 'x', 'y' e os flags e
+                 valores de todos os pontos avaliados
+        """
+        f = self.leaves
+        lado = (1 << self.max_level) >> f["level"]
+        x0, y0 = self.__coord(f["ix"], f["iy"])
+        x1, y1 = self.__coord(f["ix"] + lado, f["iy"] + lado)
+        x, y = self.__coord(self.__keys // (self.size[1] + 1), self.__keys % (self.size[1] + 1))
+        res = {"cells": np.stack([x0, y0, x1, y1], axis=1), "level": f["level"], "x": x, "y": y}
+        res.update(self.__flags)
+        res.update(self.__values)
+        return res
+
+    def boundary(self, flag):
+        """
+        :return: (n, 4) células folha cortadas pela fronteira de um flag (cantos e centro não unânimes)
+        """
+        f = self.leaves
+        lado = (1 << self.max_level) >> f["level"]
+        pontos = [(f["ix"], f["iy"]), (f["ix"] + lado, f["iy"]), (f["ix"], f["iy"] + lado),
+                  (f["ix"] + lado, f["iy"] + lado), (f["ix"] + lado // 2, f["iy"] + lado // 2)]
+        k = self.__lookup(np.concatenate([a for a, _ in pontos]), np.concatenate([b for _, b in pontos]))
+        todos = self.__flags[flag][k].reshape(5, -1)
+        sel = todos.any(axis=0) & ~todos.all(axis=0)
+        return self.mesh()["cells"][sel]
+
+    def classify(self, x, y, flag):
+        """
+        Flag em pontos quaisquer: o valor do ponto avaliado mais próximo na folha que contém cada ponto (cantos e
+        centro), sem avaliar func.
+        """
+        u = np.stack([np.log(x) if self.log[0] else np.asarray(x, dtype=float),
+                      np.log(y) if self.log[1] else np.asarray(y, dtype=float)])
+        r = np.array(self.range)
+        u = (u - r[:, :1]) / (r[:, 1:] - r[:, :1]) * np.array(self.size)[:, None]
+        fx = np.clip(np.floor(u[0]), 0, self.size[0] - 1).astype(np.int64)
+        fy = np.clip(np.floor(u[1]), 0, self.size[1] - 1).astype(np.int64)
+        # folha que contém cada ponto: procura nível a nível a célula ancestral entre as folhas
+        f = self.leaves
+        chaves = self.__key(f["ix"], f["iy"]) * (self.max_level + 1) + f["level"]
+        ordem = np.sort(chaves)
+        nivel = np.full(len(fx), -1)
+        for lv in range(self.max_level + 1):
+            lado = (1 << self.max_level) >> lv
+            c = self.__key(fx // lado * lado, fy // lado * lado) * (self.max_level + 1) + lv
+            pos = np.clip(np.searchsorted(ordem, c), 0, len(ordem) - 1)
+            nivel = np.where((nivel < 0) & (ordem[pos] == c), lv, nivel)
+        lado = (1 << self.max_level) >> nivel
+        ax, ay = fx // lado * lado, fy // lado * lado
+        meio = lado // 2
+        candidatos = [(ax, ay), (ax + lado, ay), (ax, ay + lado), (ax + lado, ay + lado), (ax + meio, ay + meio)]
+        dist = np.stack([(u[0] - a) ** 2 + (u[1] - b) ** 2 for a, b in candidatos])
+        escolha = np.argmin(dist, axis=0)
+        cx = np.choose(escolha, [a for a, _ in candidatos])
+        cy = np.choose(escolha, [b for _, b in candidatos])
+        k = self.__lookup(cx, cy)
+        return self.__flags[flag][k]
+
+
+def operating_map(topology, x="vi", y="po", x_range=None, y_range=None, limits=None, metrics=None, **kwargs):
+    """
+    Mapa adaptativo de symbolic.operating_point (L e C fixos) sobre dois dos eixos vi, vo, po, f; os demais
+    entram como valores fixos em kwargs. O flag 'dcm' marca a fronteira CCM/DCM.
+
+    :param limits: {saída: (min, max)} viram flags '<saída>_ok'
+    :param kwargs: entradas fixas e opções de AdaptiveMap (n0, max_level, log_x, log_y)
+    """
+    opcoes = {k: kwargs.pop(k) for k in ("n0", "max_level", "log_x", "log_y") if k in kwargs}
+
+    def func(a, b):
+        entradas = dict(kwargs, **{x: a, y: b})
+        with np.errstate(all="ignore"):
+            res = symbolic.operating_point(topology, **entradas)
+        flags = {"dcm": res.pop("dcm")}
+        flags.update(_limits(res, limits or {}))
+        return flags, res
+
+    return AdaptiveMap(func, x_range, y_range, metrics=metrics, **opcoes).run()
+
+
+def design_map(topology, x="po", y="f", x_range=None, y_range=None, dcm=True, limits=None, metrics=None, **kwargs):
+    """
+    Mapa adaptativo de symbolic.design sobre dois dos eixos vi, vo, po, f, dil, dvo, kd. O flag 'tx_over_t'
+    marca os projetos DCM em que iL não chega a zero dentro do período (tx > T).
+    """
+    opcoes = {k: kwargs.pop(k) for k in ("n0", "max_level", "log_x", "log_y") if k in kwargs}
+    kwargs.setdefault("kd", symbolic.DEFAULT_KD[topology])
+
+    def func(a, b):
+        entradas = dict(kwargs, **{x: a, y: b})
+        with np.errstate(all="ignore"):
+            res = symbolic.design(topology, dcm=dcm, **entradas)
+        flags = {"tx_over_t": res["tx"] > res["t"] * (1 + 1e-12)}
+        flags.update(_limits(res, limits or {}))
+        return flags, res
+
+    return AdaptiveMap(func, x_range, y_range, metrics=metrics, **opcoes).run()
@@ -0,0 +1,157 @@
+import numpy as np
+
+
+def _segments(topology, d, t, tx, il_max, il_min, io):
+    """
+    Corrente no capacitor de um período em três trechos lineares: [0, DT] (chave), [DT, tx] (diodo) e [tx, T]
+    (iL nulo no DCM; duração zero no CCM, com o valor que mantém iC contínuo no Buck).
+
+    :return: (início, duração, iC no início, inclinação), arrays (..., 3)
+    """
+    d, t, tx, il_max, il_min, io = np.broadcast_arrays(*[np.asarray(v, dtype=float)
+                                                         for v in (d, t, tx, il_max, il_min, io)])
+    dt = d * t
+    tx = np.minimum(np.maximum(tx, dt), t)
+    zero = np.zeros_like(dt)
+    inicio = np.stack([zero, dt, tx], axis=-1)
+    duracao = np.stack([dt, tx - dt, t - tx], axis=-1)
+    # iL entregue à saída: sempre no Buck, só com o diodo conduzindo no BuckBoost
+    if topology == "buck":
+        a = np.stack([il_min, il_max, il_min], axis=-1)
+        b = np.stack([il_max, il_min, il_min], axis=-1)
+    else:
+        a = np.stack([zero, il_max, zero], axis=-1)
+        b = np.stack([zero, il_min, zero], axis=-1)
+    a = a - io[..., None]
+    b = b - io[..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = np.where(duracao > 0, (b - a) / duracao, 0.0)
+    return inicio, duracao, a, s
+
+
+def _vc0(vo, t, h, a, s, cap):
+    """
+    Tensão no capacitor no início de cada trecho, com média no período igual a vo. A carga líquida do período
+    (arredondamento; nula em regime) é distribuída linearmente para a forma de onda fechar.
+    """
+    carga = a * h + s * h ** 2 / 2
+    v = np.concatenate([np.zeros(carga.shape[:-1] + (1,)), np.cumsum(carga, axis=-1)[..., :-1]], axis=-1) / cap
+    deriva = carga.sum(axis=-1, keepdims=True) / cap / t
+    media = np.sum(v * h + (a * h ** 2 / 2 + s * h ** 3 / 6) / cap, axis=-1, keepdims=True) / t - deriva * t / 2
+    return v, deriva, vo[..., None] - media
+
+
+def ripple(topology, vo, d, t, tx, il_max, il_min, io, cap, esr=0.0, esl=0.0, t_edge=None):
+    """
+    Ondulação exata da tensão de saída. iC é linear por trechos, então vC é uma parábola em cada trecho; a ESR soma
+    ESR iC (degraus onde iC salta, como na comutação do BuckBoost) e a ESL soma ESL diC/dt, constante em cada trecho.
+    Em cada trecho a soma ainda é uma parábola, e os extremos saem das pontas e do vértice.
+
+    Todas as entradas fazem broadcasting: projetos (n, 1) contra capacitores candidatos (1, m) dão resultados (n, m).
+
+    :param topology: 'buck' ou 'buckboost'
+    :param tx: instante em que iL se anula (T no CCM)
+    :param il_min: iL mínimo (0 no DCM)
+    :param esr: resistência série do capacitor [Ohm]
+    :param esl: indutância série do capacitor [H]
+    :param t_edge: duração das comutações [s]; com ela, os saltos de iC dão os picos ESL delta_iC / t_edge em
+                   'esl_spike' (não entram em delta_vo)
+    :return: dicionário com delta_vo (pico a pico total), delta_vo_c, delta_vo_esr e delta_vo_esl (contribuição de
+             cada termo isolado), vo_max, vo_min, ic_rms e esl_spike
+    """
+    inicio, h, a, s = _segments(topology, d, t, tx, il_max, il_min, io)
+    shape = np.broadcast_shapes(a.shape[:-1], np.shape(vo), np.shape(cap), np.shape(esr), np.shape(esl))
+    inicio, h, a, s = (np.broadcast_to(x, shape + (3,)) for x in (inicio, h, a, s))
+    vo, cap, esr, esl = (np.broadcast_to(np.asarray(x, dtype=float), shape)[..., None] for x in (vo, cap, esr, esl))
+    t = inicio[..., :1] + h.sum(axis=-1, keepdims=True)
+    v0, deriva, offset = _vc0(vo[..., 0], t, h, a, s, cap)
+
+    def extremos(r, l):
+        # vértice de vC + r iC: iC/C + r s = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            u = np.where(s != 0, -a / s - r * cap, 0.0)
+        pontos = np.stack([np.zeros_like(h), h, np.clip(u, 0, h)], axis=-1)
+        vc = v0[..., None] + (a[..., None] * pontos + s[..., None] * pontos ** 2 / 2) / cap[..., None] \
+            - deriva[..., None] * (inicio[..., None] + pontos)
+        v = vc + r[..., None] * (a[..., None] + s[..., None] * pontos) + l[..., None] * s[..., None]
+        v = np.where((h > 0)[..., None], v, np.nan).reshape(shape + (9,))
+        return np.nanmax(v, axis=-1) + offset[..., 0], np.nanmin(v, axis=-1) + offset[..., 0]
+
+    zero = np.zeros_like(esr)
+    vmax, vmin = extremos(esr, esl)
+    cmax, cmin = extremos(zero, zero)
+    ativo = h > 0
+    fim = a + s * h
+    ic_max = np.max(np.where(ativo, np.maximum(a, fim), -np.inf), axis=-1)
+    ic_min = np.min(np.where(ativo, np.minimum(a, fim), np.inf), axis=-1)
+    s_max = np.max(np.where(ativo, s, -np.inf), axis=-1)
+    s_min = np.min(np.where(ativo, s, np.inf), axis=-1)
+    res = {"delta_vo": vmax - vmin, "delta_vo_c": cmax - cmin, "delta_vo_esr": esr[..., 0] * (ic_max - ic_min),
+           "delta_vo_esl": esl[..., 0] * (s_max - s_min), "vo_max": vmax, "vo_min": vmin,
+           "ic_rms": np.sqrt(np.sum(h * (a ** 2 + a * fim + fim ** 2) / 3, axis=-1) / t[..., 0])}
+    # saltos de iC nas fronteiras dos trechos (fim de um, início do seguinte, e o fecho do período)
+    fim_anterior = np.roll(np.where(ativo, fim, np.nan), 1, axis=-1)
+    salto = np.where(ativo & np.isfinite(fim_anterior), np.abs(a - fim_anterior), 0.0).max(axis=-1)
+    res["esl_spike"] = esl[..., 0] * salto / t_edge if t_edge else np.full(shape, np.nan)
+    return res
+
+
+def waveform(topology, vo, d, t, tx, il_max, il_min, io, cap, esr=0.0, esl=0.0, points=50, periods=1):
+    """
+    Formas de onda de um ou mais períodos, com 'points' amostras por trecho e as fronteiras repetidas (os saltos da
+    ESR e da ESL aparecem como degraus verticais).
+
+    :return: dicionário com 'x' (tempo) e 'vo', 'vc', 'v_esr', 'v_esl', 'ic', arrays (..., periods * 3 * points)
+    """
+    inicio, h, a, s = _segments(topology, d, t, tx, il_max, il_min, io)
+    shape = np.broadcast_shapes(a.shape[:-1], np.shape(vo), np.shape(cap), np.shape(esr), np.shape(esl))
+    inicio, h, a, s = (np.broadcast_to(x, shape + (3,)) for x in (inicio, h, a, s))
+    vo, cap, esr, esl = (np.broadcast_to(np.asarray(x, dtype=float), shape)[..., None, None]
+                         for x in (vo, cap, esr, esl))
+    periodo = inicio[..., :1] + h.sum(axis=-1, keepdims=True)
+    v0, deriva, offset = _vc0(vo[..., 0, 0], periodo, h, a, s, cap[..., 0])
+
+    u = h[..., None] * np.linspace(0, 1, points)
+    ic = a[..., None] + s[..., None] * u
+    vc = v0[..., None] + (a[..., None] * u + s[..., None] * u ** 2 / 2) / cap \
+        - deriva[..., None] * (inicio[..., None] + u) + offset[..., None]
+    v_esr = esr * ic
+    v_esl = np.broadcast_to(esl * s[..., None], ic.shape)
+    x = inicio[..., None] + u
+    n = 3 * points
+    res = {"x": x.reshape(shape + (n,)), "vc": vc.reshape(shape + (n,)), "v_esr": v_esr.reshape(shape + (n,)),
+           "v_esl": v_esl.reshape(shape + (n,)), "ic": ic.reshape(shape + (n,))}
+    res["vo"] = res["vc"] + res["v_esr"] + res["v_esl"]
+    if periods > 1:
+        k = np.repeat(np.arange(periods), n)
+        res = {nome: np.tile(v, periods) for nome, v in res.items()}
+        res["x"] = res["x"] + k * periodo
+    return res
+
+
+def from_design(topology, res, vo, cap=None, esr=0.0, esl=0.0, t_edge=None):
+    """
+    Ondulação de projetos de symbolic.design (ou de uma varredura). Com 'cap' dado, cada projeto (n,) é combinado
+    com cada capacitor candidato (m,), e 'cap', 'esr' e 'esl' (escalares ou (m,)) viram resultados (n, m).
+
+    Ex.: conferir set_cap em lote, ripple.from_design('buck', res, vo)['delta_vo'] / (dvo * vo)
+
+    :param res: dicionário com d, t, tx, il_max, il_min, io e, sem 'cap', cap
+    """
+    base = [np.asarray(res[n], dtype=float) for n in ("d", "t", "tx", "il_max", "il_min", "io")]
+    vo = np.asarray(vo, dtype=float)
+    if cap is None:
+        return ripple(topology, vo, *base, res["cap"], esr, esl, t_edge)
+    base = [v[..., None] for v in base]
+    return ripple(topology, vo[..., None] if vo.ndim else vo, *base, cap, esr, esl, t_edge)
+
+
+def show_info(res, i=0):
+    """
+    Resumo de um projeto (índice plano 'i' dos arrays de ripple).
+    """
+    print(f"\n===============\t\tONDULAÇÃO DE SAÍDA\t===============")
+    for nome, titulo in (("delta_vo", "dVo"), ("delta_vo_c", "dVo_C"), ("delta_vo_esr", "dVo_ESR"),
+                         ("delta_vo_esl", "dVo_ESL"), ("vo_max", "Vo_max"), ("vo_min", "Vo_min")):
+        print(f"\t{titulo}\t\t=\t{'{:2.3e}'.format(float(np.ravel(res[nome])[i]))}\t[V]")
+    print(f"\tIc_rms\t\t=\t{'{:2.3e}'.format(float(np.ravel(res['ic_rms'])[i]))}\t[A]")
@@ -0,0 +1,69 @@
+import numpy as np
+
+import symbolic
+
+OUTPUTS = ["ind", "cap", "il_max", "ids_rms", "id_avg"]
+
+
+def jacobian(topology, vi, vo, po, f, dil, dvo, dcm=False, kd=None, outputs=None):
+    """
+    Derivadas parciais exatas das saídas de projeto em relação às entradas, vetorizadas.
+
+    As derivadas são as das expressões de symbolic.design diferenciadas pelo sympy e geradas como kernels NumPy
+    (com o mesmo cache em disco dos kernels de projeto), então não há diferenças finitas nem integrais numéricas.
+
+    :param outputs: saídas desejadas (padrão: OUTPUTS)
+    :return: {saída: {entrada: array}} com entradas vi, vo, po, f, dil, dvo e kd
+    """
+    if kd is None:
+        kd = symbolic.DEFAULT_KD[topology]
+    res = symbolic.select(topology, dcm, "design", jacobian=True, vi=vi, vo=vo, po=po, f=f, dil=dil, dvo=dvo, kd=kd)
+    outputs = outputs or OUTPUTS
+    inputs = symbolic.DESIGN["inputs"]
+    return {y: {x: res[f"{y}/{x}"] for x in inputs} for y in outputs}
+
+
+def sensitivity(topology, vi, vo, po, f, dil, dvo, dcm=False, kd=None, outputs=None):
+    """
+    Sensibilidades normalizadas (elasticidades) S = (x / y) dy/dx: variação relativa da saída por variação
+    relativa da entrada. S = -1 em L/f, por exemplo, quer dizer que 1 % a mais de f reduz L em 1 %.
+
+    :return: {saída: {entrada: array}}
+    """
+    if kd is None:
+        kd = symbolic.DEFAULT_KD[topology]
+    entradas = dict(vi=vi, vo=vo, po=po, f=f, dil=dil, dvo=dvo, kd=kd)
+    outputs = outputs or OUTPUTS
+    jac = jacobian(topology, dcm=dcm, outputs=outputs, **entradas)
+    base = symbolic.design(topology, dcm=dcm, **entradas)
+    res = {}
+    for y in outputs:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            res[y] = {x: np.where(base[y] != 0, jac[y][x] * np.asarray(v, dtype=float) / base[y], 0.0)
+                      for x, v in entradas.items()}
+    return res
+
+
+def ranking(sens, output):
+    """
+    Entradas ordenadas da mais para a menos influente sobre uma saída, por linha.
+
+    :param sens: resultado de sensitivity (ou jacobian)
+    :return: (nomes das entradas, índices (..., n_entradas) em ordem decrescente de |S|)
+    """
+    nomes = list(sens[output])
+    s = np.stack(np.broadcast_arrays(*[np.abs(sens[output][n]) for n in nomes]), axis=-1)
+    return nomes, np.argsort(-s, axis=-1, kind="stable")
+
+
+def show_info(sens, row=None):
+    """
+    Imprime as sensibilidades de um projeto (linha 'row' de um lote, ou o único projeto).
+    """
+    for y, por_x in sens.items():
+        nomes, ordem = ranking(sens, y)
+        ordem = ordem if row is None else ordem[row]
+        print(f"\n===============\t\tSENSIBILIDADE {y}\t===============")
+        for i in np.ravel(ordem):
+            v = por_x[nomes[i]] if row is None else por_x[nomes[i]][row]
+            print(f"\t{nomes[i]}\t\t=\t{'{:+.3f}'.format(float(v))}")
@@ -0,0 +1,218 @@
+import os
+import re
+import sys
+import json
+import socket
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from store import ResultStore
+from sweep import Sweep
+
+_NOME = re.compile(r"shard-(\d+)-of-(\d+)$")
+
+
+def shard_range(size, n_shards, index):
+    """
+    Faixa [start, stop) de linhas do shard 'index' de 'n_shards': partição determinística e equilibrada (os
+    tamanhos diferem de no máximo uma linha), que depende só do tamanho da varredura.
+    """
+    if not 0 <= index < n_shards:
+        raise ValueError(f"shard {index} fora de 0..{n_shards - 1}")
+    return index * size // n_shards, (index + 1) * size // n_shards
+
+
+def plan(sweep, n_shards):
+    """
+    :return: lista de (start, stop) por shard
+    """
+    return [shard_range(sweep.size, n_shards, i) for i in range(n_shards)]
+
+
+def shard_path(out_dir, n_shards, index):
+    largura = max(5, len(str(n_shards)))
+    return os.path.join(out_dir, f"shard-{index:0{largura}d}-of-{n_shards:0{largura}d}")
+
+
+def run_shard(sweep, n_shards, index, out_dir, chunk_size=1 << 18):
+    """
+    Avalia um shard num ResultStore próprio (out_dir/shard-iiiii-of-nnnnn). O manifest do store descreve o shard
+    (varredura, especificação, índice, faixa e host), então o resultado parcial é autossuficiente. Rodar de novo o
+    mesmo shard retoma os chunks pendentes dele e não toca nos outros.
+
+    :return: caminho do store do shard
+    """
+    start, stop = shard_range(sweep.size, n_shards, index)
+    path = shard_path(out_dir, n_shards, index)
+    meta = {"sweep": sweep.digest(), "spec": sweep.to_dict(), "shard": index, "n_shards": n_shards,
+            "start": start, "stop": stop}
+    if os.path.exists(os.path.join(path, ResultStore.MANIFEST)):
+        store = ResultStore.open(path, mode="r+")
+        diferentes = [k for k in ("sweep", "shard", "n_shards", "start", "stop") if store.meta.get(k) != meta[k]]
+        if diferentes:
+            raise ValueError(f"{path} pertence a outro particionamento ({', '.join(diferentes)})")
+    else:
+        meta["host"] = socket.gethostname()
+        store = ResultStore.create(path, sweep.columns, stop - start, chunk_size=chunk_size, meta=meta)
+    for i in store.pending():
+        a, b = store.chunk_range(i)
+        store.write_chunk(i, sweep.evaluate(start + a, start + b))
+    return path
+
+
+def status(sweep, n_shards, out_dir):
+    """
+    :return: dicionário {complete, partial, missing} com os índices dos shards em cada situação
+    """
+    res = {"complete": [], "partial": [], "missing": []}
+    for i in range(n_shards):
+        path = shard_path(out_dir, n_shards, i)
+        if not os.path.exists(os.path.join(path, ResultStore.MANIFEST)):
+            res["missing"].append(i)
+            continue
+        store = ResultStore.open(path)
+        if store.meta.get("sweep") != sweep.digest():
+            raise ValueError(f"{path} pertence a outra varredura")
+        res["complete" if store.is_complete() else "partial"].append(i)
+    return res
+
+
+def validate(sweep, n_shards, out_dir):
+    """
+    Confere os shards antes da junção: todos presentes e completos, da mesma varredura, e com faixas que cobrem
+    [0, size) sem lacunas nem sobreposição.
+
+    :return: lista de ResultStore em ordem de faixa
+    """
+    st = status(sweep, n_shards, out_dir)
+    if st["missing"] or st["partial"]:
+        raise ValueError(f"shards ausentes: {st['missing']}; incompletos: {st['partial']}")
+    outros = [n for n in os.listdir(out_dir) if _NOME.match(n) and int(_NOME.match(n).group(2)) != n_shards]
+    if outros:
+        raise ValueError(f"{out_dir} tem shards de outro particionamento: {', '.join(sorted(outros))}")
+    stores = [ResultStore.open(shard_path(out_dir, n_shards, i)) for i in range(n_shards)]
+    stores.sort(key=lambda s: s.meta["start"])
+    fim = 0
+    for s in stores:
+        inicio, parada = s.meta["start"], s.meta["stop"]
+        if inicio != fim or parada - inicio != s.n_rows:
+            raise ValueError(f"shard {s.meta['shard']}: faixa [{inicio}, {parada}) não continua a cobertura em {fim}")
+        if s.columns != sweep.columns:
+            raise ValueError(f"shard {s.meta['shard']}: colunas diferentes das da varredura")
+        fim = parada
+    if fim != sweep.size:
+        raise ValueError(f"cobertura termina em {fim}, a varredura tem {sweep.size} linhas")
+    return stores
+
+
+def merge(sweep, n_shards, out_dir, path, chunk_size=1 << 18):
+    """
+    Valida os shards e os junta num único ResultStore em 'path' (com o mesmo meta de sweep.run). A junção é feita
+    chunk a chunk do store final, em memória limitada, e pode ser retomada se for interrompida.
+
+    :return: ResultStore aberto para leitura
+    """
+    stores = validate(sweep, n_shards, out_dir)
+    inicios = np.array([s.meta["start"] for s in stores])
+    if os.path.exists(os.path.join(path, ResultStore.MANIFEST)):
+        final = ResultStore.open(path, mode="r+")
+        if final.meta.get("sweep") != sweep.digest():
+            raise ValueError(f"{path} pertence a outra varredura")
+    else:
+        final = ResultStore.create(path, sweep.columns, sweep.size, chunk_size=chunk_size,
+                                   meta={"sweep": sweep.digest(), "spec": sweep.to_dict(), "n_shards": n_shards})
+    for i in final.pending():
+        start, stop = final.chunk_range(i)
+        partes = []
+        k = np.searchsorted(inicios, start, side="right") - 1
+        while start < stop:
+            s = stores[k]
+            fim = min(stop, s.meta["stop"])
+            partes.append(s.rows(start - s.meta["start"], fim - s.meta["start"]))
+            start = fim
+            k += 1
+        final.write_chunk(i, {n: np.concatenate([p[n] for p in partes]) for n in sweep.columns})
+    return ResultStore.open(path)
+
+
+def _run_shard(tarefa):
+    spec, n_shards, index, out_dir, chunk_size = tarefa
+    try:
+        return index, run_shard(Sweep.from_dict(spec), n_shards, index, out_dir, chunk_size), None
+    except Exception as e:
+        return index, None, f"{type(e).__name__}: {e}"
+
+
+def run_local(sweep, n_shards, out_dir, workers=None, shards=None, chunk_size=1 << 18):
+    """
+    Executa os shards em processos locais, cada um no papel de um nó. Falhas não interrompem os outros shards.
+
+    :param shards: índices a executar (padrão: os que não estão completos)
+    :param workers: processos (None = os.cpu_count()); 0 executa no processo atual
+    :return: {índice: mensagem de erro} dos shards que falharam (vazio se todos terminaram)
+    """
+    if shards is None:
+        st = status(sweep, n_shards, out_dir)
+        shards = st["partial"] + st["missing"]
+    tarefas = [(sweep.to_dict(), n_shards, i, out_dir, chunk_size) for i in shards]
+    if workers == 0:
+        resultados = map(_run_shard, tarefas)
+        return {i: erro for i, _, erro in resultados if erro}
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return {i: erro for i, _, erro in ex.map(_run_shard, tarefas) if erro}
+
+
+def main(argv=None):
+    """
+    Linha de comando, para rodar cada shard num host:
+
+        python shard.py plan  spec.json N
+        python shard.py run   spec.json N i out_dir
+        python shard.py local spec.json N out_dir [--workers W]
+        python shard.py status spec.json N out_dir
+        python shard.py merge spec.json N out_dir destino
+
+    spec.json é o resultado de Sweep.to_dict().
+    """
+    p = argparse.ArgumentParser(prog="shard.py", description="Varreduras particionadas em shards")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    for nome in ("plan", "run", "local", "status", "merge"):
+        s = sub.add_parser(nome)
+        s.add_argument("spec")
+        s.add_argument("n_shards", type=int)
+        if nome == "run":
+            s.add_argument("index", type=int)
+        if nome != "plan":
+            s.add_argument("out_dir")
+        if nome == "merge":
+            s.add_argument("path")
+        if nome == "local":
+            s.add_argument("--workers", type=int, default=None)
+        if nome in ("run", "local", "merge"):
+            s.add_argument("--chunk-size", type=int, default=1 << 18)
+    a = p.parse_args(argv)
+    with open(a.spec) as fp:
+        sweep = Sweep.from_dict(json.load(fp))
+
+    if a.cmd == "plan":
+        for i, (start, stop) in enumerate(plan(sweep, a.n_shards)):
+            print(f"{i}\t{start}\t{stop}")
+    elif a.cmd == "run":
+        print(run_shard(sweep, a.n_shards, a.index, a.out_dir, a.chunk_size))
+    elif a.cmd == "local":
+        falhas = run_local(sweep, a.n_shards, a.out_dir, a.workers, chunk_size=a.chunk_size)
+        for i, erro in sorted(falhas.items()):
+            print(f"shard {i}: {erro}", file=sys.stderr)
+        return 1 if falhas else 0
+    elif a.cmd == "status":
+        for k, v in status(sweep, a.n_shards, a.out_dir).items():
+            print(f"{k}\t{len(v)}\t{' '.join(map(str, v))}")
+    elif a.cmd == "merge":
+        print(merge(sweep, a.n_shards, a.out_dir, a.path, a.chunk_size).path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
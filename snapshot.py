@@ -0,0 +1,200 @@
+import os
+import json
+import struct
+
+import numpy as np
+
+from comparison import DesignTable, COLUMNS, _metrics
+
+MAGIC = b"CONVSNAP"
+VERSION = 2
+ALIGN = 64
+
+# Entradas de construção por objeto, guardadas como colunas (nenhum objeto é serializado)
+INPUTS = ["kind", "vi", "vo", "po", "f", "dil", "dvo", "dcm", "percent_duty", "ind_fixed", "cap_fixed"]
+KINDS = ("Buck", "BuckBoost")
+
+
+def _inputs(conv):
+    if hasattr(conv, "info"):  # BuckBoost
+        return {"kind": 1, "vi": conv.vi, "vo": conv.vo, "po": conv.po, "f": conv.f, "dil": conv.delt_il_percent,
+                "dvo": conv.delt_vo / conv.vo, "dcm": conv.is_dcm, "percent_duty": np.nan,
+                "ind_fixed": np.nan, "cap_fixed": np.nan}
+    fixo = conv._pinned
+    return {"kind": 0, "vi": conv.vi, "vo": conv.vo, "po": conv.po, "f": conv.freq, "dil": conv.percent_delta_il,
+            "dvo": conv.percent_delta_vo, "dcm": conv.is_dcm, "percent_duty": conv.percent_duty,
+            "ind_fixed": conv.ind if "ind" in fixo else np.nan, "cap_fixed": conv.cap if "cap" in fixo else np.nan}
+
+
+def _pinned(conv):
+    """
+    Grandezas fixadas pelo usuário (Derived.__set__) com os valores, para o objeto restaurado dar as mesmas métricas.
+    """
+    fixo = {}
+    for nome in sorted(getattr(conv, "_pinned", ())):
+        valor = conv._values[nome]
+        if np.ndim(valor):
+            raise TypeError(f"grandeza fixada '{nome}' não é escalar e não pode ser gravada")
+        fixo[nome] = float(valor)
+    return fixo
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+def save(path, designs=None, columns=None, meta=None):
+    """
+    Grava um snapshot binário versionado.
+
+    Layout: MAGIC (8 bytes), versão (u4), tamanho do cabeçalho (u8), cabeçalho JSON e, a partir do primeiro
+    múltiplo de 64 bytes, as colunas como arrays crus contíguos, cada uma alinhada em 64 bytes. O cabeçalho guarda
+    nome, dtype, forma e deslocamento de cada seção, então a leitura é um único np.memmap por coluna.
+
+    :param designs: objetos Buck/BuckBoost (um só ou uma lista); são guardadas as entradas de construção, as
+    grandezas fixadas (no cabeçalho, 'pinned') e as métricas calculadas (colunas de comparison.COLUMNS)
+    :param columns: dicionário {nome: array} ou DesignTable (ex.: saída de uma varredura)
+    :param meta: dicionário serializável
+    """
+    secoes = {}
+    n_designs = 0
+    fixos = []
+    if designs is not None:
+        if not isinstance(designs, (list, tuple)):
+            designs = [designs]
+        n_designs = len(designs)
+        entradas = [_inputs(c) for c in designs]
+        fixos = [_pinned(c) for c in designs]
+        for nome in INPUTS:
+            secoes["input/" + nome] = np.array([float(e[nome]) for e in entradas])
+        metricas = [_metrics(c) for c in designs]
+        for nome in COLUMNS:
+            if nome != "lc":
+                secoes["metric/" + nome] = np.array([float(m[nome]) for m in metricas])
+    if columns is not None:
+        if isinstance(columns, DesignTable):
+            columns = columns.columns
+        for nome, v in columns.items():
+            secoes["column/" + nome] = np.ascontiguousarray(v)
+
+    indice = {}
+    offset = 0
+    for nome, v in secoes.items():
+        if v.dtype.hasobject:
+            raise TypeError(f"coluna '{nome}' tem dtype object")
+        indice[nome] = {"dtype": v.dtype.str, "shape": list(v.shape), "offset": offset, "nbytes": int(v.nbytes)}
+        offset = _align(offset + v.nbytes)
+    cabecalho = json.dumps({"version": VERSION, "n_designs": n_designs, "sections": indice,
+                            "pinned": fixos, "meta": meta or {}}).encode()
+    inicio = _align(len(MAGIC) + 4 + 8 + len(cabecalho))
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fp:
+        fp.write(MAGIC + struct.pack("<IQ", VERSION, len(cabecalho)) + cabecalho)
+        for nome, v in secoes.items():
+            fp.seek(inicio + indice[nome]["offset"])
+            fp.write(memoryview(v).cast("B") if v.size else b"")
+        fp.truncate(inicio + offset)
+    os.replace(tmp, path)
+
+
+class Snapshot:
+    def __init__(self, path, mode="r"):
+        """
+        Snapshot aberto por mmap. Nenhuma coluna é lida até ser acessada, e os objetos Buck/BuckBoost só são
+        reconstruídos sob demanda (design(i)).
+
+        :param mode: 'r' (somente leitura) ou 'c' (cópia na escrita)
+        """
+        with open(path, "rb") as fp:
+            if fp.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} não é um snapshot")
+            versao, n = struct.unpack("<IQ", fp.read(12))
+            if versao > VERSION:
+                raise ValueError(f"snapshot versão {versao} não suportado (máx. {VERSION})")
+            cabecalho = json.loads(fp.read(n))
+        self.path = path
+        self.mode = mode
+        self.version = versao
+        self.meta = cabecalho["meta"]
+        self.n_designs = cabecalho["n_designs"]
+        self.sections = cabecalho["sections"]
+        self.__pinned = cabecalho.get("pinned")  # None na versão 1, que só guardava ind_fixed e cap_fixed
+        self.__inicio = _align(len(MAGIC) + 12 + n)
+        self.__cache = {}
+
+    def section(self, name):
+        arr = self.__cache.get(name)
+        if arr is None:
+            s = self.sections[name]
+            shape = tuple(s["shape"])
+            if s["nbytes"] == 0:
+                arr = np.zeros(shape, dtype=s["dtype"])
+            else:
+                arr = np.memmap(self.path, dtype=s["dtype"], mode=self.mode, offset=self.__inicio + s["offset"],
+                                shape=shape)
+            self.__cache[name] = arr
+        return arr
+
+    def __names(self, prefix):
+        return [n[len(prefix):] for n in self.sections if n.startswith(prefix)]
+
+    @property
+    def column_names(self):
+        return self.__names("column/")
+
+    def __getitem__(self, name):
+        """
+        Coluna gravada com 'columns' (ou, na falta dela, métrica dos objetos gravados).
+        """
+        if "column/" + name in self.sections:
+            return self.section("column/" + name)
+        return self.section("metric/" + name)
+
+    def table(self):
+        """
+        :return: DesignTable sobre as colunas mapeadas (métricas dos objetos, ou as colunas gravadas)
+        """
+        prefixo = "metric/" if self.n_designs else "column/"
+        return DesignTable({n: self.section(prefixo + n) for n in self.__names(prefixo)})
+
+    def __len__(self):
+        return self.n_designs
+
+    def design(self, i):
+        """
+        Reconstrói o i-ésimo objeto a partir das entradas gravadas, com as mesmas grandezas fixadas.
+        """
+        from buck import Buck
+        from buck_boost import BuckBoost
+
+        e = {n: float(self.section("input/" + n)[i]) for n in INPUTS}
+        dcm = bool(e["dcm"])
+        if KINDS[int(e["kind"])] == "BuckBoost":
+            return BuckBoost(vi=e["vi"], vo=e["vo"], po=e["po"], freq=e["f"], percent_delt_il=e["dil"],
+                             percent_delt_vo=e["dvo"], is_dcm=dcm)
+        conv = Buck(vi=e["vi"], vo=e["vo"], po=e["po"], f=e["f"], delta_vo=e["dvo"], delta_il=e["dil"],
+                    dcm=dcm, ccm=not dcm, percent_duty=e["percent_duty"])
+        if self.__pinned is not None:
+            for nome, valor in self.__pinned[i].items():
+                setattr(conv, nome, valor)
+            return conv
+        if not np.isnan(e["ind_fixed"]):
+            conv.ind = e["ind_fixed"]
+        if not np.isnan(e["cap_fixed"]):
+            conv.cap = e["cap_fixed"]
+        return conv
+
+    def designs(self):
+        """
+        Gerador que reconstrói os objetos um a um.
+        """
+        for i in range(self.n_designs):
+            yield self.design(i)
+
+
+def load(path, mode="r"):
+    """
+    Atalho para Snapshot(path, mode).
+    """
+    return Snapshot(path, mode)
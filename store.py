@@ -0,0 +1,140 @@
+import os
+import json
+
+import numpy as np
+
+
+class ResultStore:
+    MANIFEST = "manifest.json"
+    BITMAP = "done.npy"
+    VERSION = 1
+
+    def __init__(self, path, manifest, mode):
+        """
+        Store colunar em disco: um arquivo .npy mapeado em memória por coluna, um manifest JSON e um bitmap de chunks
+        concluídos. Use ResultStore.create ou ResultStore.open.
+
+        Cada chunk cobre 'chunk_size' linhas consecutivas; processos diferentes podem escrever chunks distintos ao
+        mesmo tempo. Um chunk só é marcado como concluído depois que suas colunas foram gravadas em disco.
+        """
+        self.path = path
+        self.mode = mode
+        self.columns = manifest["columns"]
+        self.n_rows = manifest["n_rows"]
+        self.chunk_size = manifest["chunk_size"]
+        self.n_chunks = manifest["n_chunks"]
+        self.meta = manifest.get("meta", {})
+        self.__cols = {}
+        self.__done = np.load(os.path.join(path, self.BITMAP), mmap_mode=mode)
+
+    @classmethod
+    def create(cls, path, columns, n_rows, chunk_size=1 << 18, dtype="f8", meta=None):
+        """
+        :param columns: nomes das colunas
+        :param n_rows: número total de linhas
+        :param meta: dicionário serializável guardado no manifest
+        """
+        os.makedirs(path, exist_ok=True)
+        n_chunks = -(-n_rows // chunk_size)
+        for nome in columns:
+            np.lib.format.open_memmap(os.path.join(path, f"{nome}.npy"), mode="w+", dtype=dtype, shape=(n_rows,))
+        np.lib.format.open_memmap(os.path.join(path, cls.BITMAP), mode="w+", dtype=np.uint8, shape=(n_chunks,))
+        manifest = {"version": cls.VERSION,
+                    "columns": list(columns),
+                    "dtype": np.dtype(dtype).str,
+                    "n_rows": int(n_rows),
+                    "chunk_size": int(chunk_size),
+                    "n_chunks": int(n_chunks),
+                    "meta": meta or {}}
+        # O manifest é escrito por último: sua presença indica um store completo
+        tmp = os.path.join(path, cls.MANIFEST + ".tmp")
+        with open(tmp, "w") as fp:
+            json.dump(manifest, fp, indent=2)
+        os.replace(tmp, os.path.join(path, cls.MANIFEST))
+        return cls(path, manifest, "r+")
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        """
+        :param mode: 'r' para leitura (pode ser usado enquanto outro processo escreve) ou 'r+'
+        """
+        with open(os.path.join(path, cls.MANIFEST)) as fp:
+            manifest = json.load(fp)
+        if manifest.get("version") != cls.VERSION:
+            raise ValueError(f"versão de store não suportada: {manifest.get('version')}")
+        return cls(path, manifest, mode)
+
+    def column(self, nome):
+        """
+        :return: memmap da coluna inteira (sem cópia)
+        """
+        col = self.__cols.get(nome)
+        if col is None:
+            if nome not in self.columns:
+                raise KeyError(nome)
+            col = self.__cols[nome] = np.load(os.path.join(self.path, f"{nome}.npy"), mmap_mode=self.mode)
+        return col
+
+    def __getitem__(self, nome):
+        return self.column(nome)
+
+    def chunk_range(self, i):
+        start = i * self.chunk_size
+        return start, min(start + self.chunk_size, self.n_rows)
+
+    def write_chunk(self, i, cols):
+        """
+        Grava as colunas do chunk 'i' e o marca como concluído.
+
+        :param cols: dicionário {coluna: array} com exatamente as linhas do chunk
+        """
+        start, stop = self.chunk_range(i)
+        for nome in self.columns:
+            col = self.column(nome)
+            col[start:stop] = cols[nome]
+            col.flush()
+        self.__done[i] = 1
+        self.__done.flush()
+
+    def done(self):
+        """
+        :return: array bool com os chunks concluídos (lido do disco a cada chamada)
+        """
+        return np.asarray(self.__done, dtype=bool)
+
+    def pending(self):
+        return np.flatnonzero(~self.done())
+
+    def is_complete(self):
+        return bool(self.done().all())
+
+    def rows(self, start, stop, columns=None):
+        """
+        :return: dicionário {coluna: view} das linhas [start, stop), sem cópia
+        """
+        return {n: self.column(n)[start:stop] for n in (columns or self.columns)}
+
+    def iter_chunks(self, columns=None, only_done=True):
+        """
+        Percorre o store chunk a chunk, em memória limitada.
+
+        :return: gerador de (start, stop, {coluna: view})
+        """
+        done = self.done()
+        for i in range(self.n_chunks):
+            if only_done and not done[i]:
+                continue
+            start, stop = self.chunk_range(i)
+            yield start, stop, self.rows(start, stop, columns)
+
+    def where(self, condition, columns=None):
+        """
+        Filtra as linhas concluídas.
+
+        :param condition: função que recebe {coluna: view} de um chunk e devolve uma máscara bool
+        :return: índices globais das linhas que satisfazem a condição
+        """
+        idx = []
+        for start, stop, rows in self.iter_chunks(columns):
+            idx.append(start + np.flatnonzero(condition(rows)))
+        return np.concatenate(idx) if idx else np.empty(0, dtype=np.intp)
@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import symbolic
+from store import ResultStore
+
+AXES = ["vi", "vo", "po", "f", "dil", "dvo", "kd", "dcm"]
+
+
+class Sweep:
+    def __init__(self, topology, **axes):
+        """
+        Varredura full-factorial sobre as entradas de projeto de symbolic.design.
+
+        Cada linha é identificada pelo índice plano na grade (ordem C, último eixo variando mais rápido), de modo que
+        qualquer faixa [start, stop) pode ser avaliada de forma independente.
+
+        :param topology: 'buck' ou 'buckboost'
+        :param axes: vi, vo, po, f, dil, dvo, kd, dcm - escalar ou sequência de valores. kd e dcm são opcionais.
+        """
+        axes.setdefault("kd", symbolic.DEFAULT_KD[topology])
+        axes.setdefault("dcm", 0)
+        desconhecidos = set(axes) - set(AXES)
+        if desconhecidos:
+            raise ValueError(f"eixos desconhecidos: {', '.join(sorted(desconhecidos))}")
+        self.topology = topology
+        self.axes = {n: np.atleast_1d(np.asarray(axes[n], dtype=float)) for n in AXES}
+        self.shape = tuple(len(v) for v in self.axes.values())
+        self.size = int(np.prod(self.shape))
+        self.outputs = symbolic.kernel("design", topology, "ccm").outputs
+        self.columns = AXES + self.outputs
+
+    def to_dict(self):
+        return {"topology": self.topology, "axes": {n: v.tolist() for n, v in self.axes.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["topology"], **data["axes"])
+
+    def digest(self):
+        """
+        Identifica a varredura (usado para validar stores e shards de outra varredura).
+        """
+        return hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode()).hexdigest()[:20]
+
+    def inputs(self, start, stop):
+        """
+        :return: dicionário {eixo: array} com as entradas das linhas [start, stop)
+        """
+        idx = np.unravel_index(np.arange(start, stop), self.shape)
+        return {n: self.axes[n][i] for n, i in zip(AXES, idx)}
+
+    def evaluate(self, start, stop):
+        """
+        :return: dicionário {coluna: array} com entradas e saídas das linhas [start, stop)
+        """
+        cols = self.inputs(start, stop)
+        entradas = {n: cols[n] for n in AXES if n != "dcm"}
+        cols.update(symbolic.design(self.topology, dcm=cols["dcm"] != 0, **entradas))
+        return cols
+
+
+_worker = {}
+
+
+def _init_worker(path, sweep):
+    _worker["store"] = ResultStore.open(path, mode="r+")
+    _worker["sweep"] = Sweep.from_dict(sweep)
+
+
+def _run_chunk(i):
+    store = _worker["store"]
+    start, stop = store.chunk_range(i)
+    store.write_chunk(i, _worker["sweep"].evaluate(start, stop))
+    return i
+
+
+def run(sweep, path, chunk_size=1 << 18, workers=None):
+    """
+    Executa a varredura gravando direto no ResultStore em 'path'. Se o store já existe (execução interrompida),
+    apenas os chunks ainda não concluídos são avaliados.
+
+    :param workers: número de processos (None = os.cpu_count()). 0 avalia no processo atual.
+    :return: ResultStore aberto para leitura
+    """
+    if os.path.exists(os.path.join(path, ResultStore.MANIFEST)):
+        store = ResultStore.open(path, mode="r+")
+        if store.meta.get("sweep") != sweep.digest():
+            raise ValueError(f"{path} pertence a outra varredura")
+    else:
+        store = ResultStore.create(path, sweep.columns, sweep.size, chunk_size=chunk_size,
+                                   meta={"sweep": sweep.digest(), "spec": sweep.to_dict()})
+
+    pendentes = store.pending()
+    if workers == 0:
+        for i in pendentes:
+            start, stop = store.chunk_range(i)
+            store.write_chunk(i, sweep.evaluate(start, stop))
+    elif len(pendentes):
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(path, sweep.to_dict())) as ex:
+            for _ in ex.map(_run_chunk, pendentes):
+                pass
+    return ResultStore.open(path)
@@ -0,0 +1,369 @@
+"""
+Relações de regime permanente de cada topologia escritas uma única vez.
+
+As equações são resolvidas com sympy e convertidas em kernels NumPy vetorizados (com eliminação de subexpressões
+comuns). O código gerado é guardado em disco com chave igual ao hash do texto das relações, de modo que uma
+inicialização com cache não importa o sympy.
+
+Convenções:
+    dil  - ondulação de corrente no indutor, fração de Io (Buck) ou de IL médio (BuckBoost)
+    dvo  - ondulação da tensão de saída, fração de Vo
+    kd   - fração do duty CCM usada no modo DCM (percent_duty)
+    tx   - instante (a partir do início do período) em que iL se anula; igual a T no CCM
+"""
+import os
+import json
+import hashlib
+
+import numpy as np
+
+FORMAT_VERSION = 2
+
+CACHE_DIR = os.environ.get("CONVERSORES_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "conversores"))
+
+COMMON = ["t*f - 1",
+          "io*vo - po",
+          "ii*vi - po",
+          "r*io - vo"]
+
+# Cada segmento de iL: (expressão em s, início, fim, elemento que conduz). 's' = MOSFET, 'd' = diodo.
+SEGMENTS = {
+    "buck": {
+        "ccm": [("il_min + (vi - vo)*s/ind", "0", "d*t", "s"),
+                ("il_max - vo*(s - d*t)/ind", "d*t", "t", "d")],
+        "dcm": [("(vi - vo)*s/ind", "0", "d*t", "s"),
+                ("il_max - vo*(s - d*t)/ind", "d*t", "tx", "d")],
+    },
+    "buckboost": {
+        "ccm": [("il_min + vi*s/ind", "0", "d*t", "s"),
+                ("il_max - vo*(s - d*t)/ind", "d*t", "t", "d")],
+        "dcm": [("vi*s/ind", "0", "d*t", "s"),
+                ("il_max - vo*(s - d*t)/ind", "d*t", "tx", "d")],
+    },
+}
+
+DEFINITIONS = {
+    "buck": {"ids_max": "il_max", "id_max": "il_max", "vds_max": "vi", "vd_max": "vi"},
+    "buckboost": {"ids_max": "il_max", "id_max": "il_max", "vds_max": "vi + vo", "vd_max": "vi + vo"},
+}
+
+# Projeto: L e C a partir das ondulações desejadas (o que fazem set_ind e set_cap)
+DESIGN = {
+    "inputs": ["vi", "vo", "po", "f", "dil", "dvo", "kd"],
+    "unknowns": ["t", "d", "io", "ii", "r", "tx", "il_max", "il_min", "il_avg", "delta_il", "ind", "cap"],
+    "buck": {
+        "ccm": ["(vi - vo)*d*t - vo*(1 - d)*t",  # balanço volt-segundo
+                "il_avg - io",
+                "delta_il - dil*io",
+                "ind*delta_il - (vi - vo)*d*t",
+                "8*f*cap*dvo*vo - delta_il",
+                "il_max - il_avg - delta_il/2",
+                "il_min - il_avg + delta_il/2",
+                "tx - t"],
+        "dcm": ["d*vi - kd*vo",
+                "(vi - vo)*d*t - vo*(tx - d*t)",
+                "ind*il_max - (vi - vo)*d*t",
+                "2*il_avg*t - il_max*tx",
+                "il_avg - io",
+                "4*dvo*vo*cap - t*(il_max - io)",
+                "il_min",
+                "delta_il - il_max"],
+    },
+    "buckboost": {
+        "ccm": ["vi*d*t - vo*(1 - d)*t",
+                "il_avg*(1 - d) - io",
+                "delta_il - dil*il_avg",
+                "ind*delta_il - vi*d*t",
+                "dvo*vo*cap - io*d*t",
+                "il_max - il_avg - delta_il/2",
+                "il_min - il_avg + delta_il/2",
+                "tx - t"],
+        "dcm": ["d*(vi + vo) - kd*vo",
+                "ind*il_max - vi*d*t",
+                "vi*d*t - vo*(tx - d*t)",
+                "2*ii - il_max*d",
+                "2*il_avg*t - il_max*tx",
+                "dvo*vo*cap - io*d*t",
+                "il_min",
+                "delta_il - il_max"],
+    },
+}
+
+# Análise: ponto de operação com L e C fixos (duty, pico de corrente e ondulação resultantes)
+ANALYSIS = {
+    "inputs": ["vi", "vo", "po", "f", "ind", "cap"],
+    "unknowns": ["t", "d", "io", "ii", "r", "tx", "il_max", "il_min", "il_avg", "delta_il", "delta_vo"],
+    "buck": {
+        "ccm": ["(vi - vo)*d*t - vo*(1 - d)*t",
+                "il_avg - io",
+                "ind*delta_il - (vi - vo)*d*t",
+                "8*f*cap*delta_vo - delta_il",
+                "il_max - il_avg - delta_il/2",
+                "il_min - il_avg + delta_il/2",
+                "tx - t"],
+        "dcm": ["ind*il_max - (vi - vo)*d*t",
+                "(vi - vo)*d*t - vo*(tx - d*t)",
+                "2*il_avg*t - il_max*tx",
+                "il_avg - io",
+                "4*cap*delta_vo - t*(il_max - io)",
+                "il_min",
+                "delta_il - il_max"],
+    },
+    "buckboost": {
+        "ccm": ["vi*d*t - vo*(1 - d)*t",
+                "il_avg*(1 - d) - io",
+                "ind*delta_il - vi*d*t",
+                "cap*delta_vo - io*d*t",
+                "il_max - il_avg - delta_il/2",
+                "il_min - il_avg + delta_il/2",
+                "tx - t"],
+        "dcm": ["ind*il_max - vi*d*t",
+                "vi*d*t - vo*(tx - d*t)",
+                "2*ii - il_max*d",
+                "2*il_avg*t - il_max*tx",
+                "cap*delta_vo - io*d*t",
+                "il_min",
+                "delta_il - il_max"],
+    },
+}
+
+# Fração de Vo usada como padrão para kd quando não informado (mesmos valores das classes Buck e BuckBoost).
+DEFAULT_KD = {"buck": 1.0, "buckboost": 0.85}
+
+PROBLEMS = {"design": DESIGN, "analysis": ANALYSIS}
+
+_kernels = {}
+
+
+def _spec(problem, topology, mode, jacobian=False):
+    rel = PROBLEMS[problem]
+    spec = {"version": FORMAT_VERSION,
+            "problem": problem,
+            "topology": topology,
+            "mode": mode,
+            "inputs": rel["inputs"],
+            "unknowns": rel["unknowns"],
+            "common": COMMON,
+            "equations": rel[topology][mode],
+            "segments": SEGMENTS[topology][mode],
+            "definitions": DEFINITIONS[topology]}
+    if jacobian:
+        spec["jacobian"] = True
+    return spec
+
+
+def expression_hash(spec):
+    texto = json.dumps(spec, sort_keys=True)
+    return hashlib.sha256(texto.encode()).hexdigest()[:20]
+
+
+def _derive(spec):
+    """
+    Caminho frio: resolve as relações com sympy e gera o código-fonte do kernel.
+
+    :return: (nomes das saídas, expressões sympy em função das entradas)
+    """
+    import sympy as sp
+
+    inputs = spec["inputs"]
+    unknowns = spec["unknowns"]
+
+    nomes = set(inputs) | set(unknowns) | {"s"}
+    symbols = {n: sp.Symbol(n, nonnegative=True) if n in ("il_min", "s") else sp.Symbol(n, positive=True)
+               for n in nomes}
+
+    eqs = [sp.sympify(e, locals=symbols) for e in spec["common"] + spec["equations"]]
+    sol = sp.solve(eqs, [symbols[u] for u in unknowns], dict=True)
+    if len(sol) != 1:
+        raise ValueError(f"{spec['topology']} {spec['mode']}: {len(sol)} soluções para as relações de regime")
+    sol = sol[0]
+
+    out = {u: sol[symbols[u]] for u in unknowns}
+
+    # Esforços a partir das integrais exatas dos segmentos de iL
+    s = symbols["s"]
+    quad_l, quad_s, avg_d, avg_s = 0, 0, 0, 0
+    for expr, ini, fim, elem in spec["segments"]:
+        e = sp.sympify(expr, locals=symbols)
+        a = sp.sympify(ini, locals=symbols)
+        b = sp.sympify(fim, locals=symbols)
+        i2 = sp.integrate(e ** 2, (s, a, b))
+        i1 = sp.integrate(e, (s, a, b))
+        quad_l += i2
+        if elem == "s":
+            quad_s += i2
+            avg_s += i1
+        else:
+            avg_d += i1
+    t = symbols["t"]
+    out["il_rms"] = sp.sqrt(quad_l / t).subs(sol)
+    out["ids_rms"] = sp.sqrt(quad_s / t).subs(sol)
+    out["ids_avg"] = (avg_s / t).subs(sol)
+    out["id_avg"] = (avg_d / t).subs(sol)
+
+    for nome, expr in spec["definitions"].items():
+        out[nome] = sp.sympify(expr, locals=symbols).subs(sol)
+
+    exprs = [sp.simplify(e) for e in out.values()]
+    if not spec.get("jacobian"):
+        return list(out), exprs
+
+    # Derivadas exatas de cada saída em relação a cada entrada, nomeadas 'saída/entrada'. A forma fatorada deixa o
+    # sinal legível também em aritmética intervalar (somas de termos que se cancelam perdem o sinal).
+    nomes_j, exprs_j = [], []
+    for nome, e in zip(out, exprs):
+        for x in inputs:
+            nomes_j.append(f"{nome}/{x}")
+            exprs_j.append(sp.factor(sp.together(sp.diff(e, symbols[x]))))
+    return nomes_j, exprs_j
+
+
+def _generate(spec, nomes, exprs):
+    import sympy as sp
+    from sympy.printing.numpy import NumPyPrinter
+
+    printer = NumPyPrinter({"fully_qualified_modules": True, "inline": True})
+    repl, reduced = sp.cse(exprs)
+    linhas = [f"def kernel({', '.join(spec['inputs'])}):"]
+    for sym, expr in repl:
+        linhas.append(f"    {sym} = {printer.doprint(expr)}")
+    linhas.append("    return (")
+    for e in reduced:
+        linhas.append(f"        {printer.doprint(e)},")
+    linhas.append("    )")
+    return "\n".join(linhas) + "\n"
+
+
+def _compile(source):
+    namespace = {"numpy": np}
+    exec(compile(source, "<conversores-kernel>", "exec"), namespace)
+    return namespace["kernel"]
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"kernel-{key}.json")
+
+
+def _load_or_build(problem, topology, mode, jacobian=False):
+    spec = _spec(problem, topology, mode, jacobian)
+    key = expression_hash(spec)
+    path = _cache_path(key)
+    try:
+        with open(path) as fp:
+            data = json.load(fp)
+        if data.get("key") == key:
+            return data["outputs"], data["source"]
+    except (OSError, ValueError):
+        pass
+
+    nomes, exprs = _derive(spec)
+    source = _generate(spec, nomes, exprs)
+    data = {"key": key, "inputs": spec["inputs"], "outputs": nomes, "source": source}
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as fp:
+            json.dump(data, fp)
+        os.replace(tmp, path)
+    except OSError:
+        # Sem permissão de escrita: o kernel continua válido nesta sessão
+        pass
+    return nomes, source
+
+
+class Kernel:
+    def __init__(self, problem, topology, mode, jacobian=False):
+        """
+        Kernel vetorizado de uma topologia/modo.
+
+        :param problem: conjunto de relações ('design' ou 'analysis')
+        :param topology: 'buck' ou 'buckboost'
+        :param mode: 'ccm' ou 'dcm'
+        :param jacobian: True, para o kernel das derivadas parciais (saídas 'saída/entrada')
+        """
+        self.problem = problem
+        self.topology = topology
+        self.mode = mode
+        self.jacobian = jacobian
+        self.inputs = PROBLEMS[problem]["inputs"]
+        self.outputs, self.source = _load_or_build(problem, topology, mode, jacobian)
+        self.__func = _compile(self.source)
+
+    def __call__(self, *args, **kwargs):
+        """
+        Aceita escalares ou arrays (com broadcasting) e devolve um dicionário {saída: array}.
+        """
+        valores = [np.asarray(v, dtype=float) for v in self.__bind(args, kwargs)]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            res = self.__func(*valores)
+        shape = np.broadcast_shapes(*[v.shape for v in valores])
+        return {n: np.broadcast_to(np.asarray(r, dtype=float), shape) for n, r in zip(self.outputs, res)}
+
+    def __bind(self, args, kwargs):
+        valores = list(args) + [None] * (len(self.inputs) - len(args))
+        for i, nome in enumerate(self.inputs):
+            if nome in kwargs:
+                valores[i] = kwargs[nome]
+        faltando = [n for n, v in zip(self.inputs, valores) if v is None]
+        if faltando:
+            raise TypeError(f"entradas ausentes: {', '.join(faltando)}")
+        return valores
+
+
+def kernel(problem, topology, mode, jacobian=False):
+    """
+    :return: Kernel memorizado para (problem, topology, mode, jacobian)
+    """
+    chave = (problem, topology, mode, jacobian)
+    k = _kernels.get(chave)
+    if k is None:
+        k = _kernels[chave] = Kernel(problem, topology, mode, jacobian)
+    return k
+
+
+def select(topology, dcm, problem, jacobian=False, **entradas):
+    """
+    Avalia os kernels CCM e DCM e combina por elemento segundo a máscara 'dcm'.
+    """
+    dcm = np.asarray(dcm, dtype=bool)
+    if dcm.ndim == 0:
+        return kernel(problem, topology, "dcm" if dcm else "ccm", jacobian)(**entradas)
+    ccm = kernel(problem, topology, "ccm", jacobian)(**entradas)
+    res = kernel(problem, topology, "dcm", jacobian)(**entradas)
+    return {n: np.where(dcm, res[n], ccm[n]) for n in res}
+
+
+def design(topology, vi, vo, po, f, dil, dvo, dcm=False, kd=None):
+    """
+    Projeto vetorizado (equivalente a construir o objeto e chamar set_ind() e set_cap()).
+
+    :param topology: 'buck' ou 'buckboost'
+    :param dil: ondulação relativa de iL (delta_il / percent_delt_il)
+    :param dvo: ondulação relativa de Vo (delta_vo / percent_delt_vo)
+    :param dcm: bool ou array de bool
+    :param kd: fração do duty CCM no modo DCM. Padrão: o mesmo das classes Buck (1.0) e BuckBoost (0.85)
+    :return: dicionário {d, t, tx, io, ii, r, il_max, il_min, il_avg, delta_il, ind, cap, il_rms, ids_rms,
+             ids_avg, id_avg, ids_max, id_max, vds_max, vd_max}
+    """
+    if kd is None:
+        kd = DEFAULT_KD[topology]
+    return select(topology, dcm, "design", vi=vi, vo=vo, po=po, f=f, dil=dil, dvo=dvo, kd=kd)
+
+
+def operating_point(topology, vi, vo, po, f, ind, cap):
+    """
+    Ponto de operação vetorizado com L e C fixos. O modo é escolhido pela corrente: DCM quando a solução CCM daria
+    iL mínimo negativo.
+
+    :return: dicionário com as mesmas saídas de 'design' (com delta_vo absoluto no lugar de ind/cap) e 'dcm' (bool)
+    """
+    entradas = dict(vi=vi, vo=vo, po=po, f=f, ind=ind, cap=cap)
+    ccm = kernel("analysis", topology, "ccm")(**entradas)
+    dcm = ccm["il_min"] < 0
+    if not dcm.any():
+        res = dict(ccm)
+    else:
+        res = kernel("analysis", topology, "dcm")(**entradas)
+        res = {n: np.where(dcm, res[n], ccm[n]) for n in res}
+    res["dcm"] = dcm
+    return res
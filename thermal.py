@@ -0,0 +1,229 @@
+import numpy as np
+from scipy.linalg import eigh
+
+K_BOLTZMANN = 8.617333262e-5  # [eV/K]
+
+
+def cauer_to_foster(r, c):
+    """
+    Converte uma rede Cauer (escada a partir da junção) na Foster equivalente.
+
+    :param r: resistências térmicas R1..Rn [K/W], Rn ligada ao ambiente
+    :param c: capacitâncias térmicas C1..Cn [J/K], Ci entre o nó i e o ambiente
+    :return: (r_foster, tau_foster) com Zth(t) = soma Ri (1 - exp(-t / taui))
+    """
+    r = np.asarray(r, dtype=float)
+    c = np.asarray(c, dtype=float)
+    n = len(r)
+    g = np.zeros((n, n))
+    for i in range(n):
+        g[i, i] += 1 / r[i]
+        if i + 1 < n:
+            g[i, i + 1] -= 1 / r[i]
+            g[i + 1, i] -= 1 / r[i]
+            g[i + 1, i + 1] += 1 / r[i]
+    # G v = lambda C v, com v normalizado por C: Zth(s) = soma v0^2 / (s + lambda)
+    lam, v = eigh(g, np.diag(c))
+    return v[0] ** 2 / lam, 1 / lam
+
+
+class FosterNetwork:
+    def __init__(self, r, tau):
+        """
+        Redes Foster de vários dispositivos.
+
+        :param r: resistências [K/W], forma (n_termos,) ou (n_dispositivos, n_termos)
+        :param tau: constantes de tempo [s], mesma forma de r
+        """
+        self.r = np.atleast_2d(np.asarray(r, dtype=float))
+        self.tau = np.atleast_2d(np.asarray(tau, dtype=float))
+
+    @classmethod
+    def from_cauer(cls, r, c):
+        """
+        :param r: (n_termos,) ou (n_dispositivos, n_termos)
+        :param c: mesma forma de r
+        """
+        r = np.atleast_2d(r)
+        c = np.atleast_2d(c)
+        pares = [cauer_to_foster(ri, ci) for ri, ci in zip(r, c)]
+        return cls([p[0] for p in pares], [p[1] for p in pares])
+
+    @property
+    def rth(self):
+        """
+        Resistência térmica de regime [K/W] por dispositivo.
+        """
+        return self.r.sum(axis=-1)
+
+    def zth(self, t):
+        t = np.asarray(t, dtype=float)
+        return (self.r[..., None] * (1 - np.exp(-t / self.tau[..., None]))).sum(axis=-2)
+
+
+class JunctionTemperature:
+    # Limite de exp(soma dt / tau) dentro de um bloco, para não estourar o float64
+    MAX_EXPONENT = 500.0
+    # Maior dt / tau de uma amostra na soma acumulada: acima disso exp(-dt / tau) < 4e-18 e o termo já se acomodou,
+    # então trocar o expoente por este teto muda y em menos que 4e-18 |y| e nenhuma amostra sozinha estoura exp
+    MAX_STEP = 40.0
+
+    def __init__(self, network, t_amb=25.0, n_devices=None, bins=32, range_dt=(0.0, 160.0),
+                 range_tm=(-40.0, 200.0), block=4096):
+        """
+        Temperatura de junção de muitos dispositivos ao longo de um perfil de perdas.
+
+        A atualização é a solução exata de cada termo Foster com perda constante em cada amostra (retenção de ordem
+        zero), qualquer que seja o dt, então não há passo mínimo de integração. Os ciclos de Tj são contados por
+        rainflow incremental e guardados num histograma (amplitude x temperatura média) de tamanho fixo.
+
+        :param network: FosterNetwork; uma rede só é replicada para todos os dispositivos
+        :param t_amb: temperatura ambiente/dissipador [°C], escalar ou por dispositivo
+        :param n_devices: número de dispositivos quando a rede é única
+        :param bins: classes do histograma de ciclos em cada eixo
+        :param range_dt: faixa de amplitude dos ciclos [K]
+        :param range_tm: faixa de temperatura média dos ciclos [°C]
+        :param block: amostras por bloco vetorizado
+        """
+        r, tau = network.r, network.tau
+        if n_devices is not None and r.shape[0] == 1:
+            r = np.repeat(r, n_devices, axis=0)
+            tau = np.repeat(tau, n_devices, axis=0)
+        self.r = r
+        self.tau = tau
+        self.n_devices = r.shape[0]
+        self.t_amb = np.broadcast_to(np.asarray(t_amb, dtype=float), (self.n_devices,))
+        self.block = block
+        self.edges_dt = np.linspace(*range_dt, bins + 1)
+        self.edges_tm = np.linspace(*range_tm, bins + 1)
+        self.reset()
+
+    def reset(self):
+        self.state = np.zeros_like(self.r)
+        self.tj = self.t_amb.copy()
+        self.tj_max = self.t_amb.copy()
+        self.time = 0.0
+        self.cycles = np.zeros((self.n_devices, len(self.edges_dt) - 1, len(self.edges_tm) - 1))
+        self.__residuo = [[] for _ in range(self.n_devices)]
+
+    def update(self, p, dt, keep=False):
+        """
+        Avança o modelo com as perdas de um bloco.
+
+        :param p: perdas [W], forma (n_dispositivos, n_amostras)
+        :param dt: duração de cada amostra [s], escalar ou (n_amostras,)
+        :param keep: True, para devolver Tj de todas as amostras
+        :return: Tj (n_dispositivos, n_amostras) se keep, senão None
+        """
+        p = np.atleast_2d(np.asarray(p, dtype=float))
+        n = p.shape[1]
+        dt = np.broadcast_to(np.asarray(dt, dtype=float), (n,))
+        saida = [] if keep else None
+        tau_min = self.tau.min()
+
+        start = 0
+        while start < n:
+            stop = min(start + self.block, n)
+            # corta o bloco onde o expoente acumulado passaria do limite
+            acum = np.cumsum(np.minimum(dt[start:stop] / tau_min, self.MAX_STEP))
+            corte = np.searchsorted(acum, self.MAX_EXPONENT, side="right")
+            stop = start + max(int(corte), 1)
+            tj = self.__advance(p[:, start:stop], dt[start:stop])
+            self.__count_cycles(tj)
+            if keep:
+                saida.append(tj)
+            start = stop
+
+        self.time += dt.sum()
+        return np.concatenate(saida, axis=1) if keep else None
+
+    def __advance(self, p, dt):
+        # y_k = a_k y_(k-1) + b_k p_k, a_k = exp(-dt_k / tau), b_k = R (1 - a_k)
+        # y_k = exp(-s_k) (y_0 + soma_j<=k b_j p_j exp(s_j)), s_k = soma dt / tau (cada parcela limitada a MAX_STEP)
+        g = dt[None, None, :] / self.tau[..., None]
+        s = np.cumsum(np.minimum(g, self.MAX_STEP), axis=-1)
+        b = self.r[..., None] * -np.expm1(-g)
+        y = np.exp(-s) * (self.state[..., None] + np.cumsum(b * p[:, None, :] * np.exp(s), axis=-1))
+        self.state = y[..., -1]
+        tj = self.t_amb[:, None] + y.sum(axis=1)
+        self.tj = tj[:, -1]
+        np.maximum(self.tj_max, tj.max(axis=1), out=self.tj_max)
+        return tj
+
+    def __count_cycles(self, tj):
+        for k in range(self.n_devices):
+            serie = tj[k]
+            # pontos de reversão do bloco (vetorizado); o primeiro e o último valor entram como candidatos
+            ds = np.diff(serie)
+            nz = np.flatnonzero(ds)
+            sinal = np.sign(ds[nz])
+            troca = nz[1:][sinal[1:] != sinal[:-1]]
+            pontos = np.concatenate(([serie[0]], serie[troca], [serie[-1]]))
+
+            # rainflow incremental (ASTM E1049): o último elemento da pilha é provisório
+            pilha = self.__residuo[k]
+            ciclos = self.cycles[k]
+            for x in pontos.tolist():
+                if len(pilha) < 2:
+                    if not pilha or x != pilha[0]:
+                        pilha.append(x)
+                    continue
+                if (x - pilha[-1]) * (pilha[-1] - pilha[-2]) >= 0:
+                    pilha[-1] = x
+                    continue
+                while len(pilha) >= 3:
+                    x_ = abs(pilha[-1] - pilha[-2])
+                    y_ = abs(pilha[-2] - pilha[-3])
+                    if x_ < y_:
+                        break
+                    if len(pilha) == 3:
+                        # meio ciclo no início do histórico
+                        self.__add(ciclos, y_, 0.5 * (pilha[0] + pilha[1]), 0.5)
+                        pilha.pop(0)
+                    else:
+                        self.__add(ciclos, y_, 0.5 * (pilha[-2] + pilha[-3]), 1.0)
+                        del pilha[-3:-1]
+                pilha.append(x)
+
+    def __add(self, ciclos, amplitude, media, peso):
+        i = min(max(np.searchsorted(self.edges_dt, amplitude, side="right") - 1, 0), len(self.edges_dt) - 2)
+        j = min(max(np.searchsorted(self.edges_tm, media, side="right") - 1, 0), len(self.edges_tm) - 2)
+        ciclos[i, j] += peso
+
+    def residual_cycles(self):
+        """
+        Meios ciclos ainda não fechados (contados como 0.5 cada ao final do perfil).
+
+        :return: histograma (n_dispositivos, bins, bins) a somar a 'cycles'
+        """
+        extra = np.zeros_like(self.cycles)
+        for k, pilha in enumerate(self.__residuo):
+            for a, b in zip(pilha[:-1], pilha[1:]):
+                self.__add(extra[k], abs(b - a), 0.5 * (a + b), 0.5)
+        return extra
+
+
+def lesit_cycles_to_failure(delta_tj, tj_mean, a=3.025e5, alpha=-5.039, ea=9.89e-20 / 1.602176634e-19):
+    """
+    Modelo LESIT (Coffin-Manson-Arrhenius): Nf = A dTj^alpha exp(Ea / (k Tm)).
+
+    :param delta_tj: amplitude do ciclo [K]
+    :param tj_mean: temperatura média do ciclo [°C]
+    :param ea: energia de ativação [eV]
+    """
+    tm = np.asarray(tj_mean, dtype=float) + 273.15
+    return a * np.asarray(delta_tj, dtype=float) ** alpha * np.exp(ea / (K_BOLTZMANN * tm))
+
+
+def miner_damage(model, cycles, **kwargs):
+    """
+    Dano acumulado (regra de Miner) a partir do histograma de ciclos.
+
+    :param model: JunctionTemperature
+    :param cycles: histograma (n_dispositivos, bins, bins), ex.: model.cycles + model.residual_cycles()
+    :return: dano por dispositivo (1.0 = fim de vida)
+    """
+    dt_c = 0.5 * (model.edges_dt[:-1] + model.edges_dt[1:])
+    tm_c = 0.5 * (model.edges_tm[:-1] + model.edges_tm[1:])
+    nf = lesit_cycles_to_failure(dt_c[:, None], tm_c[None, :], **kwargs)
+    return (cycles / nf).sum(axis=(1, 2))
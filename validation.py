@@ -0,0 +1,234 @@
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import symbolic
+from comparison import _metrics
+
+# Saídas conferidas: as métricas dos objetos (comparison._metrics) que também saem de symbolic.design
+OUTPUTS = ["t", "d", "tx", "io", "ind", "cap", "il_max", "il_min", "ids_rms", "ids_max", "id_avg", "id_max",
+           "vds_max", "vd_max"]
+
+INPUTS = ["vi", "vo", "po", "f", "dil", "dvo", "kd", "dcm"]
+
+# Diferenças já conhecidas entre as classes e as equações, relatadas mas fora do código de saída de main:
+#   BuckBoost CCM ids_rms - a classe usa sqrt(D) IL e despreza a ondulação (falta o termo delta_il^2 / 12)
+KNOWN = {("buckboost", "ccm"): ["ids_rms"]}
+
+# Casos de borda sorteados numa fração das linhas (sobrescrevem as entradas aleatórias)
+EDGES = ["d_min", "d_max", "dil_min", "dil_boundary", "kd_boundary", "kd_min", "f_min", "f_max", "po_min",
+         "po_max", "dvo_min"]
+
+
+def _log_uniform(rng, lo, hi, n):
+    return np.exp(rng.uniform(np.log(lo), np.log(hi), n))
+
+
+def population(topology, n, seed=0, dcm_fraction=0.5, edge_fraction=0.1):
+    """
+    População aleatória de projetos, com CCM e DCM misturados e uma fração de casos de borda: duty perto de 0 e
+    de 1, ondulação de iL mínima e no limite do CCM (iL mínimo = 0), DCM no limite (tx = T), f e po extremos.
+
+    No BuckBoost o kd não é sorteado: a classe fixa o duty DCM em 85 % do CCM.
+
+    :return: dicionário {entrada: array} com as colunas de INPUTS ('dcm' booleano)
+    """
+    rng = np.random.default_rng(seed)
+    vi = _log_uniform(rng, 5.0, 1000.0, n)
+    if topology == "buck":
+        vo = vi * rng.uniform(0.02, 0.98, n)
+        kd = rng.uniform(0.05, 1.0, n)
+    else:
+        vo = vi * _log_uniform(rng, 0.05, 20.0, n)
+        kd = np.full(n, symbolic.DEFAULT_KD[topology])
+    res = {"vi": vi, "vo": vo, "po": _log_uniform(rng, 1.0, 1e4, n), "f": _log_uniform(rng, 1e3, 2e6, n),
+           "dil": rng.uniform(0.01, 2.0, n), "dvo": _log_uniform(rng, 1e-4, 0.2, n), "kd": kd,
+           "dcm": rng.random(n) < dcm_fraction}
+
+    borda = np.flatnonzero(rng.random(n) < edge_fraction)
+    caso = rng.integers(len(EDGES), size=len(borda))
+    for k, nome in enumerate(EDGES):
+        i = borda[caso == k]
+        if nome in ("d_min", "d_max"):
+            # d = vo/vi (Buck) ou vo/(vi + vo) (BuckBoost) extremo
+            d = 1e-3 if nome == "d_min" else 0.999
+            res["vo"][i] = res["vi"][i] * (d if topology == "buck" else d / (1 - d))
+        elif nome == "dil_min":
+            res["dil"][i] = 1e-4
+        elif nome == "dil_boundary":
+            res["dil"][i] = 2.0
+            res["dcm"][i] = False
+        elif nome == "kd_boundary" and topology == "buck":
+            res["kd"][i] = 1.0
+            res["dcm"][i] = True
+        elif nome == "kd_min" and topology == "buck":
+            res["kd"][i] = 1e-3
+            res["dcm"][i] = True
+        elif nome in ("f_min", "f_max"):
+            res["f"][i] = 1e3 if nome == "f_min" else 2e6
+        elif nome in ("po_min", "po_max"):
+            res["po"][i] = 1.0 if nome == "po_min" else 1e4
+        elif nome == "dvo_min":
+            res["dvo"][i] = 1e-6
+    return res
+
+
+def _build(topology, e):
+    from buck import Buck
+    from buck_boost import BuckBoost
+
+    dcm = bool(e["dcm"])
+    if topology == "buckboost":
+        return BuckBoost(vi=e["vi"], vo=e["vo"], po=e["po"], freq=e["f"], percent_delt_il=e["dil"],
+                         percent_delt_vo=e["dvo"], is_dcm=dcm)
+    return Buck(vi=e["vi"], vo=e["vo"], po=e["po"], f=e["f"], delta_vo=e["dvo"], delta_il=e["dil"], dcm=dcm,
+                ccm=not dcm, percent_duty=e["kd"])
+
+
+def reference(topology, inputs):
+    """
+    Implementação de referência: constrói cada objeto Buck/BuckBoost e lê as métricas (quad, sp.integrate,
+    sp.sqrt). Projetos em que a classe lança exceção ficam com NaN.
+
+    :return: dicionário {saída: array}
+    """
+    n = len(inputs["vi"])
+    res = {o: np.full(n, np.nan) for o in OUTPUTS}
+    for i in range(n):
+        try:
+            m = _metrics(_build(topology, {k: v[i] for k, v in inputs.items()}))
+        except (ArithmeticError, ValueError):
+            continue
+        for o in OUTPUTS:
+            res[o][i] = float(m[o])
+    return res
+
+
+def fast(topology, inputs):
+    """
+    Caminho rápido padrão: kernels de symbolic.design.
+    """
+    with np.errstate(all="ignore"):
+        return symbolic.design(topology, inputs["vi"], inputs["vo"], inputs["po"], inputs["f"], inputs["dil"],
+                               inputs["dvo"], dcm=inputs["dcm"], kd=inputs["kd"])
+
+
+def _reference_chunk(tarefa):
+    topology, inputs = tarefa
+    return reference(topology, inputs)
+
+
+def errors(ref, res, outputs=None):
+    """
+    Erros absoluto e relativo por elemento. O relativo usa |ref| (0 quando os dois são nulos, inf quando só a
+    referência é nula). Pares em que só um dos valores é finito contam como 'nan_mismatch'.
+    """
+    saida = {}
+    for o in outputs or OUTPUTS:
+        a, b = np.asarray(ref[o], dtype=float), np.asarray(res[o], dtype=float)
+        finito = np.isfinite(a) & np.isfinite(b)
+        erro = np.where(finito, np.abs(b - a), 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rel = np.where(erro == 0, 0.0, erro / np.abs(a))
+        saida[o] = {"abs": erro, "rel": rel, "nan_mismatch": np.isfinite(a) != np.isfinite(b)}
+    return saida
+
+
+def validate(n=100000, topologies=("buck", "buckboost"), seed=0, workers=None, chunk=2000, rtol=1e-9, atol=1e-12,
+             fast_path=None, dcm_fraction=0.5, edge_fraction=0.1):
+    """
+    Compara as implementações de referência (objetos) com um caminho rápido sobre populações aleatórias.
+
+    A referência, que é a parte lenta, roda em blocos de 'chunk' projetos num ProcessPoolExecutor; o caminho
+    rápido é avaliado de uma vez no processo principal.
+
+    :param n: projetos por topologia
+    :param workers: processos (None = os.cpu_count()); 0 executa no processo atual
+    :param rtol, atol: um elemento falha quando erro > atol e erro relativo > rtol
+    :param fast_path: fast_path(topology, inputs) -> {saída: array}; padrão: fast (symbolic.design)
+    :return: {topologia: {'ccm'/'dcm': {saída: {max_abs, max_rel, failures, nan_mismatch, worst}}}}, com 'worst' as
+             entradas do projeto de maior erro relativo, mais 'n', 'seconds' e 'reference_seconds'
+    """
+    fast_path = fast_path or fast
+    relatorio = {"n": n, "rtol": rtol, "atol": atol}
+    inicio = time.perf_counter()
+    tempo_ref = 0.0
+    for topology in topologies:
+        entradas = population(topology, n, seed, dcm_fraction, edge_fraction)
+        tarefas = [(topology, {k: v[a:a + chunk] for k, v in entradas.items()}) for a in range(0, n, chunk)]
+        t0 = time.perf_counter()
+        if workers == 0:
+            partes = list(map(_reference_chunk, tarefas))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                partes = list(ex.map(_reference_chunk, tarefas))
+        tempo_ref += time.perf_counter() - t0
+        ref = {o: np.concatenate([p[o] for p in partes]) for o in OUTPUTS}
+        res = fast_path(topology, entradas)
+        erro = errors(ref, res, [o for o in OUTPUTS if o in res])
+
+        relatorio[topology] = {}
+        for modo, sel in (("ccm", ~entradas["dcm"]), ("dcm", entradas["dcm"])):
+            idx = np.flatnonzero(sel)
+            linha = {"count": len(idx), "reference_failures": int(np.isnan(ref["d"][idx]).sum())}
+            for o, e in erro.items():
+                rel, ab = e["rel"][idx], e["abs"][idx]
+                pior = int(idx[np.argmax(rel)]) if len(idx) else -1
+                linha[o] = {"max_abs": float(ab.max()) if len(idx) else 0.0,
+                            "max_rel": float(rel.max()) if len(idx) else 0.0,
+                            "failures": int(np.sum((ab > atol) & (rel > rtol))),
+                            "nan_mismatch": int(e["nan_mismatch"][idx].sum()),
+                            "worst": {k: entradas[k][pior].item() for k in INPUTS} if pior >= 0 else None}
+            relatorio[topology][modo] = linha
+    relatorio["seconds"] = time.perf_counter() - inicio
+    relatorio["reference_seconds"] = tempo_ref
+    return relatorio
+
+
+def show_info(report):
+    print(f"\n===============\t\tVALIDAÇÃO ({report['n']} projetos por topologia)\t===============")
+    print(f"\trtol\t\t=\t{report['rtol']}\n\tatol\t\t=\t{report['atol']}")
+    print(f"\ttempo\t\t=\t{'{:.1f}'.format(report['seconds'])} s "
+          f"(referência {'{:.1f}'.format(report['reference_seconds'])} s)")
+    for topology in ("buck", "buckboost"):
+        if topology not in report:
+            continue
+        for modo, linha in report[topology].items():
+            print(f"\n\t{topology.upper()} {modo.upper()}\t({linha['count']} projetos, "
+                  f"{linha['reference_failures']} com exceção na referência)")
+            print("\tsaída\t\tmax_abs\t\tmax_rel\t\tfalhas\tNaN")
+            for o in OUTPUTS:
+                if o not in linha:
+                    continue
+                e = linha[o]
+                conhecida = " (conhecida)" if o in KNOWN.get((topology, modo), []) else ""
+                print(f"\t{o}\t\t{'{:2.3e}'.format(e['max_abs'])}\t{'{:2.3e}'.format(e['max_rel'])}"
+                      f"\t{e['failures']}\t{e['nan_mismatch']}{conhecida}")
+
+
+def main(argv=None):
+    """
+    python validation.py N [--workers W] [--seed S] [--rtol R]
+
+    :return: 1 se algum elemento falhou fora das diferenças conhecidas (KNOWN), 0 caso contrário
+    """
+    p = argparse.ArgumentParser(prog="validation.py", description="Referência x caminhos rápidos")
+    p.add_argument("n", type=int)
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--rtol", type=float, default=1e-9)
+    p.add_argument("--chunk", type=int, default=2000)
+    a = p.parse_args(argv)
+    relatorio = validate(a.n, seed=a.seed, workers=a.workers, chunk=a.chunk, rtol=a.rtol)
+    show_info(relatorio)
+    falhas = sum(linha[o]["failures"] + linha[o]["nan_mismatch"] for topology in ("buck", "buckboost")
+                 for modo, linha in relatorio[topology].items() for o in OUTPUTS
+                 if o in linha and o not in KNOWN.get((topology, modo), []))
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+import numpy as np
+
+import symbolic
+
+OUTPUTS = ["d", "il_max", "il_min", "delta_il", "delta_vo", "il_rms", "ids_rms", "id_avg", "ids_max", "vds_max"]
+
+
+class Interval:
+    def __init__(self, lo, hi=None):
+        """
+        Intervalos [lo, hi] vetorizados: lo e hi são arrays (ou escalares) com broadcasting, um intervalo por
+        elemento. As operações devolvem limites garantidos (contêm todos os valores possíveis).
+
+        :param lo: limite inferior (ou o valor, se hi for None)
+        :param hi: limite superior
+        """
+        self.lo = np.asarray(lo, dtype=float)
+        self.hi = self.lo if hi is None else np.asarray(hi, dtype=float)
+
+    @classmethod
+    def tol(cls, nominal, rel):
+        """
+        Intervalo nominal x (1 ± rel).
+        """
+        nominal = np.asarray(nominal, dtype=float)
+        return cls(nominal * (1 - rel), nominal * (1 + rel))
+
+    @staticmethod
+    def wrap(v):
+        return v if isinstance(v, Interval) else Interval(v)
+
+    @property
+    def mid(self):
+        return 0.5 * (self.lo + self.hi)
+
+    @property
+    def width(self):
+        return self.hi - self.lo
+
+    def __repr__(self):
+        return f"Interval({self.lo}, {self.hi})"
+
+    def __neg__(self):
+        return Interval(-self.hi, -self.lo)
+
+    def __abs__(self):
+        zero = (self.lo <= 0) & (self.hi >= 0)
+        a, b = np.abs(self.lo), np.abs(self.hi)
+        return Interval(np.where(zero, 0.0, np.minimum(a, b)), np.maximum(a, b))
+
+    def __add__(self, o):
+        o = Interval.wrap(o)
+        return Interval(self.lo + o.lo, self.hi + o.hi)
+
+    __radd__ = __add__
+
+    def __sub__(self, o):
+        o = Interval.wrap(o)
+        return Interval(self.lo - o.hi, self.hi - o.lo)
+
+    def __rsub__(self, o):
+        return Interval.wrap(o) - self
+
+    def __mul__(self, o):
+        o = Interval.wrap(o)
+        p = [self.lo * o.lo, self.lo * o.hi, self.hi * o.lo, self.hi * o.hi]
+        return Interval(np.minimum.reduce(p), np.maximum.reduce(p))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, o):
+        return self * Interval.wrap(o).__inverse()
+
+    def __rtruediv__(self, o):
+        return Interval.wrap(o) * self.__inverse()
+
+    def __inverse(self):
+        zero = (self.lo <= 0) & (self.hi >= 0)
+        with np.errstate(divide="ignore"):
+            return Interval(np.where(zero, -np.inf, 1 / self.hi), np.where(zero, np.inf, 1 / self.lo))
+
+    def __pow__(self, p):
+        if isinstance(p, Interval):
+            if np.any(p.lo != p.hi):
+                raise TypeError("expoente intervalar não suportado")
+            p = p.lo
+        p = float(p)
+        if p == 0:
+            return Interval(np.ones_like(self.lo), np.ones_like(self.hi))
+        inteiro = p == int(p)
+        lo, hi = self.lo, self.hi
+        if not inteiro:
+            # potência fracionária: só a parte não negativa do domínio
+            lo, hi = np.maximum(lo, 0.0), np.maximum(hi, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a, b = lo ** p, hi ** p
+            positivo = lo >= 0
+            negativo = hi <= 0
+            zero = ~positivo & ~negativo
+            if p > 0:
+                if inteiro and int(p) % 2 == 0:
+                    r_lo = np.where(zero, 0.0, np.minimum(a, b))
+                    r_hi = np.maximum(a, b)
+                else:
+                    r_lo, r_hi = np.minimum(a, b), np.maximum(a, b)
+            else:
+                if inteiro and int(p) % 2 == 0:
+                    r_lo = np.minimum(a, b)
+                    r_hi = np.where(zero | (lo == 0) | (hi == 0), np.inf, np.maximum(a, b))
+                else:
+                    r_lo = np.where(zero, -np.inf, np.minimum(a, b))
+                    r_hi = np.where(zero, np.inf, np.maximum(a, b))
+        return Interval(r_lo, r_hi)
+
+    def __rpow__(self, base):
+        base = float(base)
+        if base <= 0:
+            raise ValueError("base não positiva")
+        a, b = base ** self.lo, base ** self.hi
+        return Interval(np.minimum(a, b), np.maximum(a, b))
+
+    def sqrt(self):
+        return self ** 0.5
+
+    def union(self, o):
+        return Interval(np.minimum(self.lo, o.lo), np.maximum(self.hi, o.hi))
+
+    def intersect(self, o):
+        return Interval(np.maximum(self.lo, o.lo), np.minimum(self.hi, o.hi))
+
+
+class _IntervalNumpy:
+    """
+    Substitui o módulo numpy no código gerado dos kernels, para avaliá-los com intervalos.
+    """
+    @staticmethod
+    def sqrt(x):
+        return Interval.wrap(x).sqrt() if isinstance(x, Interval) else np.sqrt(x)
+
+
+_compilados = {}
+
+
+def _interval_kernel(problem, topology, mode, jacobian=False):
+    chave = (problem, topology, mode, jacobian)
+    if chave not in _compilados:
+        k = symbolic.kernel(problem, topology, mode, jacobian)
+        namespace = {"numpy": _IntervalNumpy}
+        exec(compile(k.source, "<conversores-kernel-intervalar>", "exec"), namespace)
+        _compilados[chave] = (k.inputs, k.outputs, namespace["kernel"])
+    return _compilados[chave]
+
+
+def evaluate(problem, topology, mode, **entradas):
+    """
+    Avaliação intervalar direta de um kernel (limites garantidos, mas largos quando uma entrada aparece várias
+    vezes na expressão).
+
+    :param entradas: Interval ou valores, por nome de entrada
+    :return: {saída: Interval}
+    """
+    inputs, outputs, func = _interval_kernel(problem, topology, mode)
+    args = [Interval.wrap(entradas[n]) for n in inputs]
+    return {n: Interval.wrap(r) for n, r in zip(outputs, func(*args))}
+
+
+class WorstCase:
+    def __init__(self, topology, vi, vo, po, f, ind, cap, levels=8):
+        """
+        Análise de pior caso de projetos com L e C fixos (problema 'analysis' de symbolic).
+
+        Cada entrada é um valor/array ou um Interval; um lote de projetos é avaliado de uma vez (broadcasting).
+        Para cada saída, o sinal das derivadas parciais é avaliado em aritmética intervalar sobre a caixa de
+        entradas: nas entradas em que a saída é monótona, o extremo vai para o canto correspondente; nas demais a
+        entrada continua como intervalo. A avaliação do canto reduzido dá limites garantidos, exatos quando a saída é
+        monótona em todas as entradas, e é intersectada com a avaliação intervalar direta. Caixas em que a saída
+        não é monótona são divididas ao meio (até 'levels' vezes) na entrada de derivada com sinal indefinido, o
+        que aperta o limite perto do extremo interno e estreita as próprias derivadas intervalares.
+
+        O modo é decidido por iL mínimo intervalar da solução CCM: caixas inteiramente em CCM ou DCM usam só o
+        respectivo kernel; caixas que cruzam a fronteira recebem a união dos dois.
+
+        :param topology: 'buck' ou 'buckboost'
+        :param levels: níveis de bissecção das caixas não monótonas (custo até 2^levels avaliações por caixa)
+        """
+        self.topology = topology
+        self.levels = levels
+        self.box = {n: Interval.wrap(v) for n, v in zip(symbolic.ANALYSIS["inputs"], (vi, vo, po, f, ind, cap))}
+
+    def __corners(self, y, func, jac, nomes, inputs, box):
+        """
+        Limites de y em cada caixa (arrays planos) pelo canto reduzido, intersectados com a avaliação intervalar
+        direta da caixa.
+
+        :return: (lo, hi, monótona, entrada a dividir: a não monótona de maior contribuição largura x |derivada|,
+                 -1 quando y é monótona em todas)
+        """
+        i = nomes.index(y)
+        derivadas = dict(zip(jac[0], [Interval.wrap(r) for r in jac[1](*box)]))
+        canto_lo, canto_hi = [], []
+        monotona = np.ones(len(box[0].lo), dtype=bool)
+        peso = []
+        for x, b in zip(inputs, box):
+            g = derivadas[f"{y}/{x}"]
+            sobe = g.lo >= 0
+            desce = g.hi <= 0
+            fixo = b.lo == b.hi
+            monotona &= sobe | desce | fixo
+            with np.errstate(invalid="ignore"):
+                contribuicao = b.width * np.maximum(np.abs(g.lo), np.abs(g.hi))
+            peso.append(np.where(sobe | desce | fixo, -1.0, np.nan_to_num(contribuicao, nan=np.inf)))
+            canto_hi.append(Interval(np.where(sobe, b.hi, b.lo), np.where(sobe, b.hi, np.where(desce, b.lo, b.hi))))
+            canto_lo.append(Interval(np.where(sobe, b.lo, np.where(desce, b.hi, b.lo)), np.where(sobe, b.lo, b.hi)))
+        hi = Interval.wrap(func(*canto_hi)[i]).hi
+        lo = Interval.wrap(func(*canto_lo)[i]).lo
+        r = Interval(lo, hi).intersect(Interval.wrap(func(*box)[i]))
+        divide = np.where(monotona, -1, np.argmax(np.stack(peso), axis=0))
+        m = len(monotona)  # saídas constantes no kernel (ex.: iL mínimo no DCM) voltam escalares
+        return np.broadcast_to(r.lo, (m,)), np.broadcast_to(r.hi, (m,)), monotona, divide
+
+    def __bounds(self, mode, outputs):
+        inputs, nomes_j, jac = _interval_kernel("analysis", self.topology, mode, True)
+        _, nomes, func = _interval_kernel("analysis", self.topology, mode)
+        shape = np.broadcast_shapes(*[np.shape(self.box[n].lo) for n in inputs])
+        inteira = [Interval(np.broadcast_to(self.box[n].lo, shape).ravel(),
+                            np.broadcast_to(self.box[n].hi, shape).ravel()) for n in inputs]
+        n = len(inteira[0].lo)
+        direto = dict(zip(nomes, [Interval.wrap(r) for r in func(*inteira)]))
+
+        res = {}
+        exato = {}
+        for y in outputs:
+            # caixas não monótonas são divididas ao meio na entrada em que a derivada muda de sinal; cada folha dá
+            # limites garantidos e a união das folhas cobre a caixa, então o resultado continua garantido
+            box, pai = inteira, np.arange(n)
+            lo, hi = np.full(n, np.inf), np.full(n, -np.inf)
+            monotona = np.ones(n, dtype=bool)
+            for nivel in range(self.levels + 1):
+                a, b, mono, divide = self.__corners(y, func, (nomes_j, jac), nomes, inputs, box)
+                folha = (divide < 0) | (nivel == self.levels)
+                np.minimum.at(lo, pai[folha], a[folha])
+                np.maximum.at(hi, pai[folha], b[folha])
+                np.logical_and.at(monotona, pai[folha], mono[folha])
+                k = np.flatnonzero(~folha)
+                if not len(k):
+                    break
+                corta = divide[k]
+                nova = []
+                for j, c in enumerate(box):
+                    c_lo, c_hi = c.lo[k], c.hi[k]
+                    meio = 0.5 * (c_lo + c_hi)
+                    nova.append(Interval(np.concatenate([c_lo, np.where(corta == j, meio, c_lo)]),
+                                         np.concatenate([np.where(corta == j, meio, c_hi), c_hi])))
+                box, pai = nova, np.concatenate([pai[k], pai[k]])
+            r = Interval(lo, hi).intersect(direto[y])
+            res[y] = Interval(np.broadcast_to(r.lo, (n,)).reshape(shape),
+                              np.broadcast_to(r.hi, (n,)).reshape(shape))
+            exato[y] = monotona.reshape(shape)
+        il_min = Interval(np.broadcast_to(direto["il_min"].lo, (n,)).reshape(shape),
+                          np.broadcast_to(direto["il_min"].hi, (n,)).reshape(shape))
+        return res, exato, il_min
+
+    def bounds(self, outputs=None):
+        """
+        :return: {saída: Interval} com limites garantidos, 'mode' (0 CCM, 1 DCM, 2 ambos na caixa) e 'exact'
+        ({saída: bool}, True quando o limite é atingido num canto de uma subcaixa, ou seja, é exato)
+        """
+        outputs = outputs or OUTPUTS
+        pedidas = list(dict.fromkeys(list(outputs) + ["il_min"]))
+        ccm, exato_ccm, il_min = self.__bounds("ccm", pedidas)
+        dcm, exato_dcm, _ = self.__bounds("dcm", pedidas)
+        # modo pela solução CCM: iL mínimo > 0 em toda a caixa -> CCM; < 0 em toda a caixa -> DCM
+        il_min = ccm["il_min"].intersect(il_min)
+        so_ccm = il_min.lo >= 0
+        so_dcm = il_min.hi < 0
+        mode = np.where(so_ccm, 0, np.where(so_dcm, 1, 2))
+
+        res = {}
+        exact = {}
+        for y in outputs:
+            a, b = ccm[y], dcm[y]
+            u = a.union(b)
+            res[y] = Interval(np.where(so_ccm, a.lo, np.where(so_dcm, b.lo, u.lo)),
+                              np.where(so_ccm, a.hi, np.where(so_dcm, b.hi, u.hi)))
+            exact[y] = np.where(so_ccm, exato_ccm[y], np.where(so_dcm, exato_dcm[y], False))
+        res["mode"] = mode
+        res["exact"] = exact
+        return res
+
+    def show_info(self, row=None, outputs=None):
+        res = self.bounds(outputs)
+        print(f"\n===============\t\tPIOR CASO {self.topology.upper()}\t===============")
+        for y in outputs or OUTPUTS:
+            lo, hi = res[y].lo, res[y].hi
+            if row is not None:
+                lo, hi = lo[row], hi[row]
+            print(f"\t{y}\t\t=\t[{'{:2.3e}'.format(float(lo))}, {'{:2.3e}'.format(float(hi))}]")
+
+
+def worst_case(topology, vi, vo, po, f, ind, cap, outputs=None, levels=8):
+    """
+    Atalho para WorstCase(...).bounds(outputs). Ver WorstCase.
+    """
+    return WorstCase(topology, vi, vo, po, f, ind, cap, levels).bounds(outputs)